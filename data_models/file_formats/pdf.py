@@ -161,10 +161,15 @@ class PDFObj(object):
         val = Node('val', value_type=INT_str(min=dec_m, max=dec_M, determinist=False))
         end = Node('float_part', subnodes=[dot, val])
 
+        # an optional integer part needs its own node, as min/max values
+        # are bound to a node within a non-terminal
+        opt_int_part = int_part.get_clone('opt_int_part')
+        opt_end = end.get_clone('opt_float_part')
+
         e = Node(name)
         e.set_subnodes_with_csts([
-            2, ['u>', [sign, 0, 1], [int_part, 0, 1], [end, 1]],
-            3, ['u>', [sign, 0, 1], [int_part, 1], [end, 0, 1]],
+            2, ['u>', [sign, 0, 1], [opt_int_part, 0, 1], [end, 1]],
+            3, ['u>', [sign, 0, 1], [int_part, 1], [opt_end, 0, 1]],
             1, ['u>', [sign, 0, 1], [int_part, 1], [dot, 1]]
             ])
 
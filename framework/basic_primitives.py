@@ -26,15 +26,19 @@ import random
 import string
 import array
 
-from framework.global_resources import convert_to_internal_repr
+from framework.global_resources import convert_to_internal_repr, rng
+from libs.external_modules import numpy_module
+
+if numpy_module:
+    import numpy
 
 def rand_string(size=None, min=1, max=10, str_set=string.printable):
 
     out = ""
     if size is None:
-        size = random.randint(min, max)
+        size = rng.randint(min, max)
     while len(out) < size:
-        val = random.choice(str_set)
+        val = rng.choice(str_set)
         out += val
 
     return out
@@ -43,29 +47,164 @@ def rand_string(size=None, min=1, max=10, str_set=string.printable):
 def corrupt_bytes(s, p=0.01, n=None, ctrl_char=False):
     """Corrupt a given percentage or number of bytes from a string"""
     s = bytearray(s)
-    l = len(s)
-    if n is None:
-        n = max(1,int(l*p))
-    for i in random.sample(range(l), n):
-        if ctrl_char:
-            s[i] = random.choice([x for x in range(0,32)] + [0x7f])
-        else:
-            s[i] = (s[i]+random.randint(1,255))%256
-
+    corrupt_bytes_in_place(s, p=p, n=n, ctrl_char=ctrl_char)
     return bytes(s)
 
 def corrupt_bits(s, p=0.01, n=None, ascii=False):
     """Flip a given percentage or number of bits from a string"""
     s = bytearray(s)
-    l = len(s)*8
+    corrupt_bits_in_place(s, p=p, n=n, ascii=ascii)
+    return bytes(s)
+
+# The following primitives work in place on a bytearray (or a writable memoryview).
+# They draw all their randomness from rng at once, and update all the selected
+# positions at once with numpy if it is available. The outcome only depends on the
+# state of rng, whether numpy is available or not.
+
+_ctrl_chars = list(range(0, 32)) + [0x7f]
+
+_interesting_values = [b'\x00', b'\x01', b'\x7f', b'\x80', b'\xff',
+                       b'\x00\x00', b'\x7f\xff', b'\x80\x00', b'\xff\xff',
+                       b'\x00\x00\x00\x00', b'\x7f\xff\xff\xff', b'\x80\x00\x00\x00',
+                       b'\xff\xff\xff\xff']
+
+def _random_ints(n, bound):
+    """
+    Returns:
+      `n` integers lower than `bound`, drawn from rng in one call (a numpy array if
+      numpy is available, a list otherwise)
+    """
+    raw = rng.getrandbits(64*n).to_bytes(8*n, 'little') if n > 0 else b''
+    if numpy_module:
+        return (numpy.frombuffer(raw, dtype='<u8') % numpy.uint64(bound)).astype(numpy.int64)
+    ints = array.array('Q', raw)
+    if sys.byteorder == 'big':
+        ints.byteswap()
+    return [i % bound for i in ints]
+
+def _pick_positions(l, p, n):
+    """
+    Returns:
+      the picked positions, in ascending order (a numpy array if numpy is available,
+      a list otherwise)
+    """
     if n is None:
-        n = max(1,int(l*p))
-    for i in random.sample(range(l), n):
-        s[i//8] ^= 1 << (i%8)
+        n = max(1, int(l*p))
+    n = min(n, l)
+    if 2*n > l:
+        # too many draws would be needed to replace the duplicates
+        pos = sorted(rng.sample(range(l), n))
+        return numpy.array(pos, dtype=numpy.int64) if numpy_module else pos
+    # the duplicates are replaced by new draws
+    if numpy_module:
+        pos = numpy.empty(0, dtype=numpy.int64)
+        while len(pos) < n:
+            pos = numpy.sort(numpy.concatenate((pos, _random_ints(n - len(pos), l))))
+            pos = pos[numpy.concatenate(([True], pos[1:] != pos[:-1]))]
+        return pos
+    pos = set()
+    while len(pos) < n:
+        pos.update(_random_ints(n - len(pos), l))
+    return sorted(pos)
+
+def corrupt_bits_in_place(buf, p=0.01, n=None, ascii=False):
+    """
+    Flip a given percentage or number of bits of `buf` (a bytearray or a writable memoryview)
+
+    Returns:
+      the positions of the flipped bits
+    """
+    l = len(buf)*8
+    if l == 0:
+        return []
+    pos = _pick_positions(l, p, n)
+    if numpy_module:
+        a = numpy.frombuffer(buf, dtype=numpy.uint8)
+        idx = pos >> 3
+        numpy.bitwise_xor.at(a, idx, numpy.left_shift(1, pos & 7).astype(numpy.uint8))
         if ascii:
-            s[i//8] &= 0x7f
+            a[idx] &= 0x7f
+    else:
+        for i in pos:
+            buf[i//8] ^= 1 << (i%8)
+            if ascii:
+                buf[i//8] &= 0x7f
+    return pos
 
-    return bytes(s)
+def corrupt_bytes_in_place(buf, p=0.01, n=None, ctrl_char=False):
+    """
+    Corrupt a given percentage or number of bytes of `buf` (a bytearray or a writable
+    memoryview). The bytes are either shifted by a random value, or replaced by control
+    characters if `ctrl_char` is True.
+
+    Returns:
+      the positions of the corrupted bytes
+    """
+    l = len(buf)
+    if l == 0:
+        return []
+    pos = _pick_positions(l, p, n)
+    if ctrl_char:
+        choices = _random_ints(len(pos), len(_ctrl_chars))
+    else:
+        shifts = _random_ints(len(pos), 255)
+    if numpy_module:
+        a = numpy.frombuffer(buf, dtype=numpy.uint8)
+        if ctrl_char:
+            a[pos] = numpy.array(_ctrl_chars, dtype=numpy.uint8)[choices]
+        else:
+            a[pos] = (a[pos] + shifts + 1) % 256
+    elif ctrl_char:
+        for i, c in zip(pos, choices):
+            buf[i] = _ctrl_chars[c]
+    else:
+        for i, shift in zip(pos, shifts):
+            buf[i] = (buf[i]+shift+1)%256
+    return pos
+
+def set_interesting_values_in_place(buf, p=0.01, n=None, values=None):
+    """
+    Overwrite `buf` (a bytearray or a writable memoryview) with interesting values (boundary
+    integers by default) at a given percentage or number of random positions. The values
+    are truncated at the end of `buf`. Overlapping values are written value after value,
+    and byte after byte.
+
+    Returns:
+      the positions of the written values
+    """
+    l = len(buf)
+    if l == 0:
+        return []
+    if values is None:
+        values = _interesting_values
+    pos = _pick_positions(l, p, n)
+    choices = _random_ints(len(pos), len(values))
+    if numpy_module:
+        a = numpy.frombuffer(buf, dtype=numpy.uint8)
+        for vi, val in enumerate(values):
+            sel = pos[choices == vi]
+            for k, byte in enumerate(bytearray(val)):
+                a[sel[sel + k < l] + k] = byte
+    else:
+        for vi, val in enumerate(values):
+            sel = [i for i, c in zip(pos, choices) if c == vi]
+            for k, byte in enumerate(bytearray(val)):
+                for i in sel:
+                    if i + k < l:
+                        buf[i+k] = byte
+    return pos
+
+def missing_values_extremes(values):
+    """
+    Return the smallest and the largest integers that are missing from `values`
+    between its minimum and its maximum (None if there is no gap). The range
+    itself is not built, so that it is cheap even for sparse values.
+    """
+    values = sorted(set(values))
+    gaps = [(a, b) for a, b in zip(values, values[1:]) if b - a > 1]
+    if not gaps:
+        return None
+    return gaps[0][0] + 1, gaps[-1][1] - 1
 
 def calc_parity_bit(x):
     """return 0 if the number of bits is even, otherwise returns 1"""
@@ -63,6 +63,9 @@ class DataBackend(object):
     def to_bytes(self):
         raise NotImplementedError
 
+    def to_buffers(self):
+        return [self.to_bytes()]
+
     def show(self, raw_limit=200, log_func=lambda x: x):
         raise NotImplementedError
 
@@ -100,6 +103,9 @@ class NodeBackend(DataBackend):
     def to_bytes(self):
         return self._node.to_bytes()
 
+    def to_buffers(self):
+        return self._node.to_buffers()
+
     def show(self, raw_limit=200, log_func=lambda x: x):
         self._node.show(raw_limit=raw_limit, log_func=log_func)
 
@@ -206,6 +212,7 @@ class Data(object):
 
         self._type = None
         self._data_id = None
+        self._rng_seed = None
         self._recordable = False
         self._unusable = False
         self._blocked = False
@@ -222,6 +229,12 @@ class Data(object):
 
         self._history = None
 
+        # Serialized content shared by all the consumers of the data while it
+        # is sent and logged (refer to make_snapshot()). The buffers are only
+        # joined if bytes are requested.
+        self._buffers_snapshot = None
+        self._bytes_snapshot = None
+
         # Used to provide information on the origin of the Data().
         # If it comes from a scenario _origin point to the related scenario.
         self._origin = None
@@ -249,6 +262,19 @@ class Data(object):
     def get_data_id(self):
         return self._data_id
 
+    def set_rng_seed(self, seed):
+        self._rng_seed = seed
+
+    def get_rng_seed(self):
+        """
+        Returns:
+          int: seed of the random number generator (refer to
+          :class:`framework.global_resources.RNG`) used when this data has been made.
+          Providing it to :meth:`framework.plumbing.FmkPlumbing.get_data` regenerates
+          the same data.
+        """
+        return self._rng_seed
+
     def set_initial_dmaker(self, t):
         self._type = t
 
@@ -256,11 +282,42 @@ class Data(object):
         return self._type
 
     def update_from(self, obj):
+        self.drop_snapshot()
         if isinstance(obj, Node):
             self._backend = NodeBackend(obj)
         else:
             self._backend = RawBackend(obj)
 
+    def make_snapshot(self):
+        """
+        Serialize the content once for all, so that :meth:`to_bytes`, :meth:`to_buffers`,
+        :meth:`to_str` and :meth:`get_length` return the snapshot instead of serializing
+        the content again. Used by the framework when the data is about to be sent, as the
+        target, the logger and the fmkDB all need its content.
+
+        The snapshot keeps the buffers of the content (refer to :meth:`to_buffers`), so that
+        the target can still send them without concatenating them. They are joined only the
+        first time bytes are requested.
+
+        The snapshot is dropped by :meth:`update_from` and :meth:`drop_snapshot`. Changes
+        made in place on the content meanwhile are thus not taken into account.
+        """
+        self._buffers_snapshot = list(self._backend.to_buffers())
+        self._bytes_snapshot = None
+
+    def drop_snapshot(self):
+        self._buffers_snapshot = None
+        self._bytes_snapshot = None
+
+    def has_snapshot(self):
+        return self._buffers_snapshot is not None
+
+    def _get_snapshot_bytes(self):
+        if self._bytes_snapshot is None:
+            buffers = self._buffers_snapshot
+            self._bytes_snapshot = buffers[0] if len(buffers) == 1 else b''.join(buffers)
+        return self._bytes_snapshot
+
     def get_data_model(self):
         return self._backend.data_model
 
@@ -268,9 +325,24 @@ class Data(object):
         self._backend.data_model = dm
 
     def to_bytes(self):
+        if self._buffers_snapshot is not None:
+            return self._get_snapshot_bytes()
         return self._backend.to_bytes()
 
+    def to_buffers(self):
+        """
+        Returns:
+          list: bytes whose concatenation is the content of the data. For modeled data,
+          they are the values of the terminal nodes, thus the data can be sent without
+          building a buffer of the whole content.
+        """
+        if self._buffers_snapshot is not None:
+            return self._buffers_snapshot
+        return self._backend.to_buffers()
+
     def to_str(self):
+        if self._buffers_snapshot is not None:
+            return unconvert_from_internal_repr(self._get_snapshot_bytes())
         return self._backend.to_str()
 
     def make_blocked(self):
@@ -381,6 +453,8 @@ class Data(object):
         return self._history
 
     def get_length(self):
+        if self._buffers_snapshot is not None:
+            return sum(len(b) for b in self._buffers_snapshot)
         return self._backend.get_length()
 
     def get_content(self, do_copy=False):
@@ -467,6 +541,9 @@ class Data(object):
                 # ncbk = copy.copy(cbk)
                 new_data._callbacks[hook][id(cbk)] = cbk
         new_data._pending_ops = {}  # we do not copy pending_ops
+        # the copy is usually made to be modified
+        new_data._buffers_snapshot = None
+        new_data._bytes_snapshot = None
         new_data._backend = copy.copy(self._backend)
         return new_data
 
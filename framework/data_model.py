@@ -21,6 +21,18 @@
 #
 ################################################################################
 
+import collections
+import hashlib
+import importlib
+import inspect
+import io
+import marshal
+import mmap
+import multiprocessing
+import pickle
+import time
+import types
+
 import framework.global_resources as gr
 from framework.data import *
 from framework.dmhelpers.generic import *
@@ -28,6 +40,156 @@ from framework.node_builder import NodeBuilder
 from libs.external_modules import *
 
 
+#### Data Model Cache
+
+def _digest_files(paths):
+    h = hashlib.sha1()
+    for p in sorted(paths):
+        h.update(p.encode(gr.internal_repr_codec))
+        with open(p, 'rb') as f:
+            h.update(f.read())
+    return h.hexdigest()
+
+def _py_files(folder):
+    return [os.path.join(folder, f) for f in os.listdir(folder) if f.endswith('.py')]
+
+_framework_digest = None
+
+def _get_framework_digest():
+    global _framework_digest
+    if _framework_digest is None:
+        _framework_digest = _digest_files(_py_files(gr.fmk_folder) +
+                                          _py_files(os.path.join(gr.fmk_folder, 'dmhelpers')))
+    return _framework_digest
+
+def _list_dir(path):
+    try:
+        return sorted((f, os.path.getmtime(os.path.join(path, f)), os.path.getsize(os.path.join(path, f)))
+                      for f in os.listdir(path))
+    except OSError:
+        return None
+
+def _make_cell(value):
+    return (lambda: value).__closure__[0]
+
+def _rebuild_function(module, code, name, defaults, closure, kwdefaults):
+    if module not in sys.modules:
+        importlib.import_module(module)
+    if closure is not None:
+        closure = tuple(_make_cell(v) for v in closure)
+    func = types.FunctionType(marshal.loads(code), sys.modules[module].__dict__, name,
+                              defaults, closure)
+    func.__kwdefaults__ = kwdefaults
+    return func
+
+
+class DataModelPickler(pickle.Pickler):
+    """
+    Pickler used to store the atoms of a data model (or anything referring
+    to them, like a model walk checkpoint). Data models are saved
+    by name, and functions that cannot be imported by name (lambdas and
+    local functions, commonly used within node descriptors) are saved
+    by value (only possible from python 3.8). Bound private methods are
+    saved through their mangled name.
+    """
+
+    def persistent_id(self, obj):
+        if isinstance(obj, DataModel):
+            return obj.name
+        return None
+
+    def reducer_override(self, obj):
+        if isinstance(obj, types.FunctionType) and \
+                (obj.__name__ == '<lambda>' or '<locals>' in obj.__qualname__):
+            closure = None if obj.__closure__ is None \
+                else tuple(c.cell_contents for c in obj.__closure__)
+            return (_rebuild_function, (obj.__module__, marshal.dumps(obj.__code__), obj.__name__,
+                                        obj.__defaults__, closure, obj.__kwdefaults__))
+        if isinstance(obj, types.MethodType) and obj.__name__.startswith('__') and \
+                not obj.__name__.endswith('__'):
+            # bound private methods are retrieved through their mangled name
+            cls_name = obj.__func__.__qualname__.rsplit('.', 2)[-2]
+            return (getattr, (obj.__self__, '_' + cls_name.lstrip('_') + obj.__name__))
+        return NotImplemented
+
+
+class DataModelUnpickler(pickle.Unpickler):
+    """
+    Unpickler of what has been stored by :class:`DataModelPickler`. The data models
+    saved by name are resolved with `dm`, or with the ones it depends on.
+    """
+
+    def __init__(self, f, dm):
+        pickle.Unpickler.__init__(self, f)
+        self._dm = dm
+
+    def persistent_load(self, pid):
+        if self._dm is None:
+            raise pickle.UnpicklingError("the data model '{:s}' is needed".format(pid))
+        if pid == self._dm.name:
+            return self._dm
+        return self._dm._dm_db[pid]
+
+
+#### Parallel Absorption
+
+def _read_sample(path):
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return b''
+        mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            return mm[:]
+        finally:
+            mm.close()
+
+def _absorb_sample(absorber, path, idx):
+    """
+    Returns:
+      tuple: the absorbed data (or `None` if rejected) and the reason of the rejection
+    """
+    try:
+        d_abs = absorber(_read_sample(path), idx)
+    except Exception as e:
+        return None, '{:s}: {!s}'.format(type(e).__name__, e)
+    return d_abs, None if d_abs is not None else 'rejected by the absorber'
+
+# approximate time for a spawned process to be ready for absorbing data
+_process_startup_time = 1.0
+# beyond that time, the spawned processes are considered unable to start (e.g., because
+# the main module of the program is not guarded by `if __name__ == "__main__":`)
+_process_startup_timeout = 30.0
+
+_worker_absorber = None
+_worker_error = None
+
+def _absorption_worker_init(dm_cls, dm_name, blob):
+    global _worker_absorber, _worker_error
+    try:
+        dm = dm_cls.__new__(dm_cls)
+        dm.name = dm_name
+        dm._dm_db = {}
+        state, _worker_absorber = DataModelUnpickler(io.BytesIO(blob), dm).load()
+        dm.__dict__.update(state)
+    except Exception as e:
+        _worker_error = '{:s}: {!s}'.format(type(e).__name__, e)
+
+def _absorption_worker_ready():
+    return True
+
+def _absorption_worker_task(args):
+    path, idx = args
+    if _worker_error is not None:
+        return False, _worker_error
+    d_abs, reason = _absorb_sample(_worker_absorber, path, idx)
+    try:
+        f = io.BytesIO()
+        DataModelPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(d_abs)
+    except Exception as e:
+        return False, '{:s}: {!s}'.format(type(e).__name__, e)
+    return True, (f.getvalue(), reason)
+
+
 #### Data Model Abstraction
 
 class DataModel(object):
@@ -38,6 +200,24 @@ class DataModel(object):
     file_extension = 'bin'
     name = None
 
+    max_absorption_processes = 1
+    """
+    Maximum number of processes that absorb in parallel the files imported by
+    :meth:`import_file_contents`. Parallel absorption is disabled by default.
+    As the processes are spawned, they import the main module of the program,
+    which therefore has to guard its entry point with ``if __name__ == "__main__":``.
+    Otherwise, the processes cannot start and the files are absorbed by the
+    current process.
+    """
+
+    cacheable = True
+    """
+    If ``True``, the built data model is saved within ``fuddly_data/dm_cache/``
+    and restored from there while its source files (and the samples it imports)
+    do not change. Set it to ``False`` if :meth:`build_data_model` depends on
+    something else.
+    """
+
     def pre_build(self):
         """
         This method is called when a data model is loaded.
@@ -74,6 +254,8 @@ class DataModel(object):
         self._dm_db = None
         self._built = False
         self._dm_hashtable = {}
+        self._cache_deps = None
+        self._cache_key = None
 
     def _backend(self, atom):
         if isinstance(atom, (Node, dict)):
@@ -97,6 +279,8 @@ class DataModel(object):
             raise ValueError('Requested data does not exist!')
 
     def get_external_atom(self, dm_name, data_id, name=None):
+        if self._cache_deps is not None:
+            self._cache_deps['ext_dms'].add(dm_name)
         dm = self._dm_db[dm_name]
         dm.load_data_model(self._dm_db)
         try:
@@ -110,9 +294,78 @@ class DataModel(object):
         self.pre_build()
         if not self._built:
             self._dm_db = dm_db
-            self.build_data_model()
+            if not self._load_from_cache():
+                self._cache_deps = {'paths': set(), 'ext_dms': set()}
+                try:
+                    self.build_data_model()
+                finally:
+                    deps, self._cache_deps = self._cache_deps, None
+                self._save_to_cache(deps)
             self._built = True
 
+    def _cache_path(self):
+        if not self.cacheable or self.name is None or type(self) is DataModel:
+            return None
+        return os.path.join(gr.dm_cache_folder, self.name + '.pkl')
+
+    def _compute_cache_key(self, paths, ext_dms):
+        folder = os.path.dirname(os.path.abspath(inspect.getfile(type(self))))
+        return {'version': gr.fuddly_version,
+                'python': sys.version,
+                'framework': _get_framework_digest(),
+                'sources': _digest_files(_py_files(folder)),
+                'samples': {p: _list_dir(p) for p in paths},
+                'ext_dms': {n: self._dm_db[n]._cache_key for n in ext_dms}}
+
+    def _load_from_cache(self):
+        path = self._cache_path()
+        if path is None or not os.path.isfile(path):
+            return False
+
+        try:
+            with open(path, 'rb') as f:
+                key = pickle.load(f)
+                for dm_name in key['ext_dms']:
+                    self._dm_db[dm_name].load_data_model(self._dm_db)
+                if key != self._compute_cache_key(key['samples'].keys(), key['ext_dms'].keys()):
+                    return False
+                state = DataModelUnpickler(f, self).load()
+        except Exception as e:
+            print(colorize("*** WARNING: the cache of the data model '{!s}' cannot be loaded, "
+                           "it will be built [{:s}: {!s}] ***".format(self.name, type(e).__name__, e),
+                           rgb=Color.WARNING))
+            return False
+
+        self.__dict__.update(state)
+        self._cache_key = key
+        return True
+
+    def _save_to_cache(self, deps):
+        path = self._cache_path()
+        if path is None:
+            return
+
+        state = self.__dict__.copy()
+        for attr in ('_dm_db', '_built', '_cache_deps', '_cache_key'):
+            del state[attr]
+        tmp_path = path + '.tmp'
+        try:
+            key = self._compute_cache_key(deps['paths'], deps['ext_dms'])
+            if None in key['ext_dms'].values():
+                return
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(key, f, protocol=pickle.HIGHEST_PROTOCOL)
+                DataModelPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(state)
+            os.replace(tmp_path, path)
+            self._cache_key = key
+        except Exception as e:
+            # the data model cannot be pickled, it will be built each time
+            print(colorize("*** WARNING: the data model '{!s}' cannot be cached, it will be "
+                           "built each time [{:s}: {!s}] ***".format(self.name, type(e).__name__, e),
+                           rgb=Color.WARNING))
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+
     def merge_with(self, data_model):
         for k, v in data_model._dm_hashtable.items():
             if k in self._dm_hashtable:
@@ -138,7 +391,23 @@ class DataModel(object):
             idx += 1
 
     def import_file_contents(self, extension=None, absorber=None,
-                             subdir=None, path=None, filename=None):
+                             subdir=None, path=None, filename=None, processes=None):
+        """
+        Absorb the files of the import directory of the data model (or the one
+        provided), following the order of their names. The files rejected by
+        the absorber (which returns `None` or raises an exception) are reported
+        once they have all been processed.
+
+        Args:
+          processes (int): number of processes used for absorbing the files. If `None`,
+            it depends on the time taken by the absorption of the first file, the number
+            of files and CPUs, within the limit of :attr:`max_absorption_processes`.
+            If the data model cannot be sent to other processes, or if they cannot
+            start, the files are absorbed by the current one.
+
+        Returns:
+          dict: absorbed data, by file names
+        """
 
         if absorber is None:
             absorber = self.absorb
@@ -147,6 +416,8 @@ class DataModel(object):
             extension = self.file_extension
         if path is None:
             path = self.get_import_directory_path(subdir=subdir)
+        if self._cache_deps is not None:
+            self._cache_deps['paths'].add(path)
 
         r_file = re.compile(".*\." + extension + "$")
         def is_good_file_by_ext(fname):
@@ -164,19 +435,92 @@ class DataModel(object):
             files = list(filter(is_good_file_by_ext, files))
         else:
             files = list(filter(is_good_file_by_fname, files))
-        msgs = {}
-        idx = 0
+        files.sort()
+
+        tasks = [(os.path.join(path, name), idx) for idx, name in enumerate(files)]
+        results = []
+        if processes is None and tasks and self.max_absorption_processes > 1:
+            # it is worth spawning processes only if the absorption is long enough
+            start = time.time()
+            results.append(_absorb_sample(absorber, *tasks[0]))
+            duration = (time.time() - start) * (len(tasks) - 1)
+            processes = min(self.max_absorption_processes, multiprocessing.cpu_count(),
+                            int(duration // _process_startup_time))
+
+        remaining = tasks[len(results):]
+        parallel_results = None
+        if processes is not None and processes > 1 and len(remaining) > 1:
+            parallel_results = self._absorb_in_parallel(absorber, remaining, processes)
+        if parallel_results is None:
+            parallel_results = [_absorb_sample(absorber, *t) for t in remaining]
+        results += parallel_results
+
+        msgs = collections.OrderedDict()
+        rejected = []
+        for name, (d_abs, reason) in zip(files, results):
+            if d_abs is None:
+                rejected.append((name, reason))
+            else:
+                msgs[name] = d_abs
 
-        for name in files:
-            with open(os.path.join(path, name), 'rb') as f:
-                buff = f.read()
-                d_abs = absorber(buff, idx)
-                if d_abs is not None:
-                    msgs[name] = d_abs
-            idx +=1
+        if rejected:
+            msg = "\n*** WARNING: {:d} file(s) of '{:s}' not absorbed by the data model '{!s}':" \
+                .format(len(rejected), path, self)
+            for name, reason in rejected:
+                msg += '\n   - {:s} [{:s}]'.format(name, reason)
+            print(colorize(msg, rgb=Color.WARNING))
 
         return msgs
 
+    def _absorb_in_parallel(self, absorber, tasks, processes):
+        if not hasattr(multiprocessing, 'get_context'):
+            return None
+
+        state = self.__dict__.copy()
+        for attr in ('_dm_db', '_cache_deps'):
+            del state[attr]
+        try:
+            f = io.BytesIO()
+            DataModelPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump((state, absorber))
+        except Exception:
+            # the data model cannot be sent to other processes
+            return None
+
+        # processes are spawned as the framework runs threads that would not survive a fork
+        ctx = multiprocessing.get_context('spawn')
+        pool = ctx.Pool(processes, initializer=_absorption_worker_init,
+                        initargs=(type(self), self.name, f.getvalue()))
+        outputs = None
+        try:
+            # workers that cannot start are replaced endlessly by the pool
+            pool.apply_async(_absorption_worker_ready).get(timeout=_process_startup_timeout)
+            outputs = pool.map(_absorption_worker_task, tasks,
+                               chunksize=max(1, len(tasks) // (processes * 4)))
+        except multiprocessing.TimeoutError:
+            print(colorize("*** WARNING: the absorption processes of the data model '{!s}' "
+                           "cannot start, the files are absorbed by the current process "
+                           "[is the main module guarded?] ***".format(self), rgb=Color.WARNING))
+        finally:
+            if outputs is None:
+                pool.terminate()
+            else:
+                pool.close()
+            pool.join()
+
+        if outputs is None:
+            return None
+
+        results = []
+        for (sample_path, idx), (ok, output) in zip(tasks, outputs):
+            if ok:
+                blob, reason = output
+                results.append((DataModelUnpickler(io.BytesIO(blob), self).load(), reason))
+            else:
+                # the absorption could not be performed by a worker
+                results.append(_absorb_sample(absorber, sample_path, idx))
+
+        return results
+
     def get_import_directory_path(self, subdir=None):
         if subdir is None:
             subdir = self.name
@@ -25,8 +25,14 @@ import sys
 import os
 import re
 import math
+import time
+import zlib
+import hashlib
+import collections
 import threading
 from datetime import datetime
+import six
+from six.moves import queue
 
 import framework.global_resources as gr
 import libs.external_modules as em
@@ -50,6 +56,14 @@ def regexp_bin(expr, item):
     return robj is not None
 
 
+def unpack_blob(codec, content):
+    if content is None:
+        return None
+    if codec == Database.BLOB_CODEC_ZLIB:
+        content = zlib.decompress(content)
+    return sqlite3.Binary(content)
+
+
 class FeedbackHandler(object):
 
     def __init__(self, database):
@@ -102,6 +116,45 @@ class FeedbackHandler(object):
         return bool(self.db.last_feedback)
 
 
+class SQLStmtHandle(object):
+    """
+    Handle on an SQL statement submitted to the :class:`Database` SQL handler.
+    It is resolved as soon as the statement has been processed.
+    """
+
+    def __init__(self, stmt, params=None, outcome_type=None, error_msg=''):
+        self.stmt = stmt
+        self.params = params
+        self.outcome_type = outcome_type
+        self.error_msg = error_msg
+        self._outcome = None
+        self._handled = threading.Event()
+
+    def _resolve(self, outcome):
+        self._outcome = outcome
+        self._handled.set()
+
+    def done(self):
+        return self._handled.is_set()
+
+    def wait(self, timeout=None):
+        """
+        Wait for the statement to be processed.
+
+        Returns:
+            bool: `True` if the statement has been processed, `False` if `timeout` expired
+        """
+        return self._handled.wait(timeout)
+
+    def result(self, timeout=None):
+        """
+        Wait for the statement to be processed and return its outcomes (`None` if outcomes
+        were not requested or if an error occurred).
+        """
+        self._handled.wait(timeout)
+        return self._outcome
+
+
 class Database(object):
 
     DDL_fname = 'fmk_db.sql'
@@ -113,7 +166,55 @@ class Database(object):
     OUTCOME_ROWID = 1
     OUTCOME_DATA = 2
 
-    def __init__(self, fmkdb_path=None):
+    # Markers that can be queued in place of an SQL statement
+    _CASE_END = 1
+    _FLUSH = 2
+
+    # Requests of a RemoteDatabase
+    _REMOTE_STMTS = 1
+    _REMOTE_RESERVE_IDS = 2
+    _REMOTE_CLOSE = 3
+
+    DEFAULT_COMMIT_PERIOD = 0.5
+    DEFAULT_COMMIT_MAX_STMTS = 1000
+
+    DEFAULT_CHUNK_SIZE = 500
+
+    # Content-addressed storage of DATA and FEEDBACK contents (table BLOBS)
+    BLOB_CODEC_RAW = 0
+    BLOB_CODEC_ZLIB = 1
+    BLOB_MIN_SIZE = 128
+    # the last compressed blobs are kept (within these limits) to avoid compressing
+    # again the contents that are recorded several times
+    BLOB_CACHE_SIZE = 4096
+    BLOB_CACHE_MAX_BYTES = 16 * 1024 * 1024
+
+    # SQL expressions that provide DATA and FEEDBACK contents, wherever they are stored
+    DATA_CONTENT = "COALESCE(DATA.CONTENT, (SELECT UNPACK_BLOB(BLOBS.CODEC, BLOBS.CONTENT) " \
+                   "FROM BLOBS WHERE BLOBS.HASH == DATA.CONTENT_HASH))"
+    FBK_CONTENT = "COALESCE(FEEDBACK.CONTENT, (SELECT UNPACK_BLOB(BLOBS.CODEC, BLOBS.CONTENT) " \
+                  "FROM BLOBS WHERE BLOBS.HASH == FEEDBACK.CONTENT_HASH))"
+
+    def __init__(self, fmkdb_path=None, group_commit=False,
+                 commit_period=DEFAULT_COMMIT_PERIOD, commit_max_stmts=DEFAULT_COMMIT_MAX_STMTS,
+                 migrate=True, blob_storage=True):
+        """
+        Args:
+            fmkdb_path (str): path to the database. If `None`, the default one within the
+              fuddly data folder is used.
+            migrate (bool): if `True`, the indexes missing from an existing database are
+              created when the database is started. Otherwise, refer to
+              :meth:`Database.build_indexes`. (Missing tables and columns are always added.)
+            blob_storage (bool): if `True`, DATA and FEEDBACK contents are compressed and
+              deduplicated within the table BLOBS (referenced by their hash).
+            group_commit (bool): if `False`, pending SQL statements are committed at the end
+              of each test case (refer to :meth:`Database.signal_test_case_end`). If `True`,
+              they are only committed once a flush window expires (refer to `commit_period`
+              and `commit_max_stmts`), trading durability for throughput.
+            commit_period (float): maximum amount of time (in seconds) a statement may stay
+              uncommitted.
+            commit_max_stmts (int): maximum number of statements that may stay uncommitted.
+        """
         self.name = 'fmkDB.db'
         if fmkdb_path is None:
             self.fmk_db_path = os.path.join(gr.fuddly_data_folder, self.name)
@@ -125,7 +226,14 @@ class Database(object):
 
         self.last_feedback = {}
 
-        self._data_id = None
+        # DATA.ID allocator (IDs are allocated on the client side so that DATA records and
+        # their related records can be submitted without waiting for the SQL handler)
+        self._data_id_lock = threading.Lock()
+        self._last_data_id = None
+
+        self._group_commit = group_commit
+        self._commit_period = commit_period
+        self._commit_max_stmts = commit_max_stmts
 
         self._sql_handler_thread = None
         self._sql_handler_stop_event = threading.Event()
@@ -133,14 +241,17 @@ class Database(object):
         self._thread_initialized = threading.Event()
         self._sql_stmt_submitted_cond = threading.Condition()
         self._sql_stmt_list = []
-        self._sql_stmt_handled = threading.Event()
-
-        self._sql_stmt_outcome_lock = threading.Lock()
-        self._sql_stmt_outcome = None
 
         self._sync_lock = threading.Lock()
 
         self._ok = None
+        self._migrate = migrate
+
+        self._blob_storage = blob_storage
+        self._packed_blobs = collections.OrderedDict()
+        self._packed_blobs_size = 0
+        self._packed_blobs_lock = threading.Lock()
+        self._missing_indexes = []
 
     def _is_valid(self, connection, cursor):
         valid = False
@@ -151,19 +262,44 @@ class Database(object):
             with tmp_con:
                 cur = tmp_con.cursor()
                 cur.executescript(fmk_db_sql)
-                cur.execute("select name from sqlite_master WHERE type='table'")
-                tables = map(lambda x: x[0], cur.fetchall())
-                tables = filter(lambda x: not x.startswith('sqlite'), tables)
-                for t in tables:
+                cursor.execute("select name from sqlite_master WHERE type='table'")
+                existing_tables = list(map(lambda x: x[0], cursor.fetchall()))
+                cur.execute("select name, sql from sqlite_master WHERE type='table'")
+                tables = filter(lambda x: not x[0].startswith('sqlite'), cur.fetchall())
+                # Tables and trailing columns introduced by newer fuddly versions are
+                # added to a valid database, as it is cheap.
+                upgrade_stmts = []
+                for t, t_sql in tables:
+                    if t not in existing_tables:
+                        upgrade_stmts.append(t_sql)
+                        continue
                     cur.execute('select * from {!s}'.format(t))
                     ref_names = list(map(lambda x: x[0], cur.description))
                     cursor.execute('select * from {!s}'.format(t))
                     names = list(map(lambda x: x[0], cursor.description))
-                    if ref_names != names:
+                    if ref_names[:len(names)] != names:
                         valid = False
                         break
+                    if ref_names != names:
+                        cur.execute('pragma table_info({!s})'.format(t))
+                        col_types = dict(map(lambda x: (x[1], x[2]), cur.fetchall()))
+                        for col in ref_names[len(names):]:
+                            upgrade_stmts.append('alter table {!s} add column {!s} {!s}'
+                                                 .format(t, col, col_types[col]))
                 else:
                     valid = True
+                    for stmt in upgrade_stmts:
+                        cursor.execute(stmt)
+
+                # Indexes are not mandatory for the database to be valid. Missing ones
+                # (e.g., within a database created by a previous fuddly version) are
+                # recorded in order to be created afterwards.
+                cur.execute("select name, sql from sqlite_master "
+                            "WHERE type='index' and sql is not null")
+                ref_indexes = cur.fetchall()
+                cursor.execute("select name from sqlite_master WHERE type='index'")
+                indexes = list(map(lambda x: x[0], cursor.fetchall()))
+                self._missing_indexes = list(filter(lambda x: x[0] not in indexes, ref_indexes))
 
         return valid
 
@@ -181,6 +317,19 @@ class Database(object):
                 cursor.executescript(fmk_db_sql)
                 self._ok = True
 
+        if self._ok and self._missing_indexes and self._migrate:
+            print("\n*** FmkDB migration: creating {:d} missing indexes (can take a while on "
+                  "large databases, use 'tools/fmkdb.py --build-indexes' to do it offline) ***"
+                  .format(len(self._missing_indexes)))
+            try:
+                with connection:
+                    for _, sql in self._missing_indexes:
+                        cursor.execute(sql)
+            except sqlite3.Error as e:
+                print("\n*** ERROR[SQL:{:s}] while creating indexes".format(e.args[0]))
+            else:
+                self._missing_indexes = []
+
         self._thread_initialized.set()
 
         if not self._ok:
@@ -188,68 +337,117 @@ class Database(object):
 
         connection.create_function("REGEXP", 2, regexp)
         connection.create_function("BINREGEXP", 2, regexp_bin)
+        connection.create_function("UNPACK_BLOB", 2, unpack_blob)
 
-        while not self._sql_handler_stop_event.is_set():
+        # WAL journaling avoids rewriting the database for each transaction and lets
+        # readers (e.g., tools/fmkdb.py) work concurrently with the fuzzing session.
+        try:
+            connection.execute("PRAGMA journal_mode=WAL")
+            connection.execute("PRAGMA synchronous=NORMAL")
+        except sqlite3.Error as e:
+            print("\n*** WARNING[SQL:{:s}] while enabling WAL journaling".format(e.args[0]))
+
+        self._pending_stmts = 0
+        self._first_pending_date = None
+
+        while True:
 
             with self._sql_stmt_submitted_cond:
-                self._sql_stmt_submitted_cond.wait(0.01)
+                # We are woken up by new submissions. A timeout is only used to honor the
+                # commit period of pending statements.
+                while not self._sql_stmt_list and not self._sql_handler_stop_event.is_set():
+                    if self._pending_stmts:
+                        timeout = self._first_pending_date + self._commit_period - time.time()
+                        if timeout <= 0:
+                            break
+                    else:
+                        timeout = None
+                    self._sql_stmt_submitted_cond.wait(timeout)
 
-                if self._sql_stmt_list:
-                    sql_stmts = self._sql_stmt_list
-                    self._sql_stmt_list = []
-                else:
-                    continue
+                if not self._sql_stmt_list and self._sql_handler_stop_event.is_set():
+                    break
+
+                sql_stmts = self._sql_stmt_list
+                self._sql_stmt_list = []
+
+            self._handle_sql_stmts(connection, cursor, sql_stmts)
+
+            if self._pending_stmts and \
+                    (self._pending_stmts >= self._commit_max_stmts
+                     or time.time() - self._first_pending_date >= self._commit_period):
+                self._commit(connection)
+
+        if self._pending_stmts:
+            self._commit(connection)
+
+        if connection:
+            connection.close()
+
+    def _handle_sql_stmts(self, connection, cursor, sql_stmts):
+        for handle in sql_stmts:
+            sql_stmt, sql_params = handle.stmt, handle.params
+            outcome_type, sql_error = handle.outcome_type, handle.error_msg
+            outcome = None
+
+            if sql_stmt == Database._CASE_END:
+                if not self._group_commit and self._pending_stmts:
+                    self._commit(connection)
 
-            last_stmt_error = True
-            for stmt in sql_stmts:
-                sql_stmt, sql_params, outcome_type, sql_error = stmt
+            elif sql_stmt == Database._FLUSH:
+                if self._pending_stmts:
+                    self._commit(connection)
+                outcome = True
+
+            else:
                 try:
                     if sql_params is None:
                         cursor.execute(sql_stmt)
                     else:
                         cursor.execute(sql_stmt, sql_params)
-                    connection.commit()
                 except sqlite3.Error as e:
-                    connection.rollback()
+                    # SQLite only reverts the failing statement, thus the other
+                    # statements of the current transaction are kept.
                     print("\n*** ERROR[SQL:{:s}] ".format(e.args[0])+sql_error)
-                    last_stmt_error = True
                 else:
-                    last_stmt_error = False
-
-            if outcome_type is not None:
-                with self._sql_stmt_outcome_lock:
-                    if self._sql_stmt_outcome is not None:
-                        print("\n*** WARNING: SQL statement outcomes have not been consumed."
-                              "\n    Will be overwritten!")
+                    self._pending_stmts += 1
+                    if self._first_pending_date is None:
+                        self._first_pending_date = time.time()
 
-                    if last_stmt_error:
-                        self._sql_stmt_outcome = None
+                    if outcome_type is None:
+                        pass
                     elif outcome_type == Database.OUTCOME_ROWID:
-                        self._sql_stmt_outcome = cursor.lastrowid
+                        outcome = cursor.lastrowid
                     elif outcome_type == Database.OUTCOME_DATA:
-                        self._sql_stmt_outcome = cursor.fetchall()
+                        outcome = cursor.fetchall()
                     else:
                         print("\n*** ERROR: Unrecognized outcome type request")
-                        self._sql_stmt_outcome = None
 
-                self._sql_stmt_handled.set()
+            handle._resolve(outcome)
 
-            self._sql_handler_stop_event.wait(0.01)
-
-        if connection:
-            connection.close()
+    def _commit(self, connection):
+        try:
+            connection.commit()
+        except sqlite3.Error as e:
+            connection.rollback()
+            print("\n*** ERROR[SQL:{:s}] while committing {:d} statements"
+                  .format(e.args[0], self._pending_stmts))
+        self._pending_stmts = 0
+        self._first_pending_date = None
 
     def _stop_sql_handler(self):
         with self._sync_lock:
-            self._sql_handler_stop_event.set()
+            with self._sql_stmt_submitted_cond:
+                self._sql_handler_stop_event.set()
+                self._sql_stmt_submitted_cond.notify()
             self._sql_handler_thread.join()
 
 
-    def submit_sql_stmt(self, stmt, params=None, outcome_type=None, error_msg=''):
+    def submit_sql_stmt_async(self, stmt, params=None, outcome_type=None, error_msg=''):
         """
         This method is the only one that should submit request to the threaded SQL handler.
-        It is also synchronized to guarantee request order (especially needed when you wait for
-        the outcomes of your submitted SQL statement).
+        It guarantees request order and never blocks: the SQL handler is woken up by the
+        submission and resolves the returned handle as soon as the statement is processed.
+        Statements are committed later on, in a batch, by the SQL handler.
 
         Args:
             stmt (str): SQL statement
@@ -257,26 +455,108 @@ class Database(object):
             outcome_type (int): type of the expected outcomes. If `None`, no outcomes are expected
             error_msg (str): specific error message to display in case of an error
 
+        Returns:
+            SQLStmtHandle: handle that provides the expected outcomes once resolved
+        """
+        handle = SQLStmtHandle(stmt, params=params, outcome_type=outcome_type,
+                               error_msg=error_msg)
+        with self._sql_stmt_submitted_cond:
+            self._sql_stmt_list.append(handle)
+            self._sql_stmt_submitted_cond.notify()
+        return handle
+
+    def submit_sql_stmt(self, stmt, params=None, outcome_type=None, error_msg=''):
+        """
+        Synchronous flavor of :meth:`Database.submit_sql_stmt_async`. Only the callers that
+        expect outcomes are blocked (until their statement is processed).
+
         Returns:
             `None` or the expected outcomes
         """
-        with self._sync_lock:
+        handle = self.submit_sql_stmt_async(stmt, params=params, outcome_type=outcome_type,
+                                            error_msg=error_msg)
+        if outcome_type is not None:
+            return handle.result()
 
-            with self._sql_stmt_submitted_cond:
-                self._sql_stmt_list.append((stmt, params, outcome_type, error_msg))
-                self._sql_stmt_submitted_cond.notify()
+    def signal_test_case_end(self):
+        """
+        Notify the SQL handler that all the records related to the current test case have been
+        submitted. They will be committed right away if group commit is disabled.
+        """
+        if not self.enabled:
+            return
+        self.submit_sql_stmt(Database._CASE_END)
+
+    def flush(self):
+        """
+        Commit all the pending SQL statements and wait for the commit to be performed.
+        """
+        self.submit_sql_stmt_async(Database._FLUSH).wait()
+
+    def _seed_data_id_allocator(self):
+        # AUTOINCREMENT never reuses IDs of deleted records, so we also consider the
+        # highest ID ever used (recorded in sqlite_sequence).
+        max_id = self.execute_sql_statement("SELECT MAX(ID) FROM DATA;")
+        seq = self.execute_sql_statement("SELECT SEQ FROM SQLITE_SEQUENCE WHERE NAME == 'DATA';")
+        max_id = max_id[0][0] if max_id and max_id[0][0] is not None else 0
+        seq = seq[0][0] if seq and seq[0][0] is not None else 0
+        with self._data_id_lock:
+            self._last_data_id = max(max_id, seq)
+
+    def reserve_data_ids(self, count=1):
+        """
+        Reserve a range of DATA IDs that can then be provided to :meth:`Database.insert_data`.
+
+        Args:
+            count (int): number of IDs to reserve
+
+        Returns:
+            tuple: first and last reserved IDs
+        """
+        with self._data_id_lock:
+            first_id = self._last_data_id + 1
+            self._last_data_id += count
+            return first_id, self._last_data_id
+
+    def serve_remote_client(self, conn):
+        """
+        Serve the requests of a :class:`RemoteDatabase` until it is stopped. The statements
+        it forwards are submitted to the SQL handler of this database, in their order, so
+        that only one process writes to the database.
 
-            if outcome_type is not None:
-                # If we care about outcomes, then we are sure to get outcomes from the just
-                # submitted SQL statement as this method is 'synchronized'.
-                while not self._sql_stmt_handled.is_set():
-                    self._sql_stmt_handled.wait(0.1)
-                self._sql_stmt_handled.clear()
+        Args:
+            conn: connection to the remote client (as provided by :func:`multiprocessing.Pipe`)
+        """
+        while True:
+            try:
+                req, arg = conn.recv()
+            except (EOFError, IOError):
+                break
+            if req == Database._REMOTE_STMTS:
+                handles = [self.submit_sql_stmt_async(stmt, params=params, outcome_type=outcome_type,
+                                                      error_msg=error_msg)
+                           for stmt, params, outcome_type, error_msg in arg]
+                conn.send([h.result() for h in handles])
+            elif req == Database._REMOTE_RESERVE_IDS:
+                conn.send(self.reserve_data_ids(arg))
+            elif req == Database._REMOTE_CLOSE:
+                break
+
+    def set_commit_policy(self, group_commit=None, commit_period=None, commit_max_stmts=None):
+        """
+        Change the durability knobs of the database (refer to :meth:`Database.__init__`).
+        `None` parameters are left unchanged.
+        """
+        if group_commit is not None:
+            self._group_commit = group_commit
+        if commit_period is not None:
+            self._commit_period = commit_period
+        if commit_max_stmts is not None:
+            self._commit_max_stmts = commit_max_stmts
 
-                with self._sql_stmt_outcome_lock:
-                    ret = self._sql_stmt_outcome
-                    self._sql_stmt_outcome = None
-                    return ret
+    @property
+    def group_commit(self):
+        return self._group_commit
 
     def start(self):
         if self._sql_handler_thread is not None:
@@ -292,6 +572,9 @@ class Database(object):
         while not self._thread_initialized.is_set():
             self._thread_initialized.wait(0.1)
 
+        if self._ok:
+            self._seed_data_id_allocator()
+
         self.enabled = self._ok
         return self._ok
 
@@ -299,7 +582,8 @@ class Database(object):
         self._stop_sql_handler()
         self.enabled = False
 
-    def enable(self):
+    def enable(self, group_commit=None):
+        self.set_commit_policy(group_commit=group_commit)
         self.enabled = True
 
     def disable(self):
@@ -311,6 +595,31 @@ class Database(object):
     def execute_sql_statement(self, sql_stmt, params=None):
         return self.submit_sql_stmt(sql_stmt, params=params, outcome_type=Database.OUTCOME_DATA)
 
+    def build_indexes(self, analyze=True, colorized=True):
+        """
+        Create the indexes missing from the database and (optionally) gather statistics
+        for the SQLite query planner.
+
+        Args:
+            analyze (bool): if `True`, run `ANALYZE` after the creation of the indexes
+            colorized (bool): if `True`, use colors for displaying information
+        """
+        colorize = self._get_color_function(colorized)
+
+        err_msg = 'while creating an index!'
+        for name, sql in self._missing_indexes:
+            print(colorize("*** Creating index {:s} ***".format(name), rgb=Color.FMKINFO))
+            self.submit_sql_stmt(sql, outcome_type=Database.OUTCOME_DATA, error_msg=err_msg)
+        self._missing_indexes = []
+
+        if analyze:
+            print(colorize("*** Gathering statistics for the query planner ***", rgb=Color.FMKINFO))
+            self.submit_sql_stmt("ANALYZE;", outcome_type=Database.OUTCOME_DATA,
+                                 error_msg='while analyzing the database!')
+
+        self.flush()
+        print(colorize("*** FmkDB indexes are up to date ***", rgb=Color.FMKINFO))
+
 
     def insert_data_model(self, dm_name):
         stmt = "INSERT INTO DATAMODEL(NAME) VALUES(?)"
@@ -336,42 +645,87 @@ class Database(object):
         self.submit_sql_stmt(stmt, params=params, error_msg=err_msg)
 
 
+    def _store_content(self, content):
+        """
+        Prepare a DATA or FEEDBACK content for being recorded. Large enough contents are
+        stored once in the table BLOBS, compressed, and referenced by their hash. The
+        blob is submitted each time (the table ignores the duplicates), as it may have
+        been removed meanwhile, e.g., by another process.
+
+        Returns:
+            tuple: the content to record inline (or `None`) and the hash of the blob (or `None`)
+        """
+        if not content:
+            return content, None
+
+        if not self._blob_storage or len(content) < self.BLOB_MIN_SIZE:
+            return sqlite3.Binary(content), None
+
+        content = bytes(content)
+        blob_hash = hashlib.sha1(content).hexdigest()
+
+        with self._packed_blobs_lock:
+            blob = self._packed_blobs.pop(blob_hash, None)
+            if blob is not None:
+                self._packed_blobs_size -= len(blob[1])
+
+        if blob is None:
+            packed = zlib.compress(content)
+            if len(packed) < len(content):
+                blob = (self.BLOB_CODEC_ZLIB, packed)
+            else:
+                blob = (self.BLOB_CODEC_RAW, content)
+
+        with self._packed_blobs_lock:
+            if blob_hash not in self._packed_blobs:
+                self._packed_blobs[blob_hash] = blob
+                self._packed_blobs_size += len(blob[1])
+            while len(self._packed_blobs) > self.BLOB_CACHE_SIZE or \
+                    self._packed_blobs_size > self.BLOB_CACHE_MAX_BYTES:
+                _, (_, packed) = self._packed_blobs.popitem(last=False)
+                self._packed_blobs_size -= len(packed)
+
+        codec, packed = blob
+        stmt = "INSERT INTO BLOBS(HASH,CODEC,CONTENT) VALUES(?,?,?)"
+        err_msg = 'while inserting a value into table BLOBS!'
+        self.submit_sql_stmt(stmt, params=(blob_hash, codec, sqlite3.Binary(packed)),
+                             error_msg=err_msg)
+
+        return None, blob_hash
+
     def insert_data(self, dtype, dm_name, raw_data, sz, sent_date, ack_date,
-                    target_name, prj_name, group_id=None):
+                    target_name, prj_name, group_id=None, data_id=None):
 
         if not self.enabled:
             return None
 
-        blob = sqlite3.Binary(raw_data)
+        if data_id is None:
+            data_id, _ = self.reserve_data_ids()
 
-        stmt = "INSERT INTO DATA(GROUP_ID,TYPE,DM_NAME,CONTENT,SIZE,SENT_DATE,ACK_DATE,"\
-               "TARGET,PRJ_NAME)"\
-               " VALUES(?,?,?,?,?,?,?,?,?)"
-        params = (group_id, dtype, dm_name, blob, sz, sent_date, ack_date, target_name, prj_name)
-        err_msg = 'while inserting a value into table DATA!'
+        blob, blob_hash = self._store_content(raw_data)
 
-        if self._data_id is None:
-            did = self.submit_sql_stmt(stmt, params=params, outcome_type=Database.OUTCOME_ROWID,
-                                       error_msg=err_msg)
-            self._data_id = did
-        else:
-            self.submit_sql_stmt(stmt, params=params, error_msg=err_msg)
-            self._data_id += 1
+        stmt = "INSERT INTO DATA(ID,GROUP_ID,TYPE,DM_NAME,CONTENT,SIZE,SENT_DATE,ACK_DATE,"\
+               "TARGET,PRJ_NAME,CONTENT_HASH)"\
+               " VALUES(?,?,?,?,?,?,?,?,?,?,?)"
+        params = (data_id, group_id, dtype, dm_name, blob, sz, sent_date, ack_date,
+                  target_name, prj_name, blob_hash)
+        err_msg = 'while inserting a value into table DATA!'
+        self.submit_sql_stmt(stmt, params=params, error_msg=err_msg)
 
-        return self._data_id
+        return data_id
 
 
     def insert_steps(self, data_id, step_id, dmaker_type, dmaker_name, data_id_src,
-                     user_input, info):
+                     user_input, info, rng_seed=None):
         if not self.enabled:
             return None
 
         if info:
             info = sqlite3.Binary(info)
 
-        stmt = "INSERT INTO STEPS(DATA_ID,STEP_ID,DMAKER_TYPE,DMAKER_NAME,DATA_ID_SRC,USER_INPUT,INFO)"\
-               " VALUES(?,?,?,?,?,?,?)"
-        params = (data_id, step_id, dmaker_type, dmaker_name, data_id_src, user_input, info)
+        stmt = "INSERT INTO STEPS(DATA_ID,STEP_ID,DMAKER_TYPE,DMAKER_NAME,DATA_ID_SRC,USER_INPUT,INFO,RNG_SEED)"\
+               " VALUES(?,?,?,?,?,?,?,?)"
+        params = (data_id, step_id, dmaker_type, dmaker_name, data_id_src, user_input, info, rng_seed)
         err_msg = 'while inserting a value into table STEPS!'
         self.submit_sql_stmt(stmt, params=params, error_msg=err_msg)
 
@@ -392,12 +746,11 @@ class Database(object):
         if not self.enabled:
             return None
 
-        if content:
-            content = sqlite3.Binary(content)
+        content, content_hash = self._store_content(content)
 
-        stmt = "INSERT INTO FEEDBACK(DATA_ID,SOURCE,DATE,CONTENT,STATUS)"\
-               " VALUES(?,?,?,?,?)"
-        params = (data_id, source, timestamp, content, status_code)
+        stmt = "INSERT INTO FEEDBACK(DATA_ID,SOURCE,DATE,CONTENT,STATUS,CONTENT_HASH)"\
+               " VALUES(?,?,?,?,?,?)"
+        params = (data_id, source, timestamp, content, status_code, content_hash)
         err_msg = 'while inserting a value into table FEEDBACK!'
         self.submit_sql_stmt(stmt, params=params, error_msg=err_msg)
 
@@ -438,26 +791,92 @@ class Database(object):
         self.submit_sql_stmt(stmt, params=params, error_msg=err_msg)
 
 
-    def fetch_data(self, start_id=1, end_id=-1):
-        ign_end_id = '--' if end_id < 1 else ''
+    def iter_data_id_chunks(self, first_id=1, last_id=None, where=None, params=(),
+                            chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Iterate over the DATA IDs in ascending order, by chunks. Only one chunk is kept in
+        memory at a time, whatever the size of the database.
+
+        Args:
+            first_id (int): first DATA ID to consider
+            last_id (int): last DATA ID to consider. If `None`, no upper bound is used.
+            where (str): additional SQL condition on the DATA records
+            params (tuple): parameters of the additional SQL condition
+            chunk_size (int): maximum number of IDs per chunk
+
+        Returns:
+            python generator: A generator that provides lists of DATA IDs
+        """
+        for chunk in self.iter_data_records('ID', first_id=first_id, last_id=last_id,
+                                            where=where, params=params, chunk_size=chunk_size,
+                                            by_chunk=True):
+            yield [rec[0] for rec in chunk]
+
+    def iter_data_records(self, columns, first_id=1, last_id=None, where=None, params=(),
+                          chunk_size=DEFAULT_CHUNK_SIZE, by_chunk=False):
+        """
+        Iterate over DATA records in ascending ID order. Records are retrieved from the database
+        by chunks (keyset pagination on DATA.ID), thus memory usage is bounded by `chunk_size`.
+
+        Args:
+            columns (str): the DATA columns to retrieve (SQL syntax, e.g., 'ID, CONTENT').
+              The first column shall be ID.
+            first_id (int): first DATA ID to consider
+            last_id (int): last DATA ID to consider. If `None`, no upper bound is used.
+            where (str): additional SQL condition on the DATA records
+            params (tuple): parameters of the additional SQL condition
+            chunk_size (int): maximum number of records retrieved at once
+            by_chunk (bool): if `True`, provide lists of records instead of records
+
+        Returns:
+            python generator: A generator that iterates over the requested records
+        """
+        stmt = "SELECT {:s} FROM DATA WHERE ID > ?".format(columns)
+        if last_id is not None:
+            stmt += " AND ID <= {:d}".format(last_id)
+        if where is not None:
+            stmt += " AND ({:s})".format(where)
+        stmt += " ORDER BY ID ASC LIMIT {:d};".format(chunk_size)
+
+        last_seen_id = first_id - 1
+        while True:
+            records = self.execute_sql_statement(stmt, params=(last_seen_id,) + tuple(params))
+            if not records:
+                break
+            if by_chunk:
+                yield records
+            else:
+                for rec in records:
+                    yield rec
+            if len(records) < chunk_size:
+                break
+            last_seen_id = records[-1][0]
+
+    def fetch_data(self, start_id=1, end_id=-1, chunk_size=DEFAULT_CHUNK_SIZE):
+        last_id = None if end_id < 1 else end_id
 
         stmt = \
             '''
-            SELECT DATA.ID, DATA.CONTENT, DATA.TYPE, DMAKERS.NAME, DATA.DM_NAME
+            SELECT DATA.ID, {content:s}, DATA.TYPE, DMAKERS.NAME, DATA.DM_NAME
             FROM DATA INNER JOIN DMAKERS
               ON DATA.TYPE = DMAKERS.TYPE AND DMAKERS.CLONE_TYPE IS NULL
-            WHERE DATA.ID >= {sid:d} {ign_eid:s} AND DATA.ID <= {eid:d}
+            WHERE DATA.ID >= {sid:d} AND DATA.ID <= {eid:d}
             UNION ALL
-            SELECT DATA.ID, DATA.CONTENT, DMAKERS.CLONE_TYPE AS TYPE, DMAKERS.CLONE_NAME AS NAME,
+            SELECT DATA.ID, {content:s}, DMAKERS.CLONE_TYPE AS TYPE, DMAKERS.CLONE_NAME AS NAME,
                    DATA.DM_NAME
             FROM DATA INNER JOIN DMAKERS
               ON DATA.TYPE = DMAKERS.TYPE AND DMAKERS.CLONE_TYPE IS NOT NULL
-            WHERE DATA.ID >= {sid:d} {ign_eid:s} AND DATA.ID <= {eid:d}
-            '''.format(sid = start_id, eid = end_id, ign_eid = ign_end_id)
-
-        ret = self.submit_sql_stmt(stmt, outcome_type=Database.OUTCOME_DATA)
-        return ret
+            WHERE DATA.ID >= {sid:d} AND DATA.ID <= {eid:d}
+            '''
 
+        for ids in self.iter_data_id_chunks(first_id=start_id, last_id=last_id,
+                                            chunk_size=chunk_size):
+            records = self.submit_sql_stmt(stmt.format(sid=ids[0], eid=ids[-1],
+                                                       content=Database.DATA_CONTENT),
+                                           outcome_type=Database.OUTCOME_DATA)
+            if records:
+                for rec in records:
+                    yield rec
 
     def _get_color_function(self, colorized):
         if not colorized:
@@ -471,8 +890,9 @@ class Database(object):
         colorize = self._get_color_function(colorized)
 
         data = self.execute_sql_statement(
-            "SELECT * FROM DATA "
-            "WHERE ID == {data_id:d};".format(data_id=data_id)
+            "SELECT ID, GROUP_ID, TYPE, DM_NAME, {content:s}, SIZE, SENT_DATE, ACK_DATE, "
+            "TARGET, PRJ_NAME FROM DATA "
+            "WHERE ID == {data_id:d};".format(data_id=data_id, content=Database.DATA_CONTENT)
         )
 
         if not data:
@@ -480,6 +900,18 @@ class Database(object):
 
         return data
 
+    def get_rng_seed(self, data_id):
+        """
+        Returns:
+          int: seed of the random number generator used for making the data `data_id`
+          (or `None` if it has not been recorded). Refer to :meth:`framework.data.Data.get_rng_seed`.
+        """
+        seeds = self.execute_sql_statement(
+            "SELECT RNG_SEED FROM STEPS "
+            "WHERE DATA_ID == {data_id:d} AND RNG_SEED IS NOT NULL;".format(data_id=data_id)
+        )
+        return seeds[0][0] if seeds else None
+
     def display_data_info(self, data_id, with_data=False, with_fbk=False, with_fmkinfo=True,
                           fbk_src=None, limit_data_sz=None, page_width=100, colorized=True,
                           raw=False):
@@ -495,7 +927,8 @@ class Database(object):
         data_id, gr_id, data_type, dm_name, data_content, size, sent_date, ack_date, tg, prj = data[0]
 
         steps = self.execute_sql_statement(
-            "SELECT * FROM STEPS "
+            "SELECT DATA_ID, STEP_ID, DMAKER_TYPE, DMAKER_NAME, DATA_ID_SRC, USER_INPUT, INFO, "
+            "RNG_SEED FROM STEPS "
             "WHERE DATA_ID == {data_id:d} "
             "ORDER BY STEP_ID ASC;".format(data_id=data_id)
         )
@@ -508,17 +941,17 @@ class Database(object):
 
         if fbk_src:
             feedback = self.execute_sql_statement(
-                "SELECT SOURCE, DATE, STATUS, CONTENT FROM FEEDBACK "
+                "SELECT SOURCE, DATE, STATUS, {content:s} FROM FEEDBACK "
                 "WHERE DATA_ID == ? AND SOURCE REGEXP ? "
-                "ORDER BY SOURCE ASC;",
+                "ORDER BY SOURCE ASC;".format(content=Database.FBK_CONTENT),
                 params=(data_id, fbk_src)
             )
         else:
             feedback = self.execute_sql_statement(
-                "SELECT SOURCE, DATE, STATUS, CONTENT FROM FEEDBACK "
+                "SELECT SOURCE, DATE, STATUS, {content:s} FROM FEEDBACK "
                 "WHERE DATA_ID == {data_id:d} "
                 "ORDER BY SOURCE"
-                " ASC;".format(data_id=data_id)
+                " ASC;".format(data_id=data_id, content=Database.FBK_CONTENT)
             )
 
         comments = self.execute_sql_statement(
@@ -566,6 +999,10 @@ class Database(object):
         msg += colorize("\n  Received: ", rgb=Color.FMKINFO) + colorize(ackd, rgb=Color.DATE)
         msg += colorize("\n      Size: ", rgb=Color.FMKINFO) + colorize(str(size) + ' Bytes',
                                                                         rgb=Color.FMKSUBINFO)
+        rng_seeds = [st[-1] for st in steps if st[-1] is not None]
+        if rng_seeds:
+            msg += colorize("\n  RNG Seed: ", rgb=Color.FMKINFO) + colorize(str(rng_seeds[0]),
+                                                                            rgb=Color.FMKSUBINFO)
         msg += colorize('\n' + line_pattern, rgb=Color.NEWLOGENTRY)
 
         prt(msg)
@@ -599,11 +1036,11 @@ class Database(object):
         first_pass = True
         prefix_sz = 7
         name_sep_sz = len(data_type)
-        for _, _, dmk_type, _, _, _, _ in steps:
+        for _, _, dmk_type, _, _, _, _, _ in steps:
             dmk_type_sz = 0 if dmk_type is None else len(dmk_type)
             name_sep_sz = dmk_type_sz if dmk_type_sz > name_sep_sz else name_sep_sz
         sid = 1
-        for _, step_id, dmk_type, dmk_name, id_src, ui, info in steps:
+        for _, step_id, dmk_type, dmk_name, id_src, ui, info, _ in steps:
             if first_pass:
                 if dmk_type is None:
                     assert (id_src is not None)
@@ -719,27 +1156,18 @@ class Database(object):
                                   limit_data_sz=None, raw=False, page_width=100, colorized=True):
         colorize = self._get_color_function(colorized)
 
+        where = "? <= SENT_DATE and SENT_DATE <= ?"
+        params = (start, end)
         if prj_name:
-            records = self.execute_sql_statement(
-                "SELECT ID FROM DATA "
-                "WHERE ? <= SENT_DATE and SENT_DATE <= ? and PRJ_NAME == ?;",
-                params=(start, end, prj_name)
-            )
-        else:
-            records = self.execute_sql_statement(
-                "SELECT ID FROM DATA "
-                "WHERE ? <= SENT_DATE and SENT_DATE <= ?;",
-                params=(start, end)
-            )
+            where += " and PRJ_NAME == ?"
+            params += (prj_name,)
 
-        if records:
-            for rec in records:
-                data_id = rec[0]
-                self.display_data_info(data_id, with_data=with_data, with_fbk=with_fbk,
-                                       with_fmkinfo=with_fmkinfo, fbk_src=fbk_src,
-                                       limit_data_sz=limit_data_sz, raw=raw, page_width=page_width,
-                                       colorized=colorized)
-        else:
+        found = self._display_data_info_by_chunks(
+            where=where, params=params, with_data=with_data, with_fbk=with_fbk,
+            with_fmkinfo=with_fmkinfo, fbk_src=fbk_src, limit_data_sz=limit_data_sz, raw=raw,
+            page_width=page_width, colorized=colorized)
+
+        if not found:
             print(colorize("*** ERROR: No data found between {!s} and {!s} ***".format(start, end),
                            rgb=Color.ERROR))
 
@@ -750,30 +1178,30 @@ class Database(object):
         colorize = self._get_color_function(colorized)
 
         if prj_name:
-            records = self.execute_sql_statement(
-                "SELECT ID FROM DATA "
-                "WHERE ? <= ID and ID <= ? and PRJ_NAME == ?;",
-                params=(first_id, last_id, prj_name)
-            )
+            where, params = "PRJ_NAME == ?", (prj_name,)
         else:
-            records = self.execute_sql_statement(
-                "SELECT ID FROM DATA "
-                "WHERE ? <= ID and ID <= ?;",
-                params=(first_id, last_id)
-            )
+            where, params = None, ()
 
-        if records:
-            for rec in records:
-                data_id = rec[0]
-                self.display_data_info(data_id, with_data=with_data, with_fbk=with_fbk,
-                                       with_fmkinfo=with_fmkinfo, fbk_src=fbk_src,
-                                       limit_data_sz=limit_data_sz, raw=raw, page_width=page_width,
-                                       colorized=colorized)
-        else:
+        found = self._display_data_info_by_chunks(
+            first_id=first_id, last_id=last_id, where=where, params=params,
+            with_data=with_data, with_fbk=with_fbk, with_fmkinfo=with_fmkinfo, fbk_src=fbk_src,
+            limit_data_sz=limit_data_sz, raw=raw, page_width=page_width, colorized=colorized)
+
+        if not found:
             print(colorize("*** ERROR: No data found between {!s} and {!s} ***".format(first_id,
                                                                                        last_id),
                            rgb=Color.ERROR))
 
+    def _display_data_info_by_chunks(self, first_id=1, last_id=None, where=None, params=(),
+                                     **kwargs):
+        found = False
+        for ids in self.iter_data_id_chunks(first_id=first_id, last_id=last_id, where=where,
+                                            params=params):
+            found = True
+            for data_id in ids:
+                self.display_data_info(data_id, **kwargs)
+        return found
+
     def display_stats(self, colorized=True):
         colorize = self._get_color_function(colorized)
 
@@ -807,74 +1235,163 @@ class Database(object):
             print(colorize("*** ERROR: Statistics are unavailable ***", rgb=Color.ERROR))
 
         data_records = self.execute_sql_statement(
-            "SELECT ID FROM DATA;"
+            "SELECT COUNT(*) FROM DATA;"
         )
-        nb_data_records = len(data_records)
+        nb_data_records = data_records[0][0] if data_records else 0
         title = colorize("Number of Data IDs: ", rgb=Color.FMKINFOGROUP)
         content = colorize("{:d}".format(nb_data_records), rgb=Color.FMKSUBINFO)
         print(title + content)
 
 
-    def export_data(self, first, last=None, colorized=True):
+    def export_data(self, first, last=None, colorized=True, nb_writers=1, progress=False,
+                    resume_file=None, chunk_size=DEFAULT_CHUNK_SIZE):
+        """
+        Export the content of DATA records to files within the `exported_data` folder.
+        Records are streamed from the database by chunks, thus memory usage is bounded
+        whatever the number of exported records.
+
+        Args:
+            first (int): first DATA ID to export
+            last (int): last DATA ID to export. If `None`, only `first` is exported.
+            colorized (bool): if `True`, use colors for displaying information
+            nb_writers (int): number of threads writing files in parallel
+            progress (bool): if `True`, report progress after each chunk instead of
+              reporting each exported record
+            resume_file (str): path to a file where the last exported DATA ID is recorded after
+              each chunk. If it already exists, the export resumes after the recorded ID.
+            chunk_size (int): number of records retrieved from the database at once
+
+        Returns:
+            int: number of exported records
+        """
         colorize = self._get_color_function(colorized)
 
-        if last is not None:
-            records = self.execute_sql_statement(
-                "SELECT ID, TYPE, DM_NAME, SENT_DATE, CONTENT FROM DATA "
-                "WHERE {start:d} <= ID and ID <= {end:d};".format(start=first,
-                                                                  end=last)
-            )
-        else:
-            records = self.execute_sql_statement(
-                "SELECT ID, TYPE, DM_NAME, SENT_DATE, CONTENT FROM DATA "
-                "WHERE ID == {data_id:d};".format(data_id=first)
-            )
+        if last is None:
+            last = first
 
-        if records:
-            base_dir = gr.exported_data_folder
-            prev_export_date = None
-            export_cpt = 0
+        resumed = False
+        if resume_file is not None and os.path.isfile(resume_file):
+            with open(resume_file) as fd:
+                last_exported_id = int(fd.read().strip() or 0)
+            if last_exported_id >= first:
+                print(colorize("*** Resuming export after Data ID #{:d} ***".format(last_exported_id),
+                               rgb=Color.FMKINFO))
+                first = last_exported_id + 1
+                resumed = True
 
-            for rec in records:
-                data_id, data_type, dm_name, sent_date, content = rec
+        # Files are written by a pool of threads fed through a bounded queue, in order to
+        # bound memory usage.
+        write_queue = queue.Queue(maxsize=max(2 * nb_writers, 1))
+        write_errors = []
 
-                file_extension = dm_name
+        def file_writer():
+            while True:
+                item = write_queue.get()
+                try:
+                    if item is None:
+                        return
+                    data_id, export_full_fn, content = item
+                    try:
+                        ensure_dir(export_full_fn)
+                        with open(export_full_fn, 'wb') as fd:
+                            fd.write(content)
+                    except (IOError, OSError) as e:
+                        write_errors.append((data_id, e))
+                    else:
+                        if not progress:
+                            print(colorize("Data ID #{:d} --> {:s}".format(data_id, export_full_fn),
+                                           rgb=Color.FMKINFO))
+                finally:
+                    write_queue.task_done()
+
+        writers = []
+        for i in range(max(nb_writers, 1)):
+            th = threading.Thread(None, file_writer, 'fmkdb_export_writer_{:d}'.format(i))
+            th.start()
+            writers.append(th)
+
+        base_dir = gr.exported_data_folder
+        prev_export_date = None
+        export_cpt = 0
+        nb_exported = 0
+
+        try:
+            for chunk in self.iter_data_records("ID, TYPE, DM_NAME, SENT_DATE, " +
+                                                Database.DATA_CONTENT,
+                                                first_id=first, last_id=last,
+                                                chunk_size=chunk_size, by_chunk=True):
+                for rec in chunk:
+                    data_id, data_type, dm_name, sent_date, content = rec
+
+                    file_extension = dm_name
+
+                    if sent_date is None:
+                        current_export_date = datetime.now().strftime("%Y-%m-%d-%H%M%S")
+                    else:
+                        current_export_date = sent_date.strftime("%Y-%m-%d-%H%M%S")
 
-                if sent_date is None:
-                    current_export_date = datetime.now().strftime("%Y-%m-%d-%H%M%S")
-                else:
-                    current_export_date = sent_date.strftime("%Y-%m-%d-%H%M%S")
+                    if current_export_date != prev_export_date:
+                        prev_export_date = current_export_date
+                        export_cpt = 0
+                    else:
+                        export_cpt += 1
+
+                    while True:
+                        export_fname = '{typ:s}_{date:s}_{cpt:0>2d}.{ext:s}'.format(
+                            date=current_export_date,
+                            cpt=export_cpt,
+                            ext=file_extension,
+                            typ=data_type)
+                        export_full_fn = os.path.join(base_dir, dm_name, export_fname)
+                        # do not overwrite what has been exported before the resumption
+                        if resumed and os.path.exists(export_full_fn):
+                            export_cpt += 1
+                        else:
+                            break
 
-                if current_export_date != prev_export_date:
-                    prev_export_date = current_export_date
-                    export_cpt = 0
-                else:
-                    export_cpt += 1
+                    write_queue.put((data_id, export_full_fn, content))
 
-                export_fname = '{typ:s}_{date:s}_{cpt:0>2d}.{ext:s}'.format(
-                    date=current_export_date,
-                    cpt=export_cpt,
-                    ext=file_extension,
-                    typ=data_type)
+                # the chunk is completely written before being recorded as exported
+                write_queue.join()
+                nb_exported += len(chunk)
+                last_exported_id = chunk[-1][0]
 
-                export_full_fn = os.path.join(base_dir, dm_name, export_fname)
-                ensure_dir(export_full_fn)
+                if resume_file is not None:
+                    with open(resume_file, 'w') as fd:
+                        fd.write(str(last_exported_id))
 
-                with open(export_full_fn, 'wb') as fd:
-                    fd.write(content)
+                if progress:
+                    print(colorize("*** {:d} data exported (last Data ID #{:d}) ***"
+                                   .format(nb_exported, last_exported_id), rgb=Color.FMKINFO))
+        finally:
+            for th in writers:
+                write_queue.put(None)
+            for th in writers:
+                th.join()
 
-                print(colorize("Data ID #{:d} --> {:s}".format(data_id, export_full_fn),
-                               rgb=Color.FMKINFO))
+        for data_id, err in write_errors:
+            print(colorize("*** ERROR: Data ID #{:d} cannot be exported ({!s}) ***".format(data_id, err),
+                           rgb=Color.ERROR))
 
-        else:
+        if nb_exported == 0:
             print(colorize("*** ERROR: The provided DATA IDs do not exist ***", rgb=Color.ERROR))
 
+        return nb_exported - len(write_errors)
+
     def remove_data(self, data_id, colorized=True):
         colorize = self._get_color_function(colorized)
 
         if not self.check_data_existence(data_id, colorized=colorized):
             return
 
+        blob_hashes = self.execute_sql_statement(
+            "SELECT CONTENT_HASH FROM DATA "
+            "WHERE ID == {data_id:d} AND CONTENT_HASH IS NOT NULL "
+            "UNION "
+            "SELECT CONTENT_HASH FROM FEEDBACK "
+            "WHERE DATA_ID == {data_id:d} AND CONTENT_HASH IS NOT NULL;".format(data_id=data_id)
+        )
+
         comments = self.execute_sql_statement(
             "DELETE FROM COMMENTS "
             "WHERE DATA_ID == {data_id:d};".format(data_id=data_id)
@@ -900,6 +1417,15 @@ class Database(object):
             "WHERE ID == {data_id:d};".format(data_id=data_id)
         )
 
+        # Blobs are shared between records, thus only the orphaned ones are removed
+        for blob_hash, in blob_hashes:
+            self.execute_sql_statement(
+                "DELETE FROM BLOBS WHERE HASH == ? "
+                "AND NOT EXISTS (SELECT 1 FROM DATA WHERE CONTENT_HASH == ?) "
+                "AND NOT EXISTS (SELECT 1 FROM FEEDBACK WHERE CONTENT_HASH == ?);",
+                params=(blob_hash, blob_hash, blob_hash)
+            )
+
         print(colorize("*** Data {:d} and all related records have been removed ***".format(data_id),
                        rgb=Color.FMKINFO))
 
@@ -982,13 +1508,14 @@ class Database(object):
 
         if fbk_src:
             fbk_records = self.execute_sql_statement(
-                "SELECT DATA_ID, STATUS, SOURCE, CONTENT FROM FEEDBACK "
-                "WHERE SOURCE REGEXP ?;",
+                "SELECT DATA_ID, STATUS, SOURCE, {content:s} FROM FEEDBACK "
+                "WHERE SOURCE REGEXP ?;".format(content=Database.FBK_CONTENT),
                 params=(fbk_src,)
             )
         else:
             fbk_records = self.execute_sql_statement(
-                "SELECT DATA_ID, STATUS, SOURCE, CONTENT FROM FEEDBACK;"
+                "SELECT DATA_ID, STATUS, SOURCE, {content:s} FROM FEEDBACK;"
+                .format(content=Database.FBK_CONTENT)
             )
 
         prj_records = self.get_project_record(prj_name)
@@ -1048,14 +1575,15 @@ class Database(object):
 
         if fbk_src:
             fbk_records = self.execute_sql_statement(
-                "SELECT DATA_ID, CONTENT, SOURCE FROM FEEDBACK "
-                "WHERE SOURCE REGEXP ? AND BINREGEXP(?,CONTENT);",
+                "SELECT DATA_ID, {content:s} AS FBK_CONTENT, SOURCE FROM FEEDBACK "
+                "WHERE SOURCE REGEXP ? AND BINREGEXP(?,FBK_CONTENT);"
+                .format(content=Database.FBK_CONTENT),
                 params=(fbk_src, fbk)
             )
         else:
             fbk_records = self.execute_sql_statement(
-                "SELECT DATA_ID, CONTENT, SOURCE FROM FEEDBACK "
-                "WHERE BINREGEXP(?,CONTENT);",
+                "SELECT DATA_ID, {content:s} AS FBK_CONTENT, SOURCE FROM FEEDBACK "
+                "WHERE BINREGEXP(?,FBK_CONTENT);".format(content=Database.FBK_CONTENT),
                 params=(fbk,)
             )
 
@@ -1098,4 +1626,81 @@ class Database(object):
         else:
             print(colorize("*** No data has been found for analysis ***", rgb=Color.FMKINFO))
 
-        return data_list
\ No newline at end of file
+        return data_list
+
+
+class RemoteDatabase(Database):
+    """
+    FmkDB used by fuddly worker processes (refer to :mod:`framework.workers`). It does not
+    access the database file. Its SQL statements are forwarded to the process owning the
+    database, which serves them through :meth:`Database.serve_remote_client`. DATA IDs are
+    reserved the same way, thus they are unique among all the workers.
+
+    Statements are forwarded asynchronously, and their order is only preserved among the
+    ones submitted through the same `RemoteDatabase`. Thus, a read made through one of
+    them may not see the writes submitted through another one, unless the latter has been
+    flushed first (refer to :meth:`Database.flush`).
+    """
+
+    def __init__(self, conn, **kwargs):
+        """
+        Args:
+            conn: connection to the process owning the database (as provided by
+              :func:`multiprocessing.Pipe`)
+        """
+        Database.__init__(self, **kwargs)
+        self._conn = conn
+        self._conn_lock = threading.Lock()
+
+    def _request(self, req, arg):
+        with self._conn_lock:
+            self._conn.send((req, arg))
+            return self._conn.recv()
+
+    # sqlite3.Binary objects cannot be pickled
+    _BINARY_TYPES = (memoryview,) if six.PY3 else (memoryview, buffer)
+
+    @classmethod
+    def _picklable(cls, params):
+        if params is None:
+            return None
+        return tuple(bytes(p) if isinstance(p, cls._BINARY_TYPES) else p for p in params)
+
+    def _sql_handler(self):
+        self._ok = True
+        self._thread_initialized.set()
+
+        while True:
+            with self._sql_stmt_submitted_cond:
+                while not self._sql_stmt_list and not self._sql_handler_stop_event.is_set():
+                    self._sql_stmt_submitted_cond.wait()
+
+                if not self._sql_stmt_list and self._sql_handler_stop_event.is_set():
+                    break
+
+                sql_stmts = self._sql_stmt_list
+                self._sql_stmt_list = []
+
+            stmts = [(h.stmt, self._picklable(h.params), h.outcome_type, h.error_msg)
+                     for h in sql_stmts]
+            try:
+                outcomes = self._request(Database._REMOTE_STMTS, stmts)
+            except (EOFError, IOError):
+                print("\n*** ERROR: the connection to the FmkDB has been lost")
+                outcomes = [None] * len(sql_stmts)
+            for handle, outcome in zip(sql_stmts, outcomes):
+                handle._resolve(outcome)
+
+    def _seed_data_id_allocator(self):
+        pass
+
+    def reserve_data_ids(self, count=1):
+        return self._request(Database._REMOTE_RESERVE_IDS, count)
+
+    def stop(self):
+        Database.stop(self)
+        try:
+            with self._conn_lock:
+                self._conn.send((Database._REMOTE_CLOSE, None))
+        except IOError:
+            pass
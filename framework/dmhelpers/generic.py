@@ -24,6 +24,8 @@
 from framework.node import *
 
 import datetime
+import struct
+import zlib
 
 #####################
 # Data Model Helper #
@@ -157,23 +159,28 @@ def LEN(vt=fvt.INT_str, base_len=0,
       freezable (bool): If ``False`` make the generator unfreezable in order to always provide
         the right value. (Note that tTYPE will still be able to corrupt the generator.)
     """
-    class Length(object):
-        unfreezable = not freezable
-
-        def __init__(self, vt, set_attrs, clear_attrs):
-            self.vt = vt
-            self.set_attrs = set_attrs
-            self.clear_attrs = clear_attrs
-
-        def __call__(self, node):
-            blob = node.to_bytes() if after_encoding else node.get_raw_value()
-            n = Node('cts', value_type=self.vt(values=[len(blob)+base_len], force_mode=True))
-            n.set_semantics(NodeSemantics(['len']))
-            MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
-            return n
-
     vt = MH._validate_int_vt(vt)
-    return Length(vt, set_attrs, clear_attrs)
+    return _Length(vt, base_len, set_attrs, clear_attrs, after_encoding, freezable)
+
+# The generators are defined at the module level so that the data models
+# using them can be pickled.
+
+class _Length(object):
+
+    def __init__(self, vt, base_len, set_attrs, clear_attrs, after_encoding, freezable):
+        self.vt = vt
+        self.base_len = base_len
+        self.set_attrs = set_attrs
+        self.clear_attrs = clear_attrs
+        self.after_encoding = after_encoding
+        self.unfreezable = not freezable
+
+    def __call__(self, node):
+        blob = node.to_bytes() if self.after_encoding else node.get_raw_value()
+        n = Node('cts', value_type=self.vt(values=[len(blob)+self.base_len], force_mode=True))
+        n.set_semantics(NodeSemantics(['len']))
+        MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
+        return n
 
 
 def QTY(node_name, vt=fvt.INT_str,
@@ -191,24 +198,24 @@ def QTY(node_name, vt=fvt.INT_str,
       freezable (bool): If ``False`` make the generator unfreezable in order to always provide
         the right value. (Note that tTYPE will still be able to corrupt the generator.)
     """
-    class Qty(object):
-        unfreezable = not freezable
-
-        def __init__(self, node_name, vt, set_attrs, clear_attrs):
-            self.node_name = node_name
-            self.vt = vt
-            self.set_attrs = set_attrs
-            self.clear_attrs = clear_attrs
-
-        def __call__(self, node):
-            nb = node.cc.get_drawn_node_qty(self.node_name)
-            n = Node('cts', value_type=self.vt(values=[nb], force_mode=True))
-            n.set_semantics(NodeSemantics(['qty']))
-            MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
-            return n
-
     vt = MH._validate_int_vt(vt)
-    return Qty(node_name, vt, set_attrs, clear_attrs)
+    return _Qty(node_name, vt, set_attrs, clear_attrs, freezable)
+
+class _Qty(object):
+
+    def __init__(self, node_name, vt, set_attrs, clear_attrs, freezable):
+        self.node_name = node_name
+        self.vt = vt
+        self.set_attrs = set_attrs
+        self.clear_attrs = clear_attrs
+        self.unfreezable = not freezable
+
+    def __call__(self, node):
+        nb = node.cc.get_drawn_node_qty(self.node_name)
+        n = Node('cts', value_type=self.vt(values=[nb], force_mode=True))
+        n.set_semantics(NodeSemantics(['qty']))
+        MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
+        return n
 
 
 def TIMESTAMP(time_format="%H%M%S", utc=False,
@@ -221,18 +228,18 @@ def TIMESTAMP(time_format="%H%M%S", utc=False,
       set_attrs (list): attributes that will be set on the generated node.
       clear_attrs (list): attributes that will be cleared on the generated node.
     """
-    def timestamp(time_format, utc, set_attrs, clear_attrs):
-        if utc:
-            now = datetime.datetime.utcnow()
-        else:
-            now = datetime.datetime.now()
-        ts = now.strftime(time_format)
-        n = Node('cts', value_type=fvt.String(values=[ts], size=len(ts)))
-        n.set_semantics(NodeSemantics(['timestamp']))
-        MH._handle_attrs(n, set_attrs, clear_attrs)
-        return n
+    return functools.partial(_timestamp, time_format, utc, set_attrs, clear_attrs)
 
-    return functools.partial(timestamp, time_format, utc, set_attrs, clear_attrs)
+def _timestamp(time_format, utc, set_attrs, clear_attrs):
+    if utc:
+        now = datetime.datetime.utcnow()
+    else:
+        now = datetime.datetime.now()
+    ts = now.strftime(time_format)
+    n = Node('cts', value_type=fvt.String(values=[ts], size=len(ts)))
+    n.set_semantics(NodeSemantics(['timestamp']))
+    MH._handle_attrs(n, set_attrs, clear_attrs)
+    return n
 
 
 def CRC(vt=fvt.INT_str, poly=0x104c11db7, init_crc=0, xor_out=0xFFFFFFFF, rev=True,
@@ -254,45 +261,178 @@ def CRC(vt=fvt.INT_str, poly=0x104c11db7, init_crc=0, xor_out=0xFFFFFFFF, rev=Tr
       freezable (bool): if ``False`` make the generator unfreezable in order to always provide
         the right value. (Note that tTYPE will still be able to corrupt the generator.)
     """
-    class Crc(object):
-        unfreezable = not freezable
-
-        def __init__(self, vt, poly, init_crc, xor_out, rev, set_attrs, clear_attrs):
-            self.vt = vt
-            self.poly = poly
-            self.init_crc = init_crc
-            self.xor_out = xor_out
-            self.rev = rev
-            self.set_attrs = set_attrs
-            self.clear_attrs = clear_attrs
-
-        def __call__(self, nodes):
-            crc_func = crcmod.mkCrcFun(self.poly, initCrc=self.init_crc,
-                                       xorOut=self.xor_out, rev=self.rev)
-            if isinstance(nodes, Node):
-                s = nodes.to_bytes() if after_encoding else nodes.get_raw_value()
-            else:
-                if issubclass(nodes.__class__, NodeAbstraction):
-                    nodes = nodes.get_concrete_nodes()
-                elif not isinstance(nodes, (tuple, list)):
-                    raise TypeError("Contents of 'nodes' parameter is incorrect!")
-                s = b''
-                for n in nodes:
-                    blob = n.to_bytes() if after_encoding else n.get_raw_value()
-                    s += blob
-
-            result = crc_func(s)
-
-            n = Node('cts', value_type=self.vt(values=[result], force_mode=True))
-            n.set_semantics(NodeSemantics(['crc']))
-            MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
-            return n
-
     if not crcmod_module:
         raise NotImplementedError('the CRC template has been disabled because python-crcmod module is not installed!')
 
     vt = MH._validate_int_vt(vt)
-    return Crc(vt, poly, init_crc, xor_out, rev, set_attrs, clear_attrs)
+    return _Crc(vt, poly, init_crc, xor_out, rev, set_attrs, clear_attrs, after_encoding, freezable)
+
+
+def CRC16(variant='crc-ccitt-false', vt=fvt.UINT16_be,
+          set_attrs=None, clear_attrs=None, after_encoding=True, freezable=False):
+    """
+    Return a *generator* that returns a 16-bit CRC (in the chosen type) of
+    all the node parameters.
+
+    Args:
+      variant (str): name of the CRC-16 algorithm, as defined by the module
+        `crcmod.predefined` (e.g., 'crc-16', 'crc-ccitt-false', 'modbus', 'x-25',
+        'xmodem', 'kermit', ...)
+      vt (type): value type used for node generation (refer to :mod:`framework.value_types`)
+      set_attrs (list): attributes that will be set on the generated node.
+      clear_attrs (list): attributes that will be cleared on the generated node.
+      after_encoding (bool): if False compute the CRC before any encoding. Can be
+        set to False only if node arguments support encoding.
+      freezable (bool): if ``False`` make the generator unfreezable in order to always provide
+        the right value. (Note that tTYPE will still be able to corrupt the generator.)
+    """
+    if not crcmod_module:
+        raise NotImplementedError('the CRC16 template has been disabled because python-crcmod module is not installed!')
+
+    import crcmod.predefined
+    crc = crcmod.predefined.PredefinedCrc(variant)
+    if crc.digest_size != 2:
+        raise ValueError("'{:s}' is not a CRC-16 algorithm".format(variant))
+
+    vt = MH._validate_int_vt(vt)
+    return _Crc(vt, crc.poly, crc.initCrc, crc.xorOut, crc.reverse, set_attrs, clear_attrs,
+                after_encoding, freezable)
+
+
+def ADLER32(vt=fvt.UINT32_be,
+            set_attrs=None, clear_attrs=None, after_encoding=True, freezable=False):
+    """
+    Return a *generator* that returns the Adler-32 checksum (in the chosen type) of
+    all the node parameters.
+
+    Args:
+      vt (type): value type used for node generation (refer to :mod:`framework.value_types`)
+      set_attrs (list): attributes that will be set on the generated node.
+      clear_attrs (list): attributes that will be cleared on the generated node.
+      after_encoding (bool): if False compute the checksum before any encoding. Can be
+        set to False only if node arguments support encoding.
+      freezable (bool): if ``False`` make the generator unfreezable in order to always provide
+        the right value. (Note that tTYPE will still be able to corrupt the generator.)
+    """
+    vt = MH._validate_int_vt(vt)
+    return _Adler32(vt, set_attrs, clear_attrs, after_encoding, freezable)
+
+
+def IP_CHECKSUM(vt=fvt.UINT16_be,
+                set_attrs=None, clear_attrs=None, after_encoding=True, freezable=False):
+    """
+    Return a *generator* that returns the Internet checksum (RFC 1071, used by
+    IP, ICMP, UDP, TCP, ...) in the chosen type, of all the node parameters.
+
+    Args:
+      vt (type): value type used for node generation (refer to :mod:`framework.value_types`)
+      set_attrs (list): attributes that will be set on the generated node.
+      clear_attrs (list): attributes that will be cleared on the generated node.
+      after_encoding (bool): if False compute the checksum before any encoding. Can be
+        set to False only if node arguments support encoding.
+      freezable (bool): if ``False`` make the generator unfreezable in order to always provide
+        the right value. (Note that tTYPE will still be able to corrupt the generator.)
+    """
+    vt = MH._validate_int_vt(vt)
+    return _IPChecksum(vt, set_attrs, clear_attrs, after_encoding, freezable)
+
+
+def _node_blobs(nodes, after_encoding):
+    if isinstance(nodes, Node):
+        yield nodes.to_bytes() if after_encoding else nodes.get_raw_value()
+    else:
+        if issubclass(nodes.__class__, NodeAbstraction):
+            nodes = nodes.get_concrete_nodes()
+        elif not isinstance(nodes, (tuple, list)):
+            raise TypeError("Contents of 'nodes' parameter is incorrect!")
+        for n in nodes:
+            yield n.to_bytes() if after_encoding else n.get_raw_value()
+
+# CRC functions are shared by every generator using the same parameters, as
+# building their tables is costly
+_crc_funcs = {}
+
+def _get_crc_func(poly, init_crc, xor_out, rev):
+    key = (poly, init_crc, xor_out, rev)
+    crc_func = _crc_funcs.get(key)
+    if crc_func is None:
+        crc_func = crcmod.mkCrcFun(poly, initCrc=init_crc, xorOut=xor_out, rev=rev)
+        _crc_funcs[key] = crc_func
+    return crc_func
+
+class _Checksum(object):
+
+    semantics = None
+
+    def __init__(self, vt, set_attrs, clear_attrs, after_encoding, freezable):
+        self.vt = vt
+        self.set_attrs = set_attrs
+        self.clear_attrs = clear_attrs
+        self.after_encoding = after_encoding
+        self.unfreezable = not freezable
+
+    def compute(self, blobs):
+        raise NotImplementedError
+
+    def __call__(self, nodes):
+        result = self.compute(_node_blobs(nodes, self.after_encoding))
+
+        n = Node('cts', value_type=self.vt(values=[result], force_mode=True))
+        n.set_semantics(NodeSemantics([self.semantics]))
+        MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
+        return n
+
+class _Crc(_Checksum):
+
+    semantics = 'crc'
+
+    def __init__(self, vt, poly, init_crc, xor_out, rev, set_attrs, clear_attrs,
+                 after_encoding, freezable):
+        _Checksum.__init__(self, vt, set_attrs, clear_attrs, after_encoding, freezable)
+        self.poly = poly
+        self.init_crc = init_crc
+        self.xor_out = xor_out
+        self.rev = rev
+
+    def compute(self, blobs):
+        crc_func = _get_crc_func(self.poly, self.init_crc, self.xor_out, self.rev)
+        crc = crc_func(b'')
+        for blob in blobs:
+            crc = crc_func(blob, crc)
+        return crc
+
+class _Adler32(_Checksum):
+
+    semantics = 'checksum'
+
+    def compute(self, blobs):
+        cksum = 1
+        for blob in blobs:
+            cksum = zlib.adler32(blob, cksum)
+        return cksum & 0xFFFFFFFF
+
+class _IPChecksum(_Checksum):
+
+    semantics = 'checksum'
+
+    def compute(self, blobs):
+        cksum = 0
+        odd_byte = None
+        for blob in blobs:
+            if not blob:
+                continue
+            if odd_byte is not None:
+                blob = odd_byte + blob
+            if len(blob) % 2:
+                blob, odd_byte = blob[:-1], blob[-1:]
+            else:
+                odd_byte = None
+            cksum += sum(struct.unpack('>{:d}H'.format(len(blob) // 2), blob))
+        if odd_byte is not None:
+            cksum += struct.unpack('B', odd_byte)[0] << 8
+        while cksum >> 16:
+            cksum = (cksum & 0xFFFF) + (cksum >> 16)
+        return ~cksum & 0xFFFF
 
 
 
@@ -313,45 +453,34 @@ def WRAP(func, vt=fvt.String,
       freezable (bool): If ``False`` make the generator unfreezable in order to always provide
         the right value. (Note that tTYPE will still be able to corrupt the generator.)
     """
-    class WrapFunc(object):
-        unfreezable = not freezable
-
-        def __init__(self, vt, func, set_attrs, clear_attrs):
-            self.vt = vt
-            self.func = func
-            self.set_attrs = set_attrs
-            self.clear_attrs = clear_attrs
-
-        def __call__(self, nodes):
-            if isinstance(nodes, Node):
-                s = nodes.to_bytes() if after_encoding else nodes.get_raw_value()
-            else:
-                if issubclass(nodes.__class__, NodeAbstraction):
-                    nodes = nodes.get_concrete_nodes()
-                elif not isinstance(nodes, (tuple, list)):
-                    raise TypeError("Contents of 'nodes' parameter is incorrect!")
-                s = b''
-                for n in nodes:
-                    blob = n.to_bytes() if after_encoding else n.get_raw_value()
-                    s += blob
-
-            result = self.func(s)
-
-            if issubclass(self.vt, fvt.String):
-                result = convert_to_internal_repr(result)
-            else:
-                assert isinstance(result, int)
+    vt = MH._validate_vt(vt)
+    return _WrapFunc(vt, func, set_attrs, clear_attrs, after_encoding, freezable)
 
-            if issubclass(vt, fvt.INT):
-                vt_obj = self.vt(values=[result], force_mode=True)
-            else:
-                vt_obj = self.vt(values=[result])
-            n = Node('cts', value_type=vt_obj)
-            MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
-            return n
+class _WrapFunc(object):
 
-    vt = MH._validate_vt(vt)
-    return WrapFunc(vt, func, set_attrs, clear_attrs)
+    def __init__(self, vt, func, set_attrs, clear_attrs, after_encoding, freezable):
+        self.vt = vt
+        self.func = func
+        self.set_attrs = set_attrs
+        self.clear_attrs = clear_attrs
+        self.after_encoding = after_encoding
+        self.unfreezable = not freezable
+
+    def __call__(self, nodes):
+        result = self.func(b''.join(_node_blobs(nodes, self.after_encoding)))
+
+        if issubclass(self.vt, fvt.String):
+            result = convert_to_internal_repr(result)
+        else:
+            assert isinstance(result, int)
+
+        if issubclass(self.vt, fvt.INT):
+            vt_obj = self.vt(values=[result], force_mode=True)
+        else:
+            vt_obj = self.vt(values=[result])
+        n = Node('cts', value_type=vt_obj)
+        MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
+        return n
 
 
 def CYCLE(vals, depth=1, vt=fvt.String,
@@ -371,39 +500,39 @@ def CYCLE(vals, depth=1, vt=fvt.String,
       set_attrs (list): attributes that will be set on the generated node.
       clear_attrs (list): attributes that will be cleared on the generated node.
     """
-    class Cycle(object):
-        provide_helpers = True
-
-        def __init__(self, vals, depth, vt, set_attrs, clear_attrs):
-            self.vals = vals
-            self.vals_sz = len(vals)
-            self.vt = vt
-            self.depth = depth
-            self.set_attrs = set_attrs
-            self.clear_attrs = clear_attrs
-
-        def __call__(self, helper):
-            info = helper.graph_info
-            # print('INFO: ', info)
-            try:
-                clone_info, name = info[self.depth]
-                idx, total = clone_info
-            except:
-                idx = 0
-            idx = idx % self.vals_sz
-            if issubclass(self.vt, fvt.INT):
-                vtype = self.vt(values=[self.vals[idx]])
-            elif issubclass(self.vt, fvt.String):
-                vtype = self.vt(values=[self.vals[idx]])
-            else:
-                raise NotImplementedError('Value type not supported')
-
-            n = Node('cts', value_type=vtype)
-            MH._handle_attrs(n, set_attrs, clear_attrs)
-            return n
-
     assert(not issubclass(vt, fvt.BitField))
-    return Cycle(vals, depth, vt, set_attrs, clear_attrs)
+    return _Cycle(vals, depth, vt, set_attrs, clear_attrs)
+
+class _Cycle(object):
+    provide_helpers = True
+
+    def __init__(self, vals, depth, vt, set_attrs, clear_attrs):
+        self.vals = vals
+        self.vals_sz = len(vals)
+        self.vt = vt
+        self.depth = depth
+        self.set_attrs = set_attrs
+        self.clear_attrs = clear_attrs
+
+    def __call__(self, helper):
+        info = helper.graph_info
+        # print('INFO: ', info)
+        try:
+            clone_info, name = info[self.depth]
+            idx, total = clone_info
+        except:
+            idx = 0
+        idx = idx % self.vals_sz
+        if issubclass(self.vt, fvt.INT):
+            vtype = self.vt(values=[self.vals[idx]])
+        elif issubclass(self.vt, fvt.String):
+            vtype = self.vt(values=[self.vals[idx]])
+        else:
+            raise NotImplementedError('Value type not supported')
+
+        n = Node('cts', value_type=vtype)
+        MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
+        return n
 
 
 def OFFSET(use_current_position=True, depth=1, vt=fvt.INT_str,
@@ -438,56 +567,58 @@ def OFFSET(use_current_position=True, depth=1, vt=fvt.INT_str,
       freezable (bool): If ``False`` make the generator unfreezable in order to always provide
         the right value. (Note that tTYPE will still be able to corrupt the generator.)
     """
-    class Offset(object):
-        provide_helpers = True
-        unfreezable = not freezable
-
-        def __init__(self, use_current_position, depth, vt, set_attrs, clear_attrs):
-            self.vt = vt
-            self.use_current_position = use_current_position
-            self.depth = depth
-            self.set_attrs = set_attrs
-            self.clear_attrs = clear_attrs
-
-        def __call__(self, nodes, helper):
-            if self.use_current_position:
-                info = helper.graph_info
-                try:
-                    clone_info, name = info[self.depth]
-                    idx, total = clone_info
-                except:
-                    idx = 0
-
-            if isinstance(nodes, Node):
-                assert(self.use_current_position)
-                base = 0
-                off = nodes.get_subnode_off(idx)
-            else:
-                if issubclass(nodes.__class__, NodeAbstraction):
-                    nodes = nodes.get_concrete_nodes()
-                elif not isinstance(nodes, (tuple, list)):
-                    raise TypeError("Contents of 'nodes' parameter is incorrect!")
-
-                if not self.use_current_position:
-                    child = nodes[-2]
-                    parent = nodes[-1]
-                    parent.get_value()
-                    idx = parent.get_subnode_idx(child)
-
-                s = b''
-                end = -1 if self.use_current_position else -2
-                for n in nodes[:end]:
-                    blob = n.to_bytes() if after_encoding else n.get_raw_value()
-                    s += blob
-                base = len(s)
-                off = nodes[-1].get_subnode_off(idx)
-
-            n = Node('cts_off', value_type=self.vt(values=[base+off], force_mode=True))
-            MH._handle_attrs(n, set_attrs, clear_attrs)
-            return n
-
     vt = MH._validate_int_vt(vt)
-    return Offset(use_current_position, depth, vt, set_attrs, clear_attrs)
+    return _Offset(use_current_position, depth, vt, set_attrs, clear_attrs, after_encoding, freezable)
+
+class _Offset(object):
+    provide_helpers = True
+
+    def __init__(self, use_current_position, depth, vt, set_attrs, clear_attrs,
+                 after_encoding, freezable):
+        self.vt = vt
+        self.use_current_position = use_current_position
+        self.depth = depth
+        self.set_attrs = set_attrs
+        self.clear_attrs = clear_attrs
+        self.after_encoding = after_encoding
+        self.unfreezable = not freezable
+
+    def __call__(self, nodes, helper):
+        if self.use_current_position:
+            info = helper.graph_info
+            try:
+                clone_info, name = info[self.depth]
+                idx, total = clone_info
+            except:
+                idx = 0
+
+        if isinstance(nodes, Node):
+            assert(self.use_current_position)
+            base = 0
+            off = nodes.get_subnode_off(idx)
+        else:
+            if issubclass(nodes.__class__, NodeAbstraction):
+                nodes = nodes.get_concrete_nodes()
+            elif not isinstance(nodes, (tuple, list)):
+                raise TypeError("Contents of 'nodes' parameter is incorrect!")
+
+            if not self.use_current_position:
+                child = nodes[-2]
+                parent = nodes[-1]
+                parent.get_value()
+                idx = parent.get_subnode_idx(child)
+
+            s = b''
+            end = -1 if self.use_current_position else -2
+            for n in nodes[:end]:
+                blob = n.to_bytes() if self.after_encoding else n.get_raw_value()
+                s += blob
+            base = len(s)
+            off = nodes[-1].get_subnode_off(idx)
+
+        n = Node('cts_off', value_type=self.vt(values=[base+off], force_mode=True))
+        MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
+        return n
 
 
 def COPY_VALUE(path, depth=None, vt=None,
@@ -516,55 +647,54 @@ def COPY_VALUE(path, depth=None, vt=None,
       after_encoding (bool): if False, copy the raw value, otherwise the encoded one. Can be
         set to False only if node arguments support encoding.
     """
-    class CopyValue(object):
-        provide_helpers = True
-
-        def __init__(self, path, depth, vt, set_attrs, clear_attrs):
-            self.vt = vt
-            self.path = path
-            self.depth = depth
-            self.set_attrs = set_attrs
-            self.clear_attrs = clear_attrs
-
-        def __call__(self, node, helper):
-            if self.depth is not None:
-                info = helper.graph_info
-                # print('INFO: ', info)
-                try:
-                    clone_info, name = info[self.depth]
-                    idx, total = clone_info
-                except:
-                    # print('\n*** WARNING[Pick Generator]: incorrect depth ({:d})!\n' \
-                    #       '  (Normal behavior if used during absorption.)'.format(self.depth))
-                    idx = 0
-                base_node = node.get_subnode(idx)
-            else:
-                base_node = node
+    assert(vt is None or not issubclass(vt, fvt.BitField))
+    return _CopyValue(path, depth, vt, set_attrs, clear_attrs, after_encoding)
 
-            tg_node = base_node[self.path]
+class _CopyValue(object):
+    provide_helpers = True
 
-            if tg_node.is_nonterm():
-                n = Node('cts', base_node=tg_node, ignore_frozen_state=False)
-            else:
-                blob = tg_node.to_bytes() if after_encoding else tg_node.get_raw_value()
+    def __init__(self, path, depth, vt, set_attrs, clear_attrs, after_encoding):
+        self.vt = vt
+        self.path = path
+        self.depth = depth
+        self.set_attrs = set_attrs
+        self.clear_attrs = clear_attrs
+        self.after_encoding = after_encoding
 
-                if self.vt is None:
-                    assert(tg_node.is_typed_value() and not tg_node.is_typed_value(subkind=fvt.BitField))
-                    self.vt = tg_node.get_current_subkind()
+    def __call__(self, node, helper):
+        if self.depth is not None:
+            info = helper.graph_info
+            # print('INFO: ', info)
+            try:
+                clone_info, name = info[self.depth]
+                idx, total = clone_info
+            except:
+                # print('\n*** WARNING[Pick Generator]: incorrect depth ({:d})!\n' \
+                #       '  (Normal behavior if used during absorption.)'.format(self.depth))
+                idx = 0
+            base_node = node.get_subnode(idx)
+        else:
+            base_node = node
 
-                if issubclass(self.vt, fvt.INT):
-                    vtype = self.vt(values=[tg_node.get_raw_value()])
-                elif issubclass(self.vt, fvt.String):
-                    vtype = self.vt(values=[blob])
-                else:
-                    raise NotImplementedError('Value type not supported')
-                n = Node('cts', value_type=vtype)
+        tg_node = base_node[self.path]
 
-            n.set_semantics(NodeSemantics(['clone']))
-            MH._handle_attrs(n, set_attrs, clear_attrs)
-            return n
+        if tg_node.is_nonterm():
+            n = Node('cts', base_node=tg_node, ignore_frozen_state=False)
+        else:
+            blob = tg_node.to_bytes() if self.after_encoding else tg_node.get_raw_value()
 
+            if self.vt is None:
+                assert(tg_node.is_typed_value() and not tg_node.is_typed_value(subkind=fvt.BitField))
+                self.vt = tg_node.get_current_subkind()
 
-    assert(vt is None or not issubclass(vt, fvt.BitField))
-    return CopyValue(path, depth, vt, set_attrs, clear_attrs)
+            if issubclass(self.vt, fvt.INT):
+                vtype = self.vt(values=[tg_node.get_raw_value()])
+            elif issubclass(self.vt, fvt.String):
+                vtype = self.vt(values=[blob])
+            else:
+                raise NotImplementedError('Value type not supported')
+            n = Node('cts', value_type=vtype)
 
+        n.set_semantics(NodeSemantics(['clone']))
+        MH._handle_attrs(n, self.set_attrs, self.clear_attrs)
+        return n
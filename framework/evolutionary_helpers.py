@@ -149,7 +149,7 @@ class DefaultPopulation(Population):
     def _compute_scores(self):
         """ Compute the scores of each individuals """
         for individual in self._individuals:
-            individual.score = random.uniform(0, 100)
+            individual.score = rng.uniform(0, 100)
 
     def _compute_probability_of_survival(self):
         """ Normalize fitness scores between 0 and 1 """
@@ -166,7 +166,7 @@ class DefaultPopulation(Population):
     def _kill(self):
         """ Simply rolls the dice """
         for i in range(len(self._individuals))[::-1]:
-            if random.randrange(100) > self._individuals[i].probability_of_survival*100:
+            if rng.randrange(100) > self._individuals[i].probability_of_survival*100:
                 del self._individuals[i]
 
     def _mutate(self):
@@ -177,7 +177,7 @@ class DefaultPopulation(Population):
 
     def _crossover(self):
         """ Compensates the kills through the usage of the tCOMB disruptor """
-        random.shuffle(self._individuals)
+        rng.shuffle(self._individuals)
 
         current_size = len(self._individuals)
 
@@ -42,6 +42,14 @@ CREATE TABLE DMAKERS (
     NAME)
 );
 
+CREATE TABLE BLOBS (
+    HASH     TEXT PRIMARY KEY
+                  NOT NULL
+                  UNIQUE ON CONFLICT IGNORE,
+    CODEC    INTEGER,
+    CONTENT  BLOB
+);
+
 CREATE TABLE DATA (
     ID        INTEGER  PRIMARY KEY ASC AUTOINCREMENT,
     GROUP_ID  INTEGER,
@@ -52,7 +60,8 @@ CREATE TABLE DATA (
     SENT_DATE TIMESTAMP,
     ACK_DATE  TIMESTAMP,
     TARGET TEXT,
-    PRJ_NAME TEXT REFERENCES PROJECT (NAME)
+    PRJ_NAME TEXT REFERENCES PROJECT (NAME),
+    CONTENT_HASH TEXT REFERENCES BLOBS (HASH)
 );
 
 CREATE TABLE STEPS (
@@ -63,6 +72,7 @@ CREATE TABLE STEPS (
     DATA_ID_SRC INTEGER REFERENCES DATA (ID),
     USER_INPUT  TEXT,
     INFO        BLOB,
+    RNG_SEED    INTEGER,
     PRIMARY KEY (
         DATA_ID,
         STEP_ID
@@ -81,7 +91,8 @@ CREATE TABLE FEEDBACK (
     SOURCE   TEXT,
     DATE     TIMESTAMP,
     CONTENT  BLOB,
-    STATUS   INTEGER
+    STATUS   INTEGER,
+    CONTENT_HASH TEXT REFERENCES BLOBS (HASH)
 );
 
 CREATE TABLE COMMENTS (
@@ -99,6 +110,14 @@ CREATE TABLE FMKINFO (
     ERROR     BOOLEAN
 );
 
+CREATE INDEX IF NOT EXISTS IDX_DATA_PRJ_NAME ON DATA (PRJ_NAME);
+CREATE INDEX IF NOT EXISTS IDX_DATA_SENT_DATE ON DATA (SENT_DATE);
+CREATE INDEX IF NOT EXISTS IDX_STEPS_DATA_ID ON STEPS (DATA_ID);
+CREATE INDEX IF NOT EXISTS IDX_FEEDBACK_DATA_ID ON FEEDBACK (DATA_ID);
+CREATE INDEX IF NOT EXISTS IDX_FEEDBACK_SOURCE ON FEEDBACK (SOURCE);
+CREATE INDEX IF NOT EXISTS IDX_DATA_CONTENT_HASH ON DATA (CONTENT_HASH);
+CREATE INDEX IF NOT EXISTS IDX_FEEDBACK_CONTENT_HASH ON FEEDBACK (CONTENT_HASH);
+
 CREATE VIEW STATS AS
     SELECT TYPE, sum(CPT) as TOTAL
     FROM (
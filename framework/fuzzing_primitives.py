@@ -22,16 +22,21 @@
 ################################################################################
 
 import sys
+import io
 import random
 import string
 import copy
 import re
+import pickle
 
 sys.path.append('.')
 
 import framework.value_types as vtype
 import framework.node as dm
 
+from framework.data_model import DataModelPickler, DataModelUnpickler
+from framework.global_resources import rng
+
 from framework.basic_primitives import *
 from libs.external_modules import *
 
@@ -40,6 +45,67 @@ import libs.debug_facility as dbg
 DEBUG = dbg.MW_DEBUG
 DEBUG_PRINT = dbg.DEBUG_PRINT
 
+class ModelWalkerCursor(object):
+    '''
+    Checkpoint of a model walk (refer to :meth:`ModelWalker.get_cursor`). It includes the
+    walked nodes (and thus the state of their value types), the consumer, the position
+    of the walk within each node it is walking through, and the state of the random
+    number generator.
+
+    It can be pickled in order to save it, and the walk can be resumed from it, without
+    walking through the previous steps again, with :meth:`ModelWalker.from_cursor`.
+
+    Attributes:
+      step (int): index of the first step the resumed walk will yield.
+    '''
+
+    def __init__(self, step, state):
+        self.step = step
+        self._state = state
+
+
+class _WalkFrame(object):
+    '''
+    State of a ModelWalker.walk_graph_rec() call, that is of the walk through
+    `node_list`. `child` is the frame of the walk (or of the consumer) this one
+    is suspended in, and `point` identifies where it is suspended.
+    '''
+    CHILDREN = 1
+    CONSUMER = 2
+    REWALK = 3
+
+    def __init__(self, node_list, structure_has_changed, consumed_nodes, parent_node):
+        self.node_list = node_list
+        self.structure_has_changed = structure_has_changed
+        self.consumed_nodes = consumed_nodes
+        self.parent_node = parent_node
+        self.idx = 0
+        self.perform_second_step = True
+        self.again = True
+        self.point = None
+        self.child = None
+
+
+class _ConsumerFrame(object):
+    '''
+    State of a ModelWalker.node_consumer_helper() call, that is of the consumption
+    of `node`.
+    '''
+    EXHAUSTED = 1
+    STEP = 2
+
+    def __init__(self, node, structure_has_changed, consumed_nodes, parent_node):
+        self.node = node
+        self.structure_has_changed = structure_has_changed
+        self.consumed_nodes = consumed_nodes
+        self.parent_node = parent_node
+        self.orig_node_val = None
+        self.not_recovered = False
+        self.consume_called_again = False
+        self.max_steps = None
+        self.point = None
+
+
 class ModelWalker(object):
     '''
     We walk through all states of the model and give opportunity to
@@ -56,7 +122,19 @@ class ModelWalker(object):
     '''
 
     def __init__(self, root_node, node_consumer, make_determinist=False, make_random=False,
-                 max_steps=-1, initial_step=1):
+                 max_steps=-1, initial_step=1, shard=0, nb_shards=1):
+        '''
+        Args:
+          max_steps (int): maximum number of steps (-1 means until the end).
+          initial_step (int): the steps before this one are walked through but not yielded.
+            The nodes are only frozen as a whole for the yielded steps. But to resume a walk
+            without walking through the previous steps again, refer to :meth:`get_cursor`.
+          shard (int): index of the share of the steps to yield, when the walk is split into
+            `nb_shards` shares. The step `idx` belongs to the share `(idx - 1) % nb_shards`.
+            Thus, walkers that only differ by their shard yield disjoint sets of steps
+            whose union is what a walker with one share would yield.
+          nb_shards (int): number of shares the walk is split into.
+        '''
         self._root_node = root_node
         self._root_node.make_finite(all_conf=True, recursive=True)
         
@@ -69,32 +147,117 @@ class ModelWalker(object):
 
         self._root_node.freeze()
 
+        self._init_walk(max_steps, initial_step, shard, nb_shards)
+
+        self.set_consumer(node_consumer)
+
+    @classmethod
+    def from_cursor(cls, cursor, data_model=None, max_steps=-1, shard=0, nb_shards=1):
+        '''
+        Resume a walk from a checkpoint. The previous steps are not walked through again,
+        only the nodes being walked through when the checkpoint has been made are resumed.
+
+        Args:
+          cursor (ModelWalkerCursor): checkpoint of the walk (refer to :meth:`get_cursor`).
+          data_model (DataModel): data model of the walked nodes. Only needed if they
+            refer to it.
+          max_steps (int): maximum number of steps (-1 means until the end). Thus, disjoint
+            ranges of a walk can be performed from cursors taken at their boundaries.
+          shard (int): refer to :meth:`__init__`.
+          nb_shards (int): refer to :meth:`__init__`.
+
+        Returns:
+          ModelWalker: the walker yielding the steps from `cursor.step` on. Its root node
+          and its consumer are the ones restored from the cursor. The state of the random
+          number generator is restored when the walk begins.
+        '''
+        root_node, node_consumer, frame, finished, rng_state = \
+            DataModelUnpickler(io.BytesIO(cursor._state), data_model).load()
+        walker = cls.__new__(cls)
+        walker._root_node = root_node
+        walker._init_walk(max_steps, cursor.step, shard, nb_shards)
+        walker._frame = frame
+        walker._finished = finished
+        walker._rng_state = rng_state
+        walker._resumed = True
+        walker.set_consumer(node_consumer)
+        return walker
+
+    def _init_walk(self, max_steps, initial_step, shard, nb_shards):
         self._max_steps = int(max_steps)
         self._initial_step = int(initial_step)
-        
+        self._shard = int(shard)
+        self._nb_shards = int(nb_shards)
+
         assert(self._max_steps > 0 or self._max_steps == -1)
+        assert(0 <= self._shard < self._nb_shards)
 
         self.ic = dm.NodeInternalsCriteria(mandatory_attrs=[dm.NodeInternals.Mutable, dm.NodeInternals.Finite])
         self.triglast_ic = dm.NodeInternalsCriteria(mandatory_custo=[dm.GenFuncCusto.TriggerLast])
 
         self.consumed_node_path = None
-
-        self.set_consumer(node_consumer)
+        self._cpt = None
+        # state of the walk (refer to get_cursor())
+        self._frame = None
+        self._suspended = False
+        self._finished = False
+        self._resumed = False
+        self._rng_state = None
 
     def set_consumer(self, node_consumer):
         self._consumer = node_consumer
         self._consumer._root_node = self._root_node
 
+    def get_consumer(self):
+        return self._consumer
+
+    def get_cursor(self):
+        '''
+        Make a checkpoint of the walk, in order to resume it later on (refer to
+        :meth:`from_cursor`). The walk can go on after this call.
+
+        Returns:
+          ModelWalkerCursor: the checkpoint of the walk, taken after the last yielded step.
+        '''
+        if self._cpt is None:
+            step = self._initial_step
+        elif self._suspended:
+            step = max(self._cpt + 1, self._initial_step)
+        else:
+            step = max(self._cpt, self._initial_step)
+
+        f = io.BytesIO()
+        frame = None if self._finished else self._frame
+        DataModelPickler(f, protocol=pickle.HIGHEST_PROTOCOL).dump(
+            (self._root_node, self._consumer, frame, self._finished, rng.getstate()))
+
+        return ModelWalkerCursor(step, f.getvalue())
 
     def __iter__(self):
 
-        self._cpt = 1
-        gen = self.walk_graph_rec([self._root_node], structure_has_changed=False,
-                                  consumed_nodes=set(), parent_node=self._root_node)
-        for consumed_node, orig_node_val in gen:
-            self._root_node.freeze()
+        resumed = self._resumed
+        self._resumed = False
+        if resumed:
+            if self._finished:
+                return
+            # the data generated from now on are the ones the walk would have generated
+            # without interruption
+            rng.setstate(self._rng_state)
 
-            if self._cpt >= self._initial_step:
+        if resumed and self._frame is not None:
+            self._cpt = self._initial_step
+        else:
+            # new walk (or walk resumed from a cursor taken before its beginning)
+            resumed = False
+            self._cpt = 1
+            self._frame = _WalkFrame([self._root_node], structure_has_changed=False,
+                                     consumed_nodes=set(), parent_node=self._root_node)
+        self._finished = False
+
+        gen = self.walk_graph_rec(self._frame, resume=resumed)
+        for consumed_node, orig_node_val in gen:
+            if self._cpt >= self._initial_step and (self._cpt - 1) % self._nb_shards == self._shard:
+                self._root_node.freeze()
                 self.consumed_node_path = consumed_node.get_path_from(self._root_node)
                 if self.consumed_node_path == None:
                     # 'consumed_node_path' can be None if
@@ -107,18 +270,23 @@ class ModelWalker(object):
                     # nothing is visible.
                     continue
 
+                self._suspended = True
                 yield self._root_node, consumed_node, orig_node_val, self._cpt
+                self._suspended = False
 
             if self._max_steps != -1 and self._cpt >= (self._max_steps+self._initial_step-1):
                 self._cpt += 1
                 break
             else:
                 self._cpt += 1
+        else:
+            self._finished = True
 
-        if self._cpt <= self._initial_step and self._cpt > 1:
+        if not resumed and self._cpt <= self._initial_step and self._cpt > 1:
             print("\n*** DEBUG: initial_step idx ({:d}) is after" \
                       " the last idx ({:d})!\n".format(self._initial_step, self._cpt-1))
             self._initial_step = 1
+            self._root_node.freeze()
             self.consumed_node_path = consumed_node.get_path_from(self._root_node)
             if self.consumed_node_path == None:
                 return
@@ -137,114 +305,159 @@ class ModelWalker(object):
         node.unfreeze(recursive=True, dont_change_state=True, ignore_entanglement=True)
         self._consumer.do_after_reset(node)
 
-    def walk_graph_rec(self, node_list, structure_has_changed, consumed_nodes, parent_node):
-
-        reset = False
-        guilty = None
+    def walk_graph_rec(self, frame, resume=False):
+        '''
+        Walk through `frame.node_list`. The state of the walk is kept within the frame, in
+        order to resume it from where it is suspended if `resume` is True (refer to
+        :meth:`get_cursor`).
+        '''
+        f = frame
 
         # We iterate over the children nodes of a parent node which is
         # in a frozen state (which means that it may have some
         # children in other states that are not dealt with in this current call)
-        for node in node_list:
-            perform_second_step = True
-            again = True
+        while f.idx < len(f.node_list):
+            node = f.node_list[f.idx]
+
+            if not resume:
+                f.perform_second_step = True
+                f.again = True
 
-            DEBUG_PRINT('--(1)-> Node:' + node.name + ', exhausted:' + repr(node.is_exhausted()), level=2)
+                DEBUG_PRINT('--(1)-> Node:' + node.name + ', exhausted:' + repr(node.is_exhausted()), level=2)
 
             # We enter here at least once, and if a reset on the same
             # node has been triggered (typically for a non-terminal
             # node)
 
-            while again:
-                again = False                  
+            while f.again or resume:
+                if resume:
+                    point = f.point
+                    resume = False
+                else:
+                    point = None
+
+                if point is None:
+                    f.again = False
+
+                    ### STEP 1 ###
+
+                    # We freeze the node before making a research on it,
+                    # otherwise we could catch some nodes that won't exist
+                    # in the node we will finally output.
+                    node.freeze()
+
+                    # For each node we look for direct subnodes
+                    fnodes = node.get_reachable_nodes(internals_criteria=self.ic, exclude_self=True,
+                                                      respect_order=self._consumer.respect_order, relative_depth=1)
+                    if DEBUG:
+                        DEBUG_PRINT('--(2)-> Node:' + node.name + ', exhausted:' + repr(node.is_exhausted()), level=2)
+                        for e in fnodes:
+                            DEBUG_PRINT('   |> ' + e.name, level=2)
+
+                    # If we don't find direct subnodes, it means that the
+                    # node is terminal, and we go to Step 2. Otherwise, we
+                    # call ourselves recursively with the list of subnodes
+                    if fnodes:
+                        f.child = _WalkFrame(fnodes, f.structure_has_changed, f.consumed_nodes,
+                                             parent_node=node)
+                        generator = self.walk_graph_rec(f.child)
+                        point = _WalkFrame.CHILDREN
+
+                elif point == _WalkFrame.CHILDREN:
+                    generator = self.walk_graph_rec(f.child, resume=True)
+
+                if point == _WalkFrame.CHILDREN:
+                    f.point = point
+                    for consumed_node, orig_node_val in generator:
+                        yield consumed_node, orig_node_val # YIELD
+                    point = None
 
-                ### STEP 1 ###
+                if point is None or point == _WalkFrame.CONSUMER:
 
-                # We freeze the node before making a research on it,
-                # otherwise we could catch some nodes that won't exist
-                # in the node we will finally output.
-                node.freeze()
+                    ### STEP 2 ###
 
-                # For each node we look for direct subnodes
-                fnodes = node.get_reachable_nodes(internals_criteria=self.ic, exclude_self=True,
-                                                  respect_order=self._consumer.respect_order, relative_depth=1)
-                if DEBUG:
-                    DEBUG_PRINT('--(2)-> Node:' + node.name + ', exhausted:' + repr(node.is_exhausted()), level=2)
-                    for e in fnodes:
-                        DEBUG_PRINT('   |> ' + e.name, level=2)
-
-                # If we don't find direct subnodes, it means that the
-                # node is terminal, and we go to Step 2. Otherwise, we
-                # call ourselves recursively with the list of subnodes
-                if fnodes:
-                    generator = self.walk_graph_rec(fnodes, structure_has_changed, consumed_nodes,
-                                                    parent_node=node)
-                    for consumed_node, orig_node_val in generator:
-                        yield consumed_node, orig_node_val # YIELD
+                    # In this step, we provide the node to the Consumer,
+                    # for possible uses/modifications. This is performed within our
+                    # method node_consumer_helper().
+                    if point == _WalkFrame.CONSUMER:
+                        consumer_gen = self.node_consumer_helper(f.child, resume=True)
+                    elif f.perform_second_step:
+                        f.child = _ConsumerFrame(node, f.structure_has_changed, f.consumed_nodes,
+                                                 parent_node=f.parent_node)
+                        consumer_gen = self.node_consumer_helper(f.child)
+                    else:
+                        consumer_gen = None
+
+                    if consumer_gen is not None:
+                        f.point = _WalkFrame.CONSUMER
+                        for consumed_node, orig_node_val, reset, ignore_node in consumer_gen:
+
+                            DEBUG_PRINT("   [ reset: {!r:s} | ignore_node: {!r:s} | " \
+                                                   "name: {!r:s} ]".format(reset, ignore_node, node.name))
+
+                            # Depending on the choice of the consumer, we
+                            # can go to Step 1 again with the same node
+                            # (if the consumer triggers a reset), or
+                            # continue with the next node after exhaustion
+                            # of the current one. The consumer can also
+                            # decide to ignore the node, if it triggers a
+                            # reset, in order that we avoid bothering him
+                            # again with it (that means that Step 2 will
+                            # be directly skipped after Step 1 completes)
+
+                            if ignore_node and reset:
+                                f.perform_second_step = False
+                                f.again = True
+                                self._do_reset(node)
+                                break
+                            elif ignore_node and not reset:
+                                f.perform_second_step = False
+                                f.again = False
+                                break
+                            elif reset:
+                                f.perform_second_step = True
+                                f.again = True
+                                self._do_reset(node)
+                                break
+                            else:
+                                f.perform_second_step = True
+                                f.again = False
+
+                            yield consumed_node, orig_node_val # YIELD
+
+                    # We reach this case if the consumer is not interested
+                    # with 'node'.  Then if the node is not exhausted we
+                    # may have new cases where the consumer will find
+                    # something (assuming the consumer accepts to reset).
+                    elif self._consumer.need_reset(node):   # and not node.is_exhausted():
+                        f.again = False if node.is_exhausted() else True
+                        # Not consumed so we don't unfreeze() with recursive=True
+                        self._do_reset(node)
+                    else:
+                        f.again = False
 
-                ### STEP 2 ###
-
-                # In this step, we provide the node to the Consumer,
-                # for possible uses/modifications. This is performed within our
-                # method node_consumer_helper().
-                if perform_second_step:
-                    consumer_gen = self.node_consumer_helper(node, structure_has_changed, consumed_nodes,
-                                                             parent_node=parent_node)
-                    for consumed_node, orig_node_val, reset, ignore_node in consumer_gen:
-
-                        DEBUG_PRINT("   [ reset: {!r:s} | ignore_node: {!r:s} | " \
-                                               "name: {!r:s} ]".format(reset, ignore_node, node.name))
-
-                        # Depending on the choice of the consumer, we
-                        # can go to Step 1 again with the same node
-                        # (if the consumer triggers a reset), or
-                        # continue with the next node after exhaustion
-                        # of the current one. The consumer can also
-                        # decide to ignore the node, if it triggers a
-                        # reset, in order that we avoid bothering him
-                        # again with it (that means that Step 2 will
-                        # be directly skipped after Step 1 completes)
-
-                        if ignore_node and reset:
-                            perform_second_step = False
-                            again = True
-                            self._do_reset(node)
-                            break
-                        elif ignore_node and not reset:
-                            perform_second_step = False
-                            again = False
-                            break
-                        elif reset:
-                            perform_second_step = True
-                            again = True
-                            self._do_reset(node)
-                            break
-                        else:
-                            perform_second_step = True
-                            again = False
+                    if node.is_nonterm():
+                        f.structure_has_changed = node.cc.structure_will_change()
 
-                        yield consumed_node, orig_node_val # YIELD
+                    if f.structure_has_changed and self._consumer.need_reset_when_structure_change:
+                        f.structure_has_changed = False
 
-                # We reach this case if the consumer is not interested
-                # with 'node'.  Then if the node is not exhausted we
-                # may have new cases where the consumer will find
-                # something (assuming the consumer accepts to reset).
-                elif self._consumer.need_reset(node):   # and not node.is_exhausted():
-                    again = False if node.is_exhausted() else True
-                    # Not consumed so we don't unfreeze() with recursive=True
-                    self._do_reset(node)
-                else:
-                    again = False
+                        idx = f.node_list.index(node)
 
-                if node.is_nonterm():
-                    structure_has_changed = node.cc.structure_will_change()
+                        f.child = _WalkFrame(f.node_list[:idx], False, set(), parent_node=f.parent_node)
+                        gen = self.walk_graph_rec(f.child)
+                        point = _WalkFrame.REWALK
 
-                if structure_has_changed and self._consumer.need_reset_when_structure_change:
-                    structure_has_changed = False
+                    elif f.structure_has_changed and not self._consumer.need_reset_when_structure_change:
+                        f.structure_has_changed = False
+                        # print('--> ', node.name, node, node.is_attr_set(dm.NodeInternals.Mutable), 'exhausted: ', node.is_exhausted())
+                        f.consumed_nodes = set()
 
-                    idx = node_list.index(node)
+                elif point == _WalkFrame.REWALK:
+                    gen = self.walk_graph_rec(f.child, resume=True)
 
-                    gen = self.walk_graph_rec(node_list[:idx], False, set(), parent_node=parent_node)
+                if point == _WalkFrame.REWALK:
+                    f.point = point
                     for consumed_node, orig_node_val in gen:
                         yield consumed_node, orig_node_val # YIELD
 
@@ -252,7 +465,7 @@ class ModelWalker(object):
                     # guilty node that has produced the
                     # structure_change (as it is not dealt with the
                     # previous recursive call). To simplify the process
-                    consumed_nodes = set()
+                    f.consumed_nodes = set()
 
                     # This solution does not work as expected especially for USB data model
                     # nodes_to_remove = node.get_reachable_nodes(internals_criteria=self.ic, exclude_self=False)
@@ -260,15 +473,18 @@ class ModelWalker(object):
                     #     if n in consumed_nodes:
                     #         consumed_nodes.remove(n)
 
-                elif structure_has_changed and not self._consumer.need_reset_when_structure_change:
-                    structure_has_changed = False
-                    # print('--> ', node.name, node, node.is_attr_set(dm.NodeInternals.Mutable), 'exhausted: ', node.is_exhausted())
-                    consumed_nodes = set()
+            f.idx += 1
 
         return
 
 
-    def node_consumer_helper(self, node, structure_has_changed, consumed_nodes, parent_node):
+    def node_consumer_helper(self, frame, resume=False):
+        '''
+        Provide `frame.node` to the consumer. As for :meth:`walk_graph_rec`, the state of
+        the consumption is kept within the frame.
+        '''
+        f = frame
+        node = f.node
 
         def _do_if_not_interested(node, orig_node_val):
             reset = self._consumer.need_reset(node)
@@ -281,49 +497,63 @@ class ModelWalker(object):
             else:
                 return node, orig_node_val, False, True
 
-        orig_node_val = node.to_bytes()
+        if resume:
+            point = f.point
+        else:
+            point = None
 
-        not_recovered = False
-        consume_called_again = False
+            f.orig_node_val = node.to_bytes()
 
-        if self._consumer.interested_by(node):
-            if node in consumed_nodes:
-                go_on = False
+            f.not_recovered = False
+            f.consume_called_again = False
+
+            if self._consumer.interested_by(node):
+                if node in f.consumed_nodes:
+                    go_on = False
+                else:
+                    self._consumer.save_node(node)
+                    go_on = self._consumer.consume_node(node)
             else:
-                self._consumer.save_node(node)
-                go_on = self._consumer.consume_node(node)
-        else:
-            go_on = False
+                go_on = False
 
-        if not go_on:
-            yield _do_if_not_interested(node, orig_node_val)
-            raise ValueError  # We should never return here, otherwise its a bug we want to alert on
+            if not go_on:
+                yield _do_if_not_interested(node, f.orig_node_val)
+                raise ValueError  # We should never return here, otherwise its a bug we want to alert on
 
-        consumed_nodes.add(node)
-        node.freeze()
-        not_recovered = True
+            f.consumed_nodes.add(node)
+            node.freeze()
+            f.not_recovered = True
+
+            f.max_steps = self._consumer.wait_for_exhaustion(node)
 
-        max_steps = self._consumer.wait_for_exhaustion(node)
         again = True
 
         # We enter this loop only if the consumer is interested by the
         # node.
         while again:
-            reset = self._consumer.need_reset(node)
+            if point is None:
+                reset = self._consumer.need_reset(node)
 
-            if reset and not node.is_exhausted():
+                if reset and not node.is_exhausted():
 
-                yield node, orig_node_val, True, False # --> x, x, reset, dont_ignore_node
-            
-            elif reset and node.is_exhausted():
+                    yield node, f.orig_node_val, True, False # --> x, x, reset, dont_ignore_node
 
-                yield None, None, False, True # --> x, x, reset, ignore_node
-                raise ValueError  # We should never return here, otherwise its a bug we want to alert on
+                elif reset and node.is_exhausted():
 
-            elif node.is_exhausted(): # --> (reset and node.is_exhausted()) or (not reset and node.is_exhausted())
+                    yield None, None, False, True # --> x, x, reset, ignore_node
+                    raise ValueError  # We should never return here, otherwise its a bug we want to alert on
 
-                yield node, orig_node_val, False, False
+                elif node.is_exhausted(): # --> (reset and node.is_exhausted()) or (not reset and node.is_exhausted())
 
+                    f.point = _ConsumerFrame.EXHAUSTED
+                    yield node, f.orig_node_val, False, False
+                    point = _ConsumerFrame.EXHAUSTED
+
+                else:
+                    f.point = _ConsumerFrame.STEP
+                    yield node, f.orig_node_val, False, False
+
+            if point == _ConsumerFrame.EXHAUSTED:
                 if self._consumer.interested_by(node):
                     if self._consumer.still_interested_by(node):
                         self._consumer.consume_node(node)
@@ -331,33 +561,32 @@ class ModelWalker(object):
                         self._consumer.recover_node(node)
                         if self._consumer.fix_constraints:
                             node.fix_synchronized_nodes()
-                        yield _do_if_not_interested(node, orig_node_val)
+                        yield _do_if_not_interested(node, f.orig_node_val)
                         raise ValueError  # We should never return here, otherwise its a bug we want to alert on
 
-                    consume_called_again = True
+                    f.consume_called_again = True
 
                     node.get_value()
-                    not_recovered = True
+                    f.not_recovered = True
                 else:
-                    if node in consumed_nodes:
+                    if node in f.consumed_nodes:
                         self._consumer.recover_node(node)
                         if self._consumer.fix_constraints:
                             node.fix_synchronized_nodes()
-                        not_recovered = False
+                        f.not_recovered = False
                     return
 
-            else:
-                yield node, orig_node_val, False, False
+            point = None
 
-            if max_steps != 0 and not consume_called_again:
-                max_steps -= 1
+            if f.max_steps != 0 and not f.consume_called_again:
+                f.max_steps -= 1
                 # In this case we iterate only on the current node
                 node.unfreeze(recursive=False, ignore_entanglement=True)
                 node.freeze()
                 if self._consumer.fix_constraints:
                     node.fix_synchronized_nodes()
-            elif not consume_called_again:
-                if not_recovered and (self._consumer.interested_by(node) or node in consumed_nodes):
+            elif not f.consume_called_again:
+                if f.not_recovered and (self._consumer.interested_by(node) or node in f.consumed_nodes):
                     self._consumer.recover_node(node)
                     if self._consumer.fix_constraints:
                         node.fix_synchronized_nodes()
@@ -366,7 +595,7 @@ class ModelWalker(object):
                 again = False
 
             else:
-                consume_called_again = False
+                f.consume_called_again = False
 
         return
 
@@ -808,10 +1037,9 @@ class TypedNodeDisruption(NodeConsumerStub):
                 max_oset = max(orig_set)
                 min_oset = min(orig_set)
                 if min_oset != max_oset:
-                    diff_sorted = sorted(set(range(min_oset, max_oset+1)) - orig_set)
-                    if diff_sorted:
-                        item1 = diff_sorted[0]
-                        item2 = diff_sorted[-1]
+                    extremes = missing_values_extremes(orig_set)
+                    if extremes is not None:
+                        item1, item2 = extremes
                         if item1 not in supp_list:
                             supp_list.append(item1)
                         if item2 not in supp_list:
@@ -21,6 +21,8 @@
 #
 ################################################################################
 
+import os
+import pickle
 import subprocess
 from copy import *
 
@@ -91,6 +93,41 @@ def truncate_info(info, max_size=60):
         info = info[:max_size] + b' ...'
     return repr(info)
 
+def _new_modelwalker(dmaker, prev_data, consumer):
+    '''
+    Create the model walker of the stateful disruptor @dmaker, or restore the one
+    saved in its checkpoint if it has to be resumed (refer to _checkpoint_modelwalker()).
+    In the latter case, the walked node and the consumer are the saved ones.
+    '''
+    dmaker._steps_since_checkpoint = 0
+    if dmaker.resume and dmaker.checkpoint is not None:
+        path = os.path.join(workspace_folder, dmaker.checkpoint)
+        if os.path.exists(path):
+            with open(path, 'rb') as f:
+                cursor = pickle.load(f)
+            prev_data.add_info('model walk resumed from step {:d}'.format(cursor.step))
+            return ModelWalker.from_cursor(cursor, data_model=prev_data.get_data_model(),
+                                           max_steps=dmaker.max_steps,
+                                           shard=dmaker.shard, nb_shards=dmaker.nb_shards)
+
+    return ModelWalker(prev_data.content, consumer, max_steps=dmaker.max_steps,
+                       initial_step=dmaker.init, shard=dmaker.shard, nb_shards=dmaker.nb_shards)
+
+def _checkpoint_modelwalker(dmaker, force=False):
+    '''
+    Save the state of the model walk of @dmaker, if @dmaker.checkpoint_freq steps have
+    been provided since the last save. To be called before requesting a new step.
+    '''
+    if dmaker.checkpoint is None:
+        return
+    if force or dmaker._steps_since_checkpoint >= dmaker.checkpoint_freq:
+        path = os.path.join(workspace_folder, dmaker.checkpoint)
+        with open(path + '.tmp', 'wb') as f:
+            pickle.dump(dmaker.modelwalker.get_cursor(), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(path + '.tmp', path)
+        dmaker._steps_since_checkpoint = 0
+    dmaker._steps_since_checkpoint += 1
+
 
 @disruptor(tactics, dtype="tWALK", weight=1,
            gen_args = GENERIC_ARGS,
@@ -124,14 +161,16 @@ class sd_iter_over_data(StatefulDisruptor):
         else:
             consumer = BasicVisitor(respect_order=self.order)
         consumer.set_node_interest(path_regexp=self.path)
-        self.modelwalker = ModelWalker(prev_content, consumer, max_steps=self.max_steps, initial_step=self.init)
+        self.modelwalker = _new_modelwalker(self, prev_data, consumer)
         self.walker = iter(self.modelwalker)
 
 
     def disrupt_data(self, dm, target, data):
+        _checkpoint_modelwalker(self)
         try:
             rnode, consumed_node, orig_node_val, idx = next(self.walker)
         except StopIteration:
+            _checkpoint_modelwalker(self, force=True)
             data.make_unusable()
             self.handover()
             return data
@@ -197,7 +236,8 @@ class sd_fuzz_typed_nodes(StatefulDisruptor):
                                             ignore_separator=self.ign_sep)
         self.consumer.need_reset_when_structure_change = self.deep
         self.consumer.set_node_interest(path_regexp=self.path)
-        self.modelwalker = ModelWalker(prev_content, self.consumer, max_steps=self.max_steps, initial_step=self.init)
+        self.modelwalker = _new_modelwalker(self, prev_data, self.consumer)
+        self.consumer = self.modelwalker.get_consumer()
         self.walker = iter(self.modelwalker)
 
         self.max_runs = None
@@ -205,9 +245,11 @@ class sd_fuzz_typed_nodes(StatefulDisruptor):
         self.run_num = None
 
     def disrupt_data(self, dm, target, data):
+        _checkpoint_modelwalker(self)
         try:
             rnode, consumed_node, orig_node_val, idx = next(self.walker)
         except StopIteration:
+            _checkpoint_modelwalker(self, force=True)
             data.make_unusable()
             self.handover()
             return data
@@ -301,7 +343,8 @@ class sd_switch_to_alternate_conf(StatefulDisruptor):
                                         min_runs_per_node=self.min_runs_per_node,
                                         respect_order=False)
         self.consumer.set_node_interest(owned_confs=self.confs_list)
-        self.modelwalker = ModelWalker(prev_content, self.consumer, max_steps=self.max_steps, initial_step=self.init)
+        self.modelwalker = _new_modelwalker(self, prev_data, self.consumer)
+        self.consumer = self.modelwalker.get_consumer()
         self.walker = iter(self.modelwalker)
 
         self.max_runs = None
@@ -311,9 +354,11 @@ class sd_switch_to_alternate_conf(StatefulDisruptor):
 
     def disrupt_data(self, dm, target, data):
 
+        _checkpoint_modelwalker(self)
         try:
             rnode, consumed_node, orig_node_val, idx = next(self.walker)
         except StopIteration:
+            _checkpoint_modelwalker(self, force=True)
             data.make_unusable()
             self.handover()
             return data
@@ -381,7 +426,8 @@ class sd_fuzz_separator_nodes(StatefulDisruptor):
                                             separators=sep_list)
         self.consumer.need_reset_when_structure_change = self.deep
         self.consumer.set_node_interest(path_regexp=self.path)
-        self.modelwalker = ModelWalker(prev_content, self.consumer, max_steps=self.max_steps, initial_step=self.init)
+        self.modelwalker = _new_modelwalker(self, prev_data, self.consumer)
+        self.consumer = self.modelwalker.get_consumer()
         self.walker = iter(self.modelwalker)
 
         self.max_runs = None
@@ -389,9 +435,11 @@ class sd_fuzz_separator_nodes(StatefulDisruptor):
         self.run_num = None
 
     def disrupt_data(self, dm, target, data):
+        _checkpoint_modelwalker(self)
         try:
             rnode, consumed_node, orig_node_val, idx = next(self.walker)
         except StopIteration:
+            _checkpoint_modelwalker(self, force=True)
             data.make_unusable()
             self.handover()
             return data
@@ -667,7 +715,7 @@ class sd_crossover(SwapperDisruptor):
             self.shared = None
 
         def compute_sub_graphs(self, percentage):
-            random.shuffle(self.leafs)
+            rng.shuffle(self.leafs)
             self.shared = self.leafs[:int(round(len(self.leafs) * percentage))]
             self.shared.sort()
 
@@ -714,7 +762,7 @@ class sd_crossover(SwapperDisruptor):
 
     def setup(self, dm, user_input):
         if self.percentage_to_share is None:
-            self.percentage_to_share = float(random.randint(3, 7)) / 10.0
+            self.percentage_to_share = float(rng.randint(3, 7)) / 10.0
         elif not (0 < self.percentage_to_share < 1):
             print("Invalid percentage, a float between 0 and 1 need to be provided")
             return False
@@ -731,11 +779,11 @@ class sd_crossover(SwapperDisruptor):
 
         source = self.Operand(prev_content)
         source.compute_sub_graphs(self.percentage_to_share)
-        random.shuffle(source.shared)
+        rng.shuffle(source.shared)
 
         param = self.Operand(self.node)
         param.compute_sub_graphs(1.0 - self.percentage_to_share)
-        random.shuffle(param.shared)
+        rng.shuffle(param.shared)
 
         swap_nb = len(source.shared) if len(source.shared) < len(param.shared) else len(param.shared)
 
@@ -786,8 +834,8 @@ class sd_combine(SwapperDisruptor):
         swap_nb = len(source) if len(source) < len(param) else len(param)
         swap_nb = int(math.ceil(swap_nb / 2.0))
 
-        random.shuffle(source)
-        random.shuffle(param)
+        rng.shuffle(source)
+        rng.shuffle(param)
 
         for i in range(swap_nb):
             self._swap_nodes(source[i], param[i])
@@ -1036,7 +1084,10 @@ class d_max_size(Disruptor):
                  'path': ('Graph path regexp to select nodes on which ' \
                           'the disruptor should apply.', None, str),
                  'new_val': ('If provided change the selected byte with the new one.', None, str),
-                 'ascii': ('Enforce all outputs to be ascii 7bits.', False, bool)})
+                 'ascii': ('Enforce all outputs to be ascii 7bits.', False, bool),
+                 'interesting': ('Overwrite the data with interesting values (boundary ' \
+                                 'integers) instead of flipping bits. (@ascii is then ' \
+                                 'not enforced.)', False, bool)})
 class d_corrupt_node_bits(Disruptor):
     '''
     Corrupt bits on some nodes of the data model.
@@ -1061,10 +1112,10 @@ class d_corrupt_node_bits(Disruptor):
 
             if self.nb > 0:
                 try:
-                    l = random.sample(l, self.nb)
+                    l = rng.sample(l, self.nb)
                 except ValueError:
                     prev_data.add_info('Only one Node (Terminal) has been found!')
-                    l = random.sample(l, 1)
+                    l = rng.sample(l, 1)
 
             for i in l:
                 val = i.to_bytes()
@@ -1073,7 +1124,7 @@ class d_corrupt_node_bits(Disruptor):
 
                 if self.new_val is None:
                     if val != b'':
-                        val = corrupt_bits(val, n=1, ascii=self.ascii)
+                        val = self._corrupt(val, n=1)
                         prev_data.add_info('corrupt data: {!s}'.format(truncate_info(val)))
                     else:
                         prev_data.add_info('Nothing to corrupt!')
@@ -1087,13 +1138,20 @@ class d_corrupt_node_bits(Disruptor):
             ret = prev_data
 
         else:
-            new_val = corrupt_bits(prev_data.to_bytes(), ascii=self.ascii)
-            prev_data.update_from(new_val)
+            prev_data.update_from(self._corrupt(prev_data.to_bytes()))
             prev_data.add_info('Corruption performed on a byte string as no Node is available')
             ret = prev_data
 
         return ret
 
+    def _corrupt(self, val, n=None):
+        val = bytearray(val)
+        if self.interesting:
+            set_interesting_values_in_place(val, n=n)
+        else:
+            corrupt_bits_in_place(val, n=n, ascii=self.ascii)
+        return bytes(val)
+
 
 @disruptor(tactics, dtype="Cp", weight=4,
            args={'idx': ('Byte index to be corrupted (from 1 to data length).', 1, int),
@@ -1109,15 +1167,16 @@ class d_corrupt_bits_by_position(Disruptor):
 
     def disrupt_data(self, dm, target, prev_data):
 
-        val = prev_data.to_bytes()
+        msg = bytearray(prev_data.to_bytes())
 
         prev_data.add_info('corrupted bit index: {:d}'.format(self.idx))
 
-        new_value = self.new_val if self.new_val is not None \
-                    else corrupt_bits(val[self.idx-1:self.idx], n=1, ascii=self.ascii)
-        msg = val[:self.idx-1]+new_value+val[self.idx:]
+        if self.new_val is not None:
+            msg[self.idx-1:self.idx] = convert_to_internal_repr(self.new_val)
+        else:
+            corrupt_bits_in_place(memoryview(msg)[self.idx-1:self.idx], n=1, ascii=self.ascii)
 
-        prev_data.update_from(msg)
+        prev_data.update_from(bytes(msg))
 
         return prev_data
 
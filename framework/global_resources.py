@@ -25,6 +25,9 @@ import os
 import sys
 import copy
 import inspect
+import random
+import hashlib
+import threading
 from enum import Enum
 
 import framework
@@ -59,6 +62,8 @@ external_libs_folder = fuddly_data_folder + 'external_libs' + os.sep
 ensure_dir(external_libs_folder)
 external_tools_folder = fuddly_data_folder + 'external_tools' + os.sep
 ensure_dir(external_tools_folder)
+dm_cache_folder = fuddly_data_folder + 'dm_cache' + os.sep
+ensure_dir(dm_cache_folder)
 
 user_projects_folder = fuddly_data_folder + 'user_projects' + os.sep
 ensure_dir(user_projects_folder)
@@ -117,6 +122,40 @@ def is_string_compatible(val):
     else:
         return False
 
+### Random Number Generation ###
+
+class RNG(object):
+    """
+    Random number generator used for generating and altering data. It provides the
+    methods of :class:`random.Random`, but each thread uses its own generator state.
+    Thus, the data generated by a thread only depend on the seed provided to this thread
+    through :meth:`seed`, and threads do not contend for a shared state.
+    """
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _get_rnd(self):
+        try:
+            return self._local.rnd
+        except AttributeError:
+            self._local.rnd = rnd = random.Random()
+            return rnd
+
+    def __getattr__(self, name):
+        if name.startswith('__'):
+            raise AttributeError(name)
+        return getattr(self._get_rnd(), name)
+
+def derive_seed(seed, *keys):
+    """
+    Derive a 63-bit seed from another one and from keys (e.g., the number of a test case)
+    """
+    h = hashlib.sha1(repr((seed,) + keys).encode(internal_repr_codec))
+    return int(h.hexdigest()[:16], 16) >> 1
+
+rng = RNG()
+
 ### Exports for Node Absorption ###
 
 class AbsorbStatus(Enum):
@@ -204,10 +204,11 @@ class Logger(object):
 
             self._current_data.set_data_id(self.last_data_id)
 
+            rng_seed = self._current_data.get_rng_seed()
             if self._current_orig_data_id is not None:
                 self.fmkDB.insert_steps(self.last_data_id, 1, None, None,
                                         self._current_orig_data_id,
-                                        None, None)
+                                        None, None, rng_seed=rng_seed)
                 step_id_start = 2
             else:
                 step_id_start = 1
@@ -220,7 +221,7 @@ class Logger(object):
                     info = convert_to_internal_repr(info)
                 self.fmkDB.insert_steps(self.last_data_id, step_id, dmaker_type, dmaker_name,
                                         self._current_src_data_id,
-                                        str(user_input), info)
+                                        str(user_input), info, rng_seed=rng_seed)
 
             for msg, now in self._current_fmk_info:
                 self.fmkDB.insert_fmk_info(self.last_data_id, msg, now)
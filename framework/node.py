@@ -49,7 +49,6 @@ import libs.debug_facility as dbg
 
 DEBUG = dbg.DM_DEBUG
 
-
 def split_with(predicate, iterable):
     l = []
     first = True
@@ -607,15 +606,79 @@ class NodeInternals(object):
             }
 
         self._sync_with = None
+        # Non-terminal internals caching a value that depends on this one
+        self._value_parents = None
+        # Nodes whose path index includes this one
+        self._structure_parents = None
         self.customize(self.default_custo)
         self._init_specific(arg)
 
+    def __copy__(self):
+        new_obj = type(self).__new__(type(self))
+        new_obj.__dict__.update(self.__dict__)
+        new_obj._value_parents = None
+        new_obj._structure_parents = None
+        new_obj._forget_value_cache()
+        return new_obj
+
     def _init_specific(self, arg):
         pass
 
     def _get_value(self, conf=None, recursive=True, return_node_internals=False):
         raise NotImplementedError
 
+    def _is_value_stable(self, conf):
+        '''
+        Returns:
+            bool: True if the value of this node internals won't change until
+              an invalidation is notified to its value parents.
+        '''
+        return False
+
+    def _get_stable_bytes(self, conf):
+        raise NotImplementedError
+
+    def _get_stable_buffers(self, conf):
+        return [self._get_stable_bytes(conf)]
+
+    def _add_value_parent(self, parent):
+        if self._value_parents is None:
+            self._value_parents = set()
+        self._value_parents.add(parent)
+
+    def _invalidate_value(self):
+        # The value parents are forgotten as they will register again when
+        # they recompute their value. Thus, invalidation stops as soon as it
+        # reaches an already invalidated node internals.
+        parents = self._value_parents
+        if parents:
+            self._value_parents = None
+            for p in parents:
+                p._forget_value_cache()
+                p._invalidate_value()
+
+    def _forget_value_cache(self):
+        pass
+
+    def _add_structure_parent(self, node):
+        if self._structure_parents is None:
+            self._structure_parents = set()
+        self._structure_parents.add(node)
+
+    def _structure_changed(self):
+        # Same as _invalidate_value(): the nodes will register again when
+        # they rebuild their path index.
+        parents = self._structure_parents
+        if parents:
+            self._structure_parents = None
+            for p in parents:
+                p._structure_changed()
+
+    def _notify_structure_check(self, internal):
+        if self._structure_parents:
+            for p in self._structure_parents:
+                p._notify_structure_check(internal)
+
     def get_raw_value(self, **kwargs):
         raise NotImplementedError
 
@@ -749,24 +812,32 @@ class NodeInternals(object):
             raise ValueError
         if self._make_specific(name):
             self.__attrs[name] = True
+            if name == NodeInternals.DISABLED:
+                self._invalidate_value()
 
     def clear_attr(self, name):
         if name not in self.__attrs:
             raise ValueError
         if self._unmake_specific(name):
             self.__attrs[name] = False
+            if name == NodeInternals.DISABLED:
+                self._invalidate_value()
 
     # To be used on very specific case only
     def _set_attr_direct(self, name):
         if name not in self.__attrs:
             raise ValueError
         self.__attrs[name] = True
+        if name == NodeInternals.DISABLED:
+            self._invalidate_value()
 
     # To be used on very specific case only
     def _clear_attr_direct(self, name):
         if name not in self.__attrs:
             raise ValueError
         self.__attrs[name] = False
+        if name == NodeInternals.DISABLED:
+            self._invalidate_value()
 
     def is_attr_set(self, name):
         if name not in self.__attrs:
@@ -1181,6 +1252,12 @@ class NodeInternals_Empty(NodeInternals):
     def get_raw_value(self, **kwargs):
         return Node.DEFAULT_DISABLED_VALUE
 
+    def _is_value_stable(self, conf):
+        return True
+
+    def _get_stable_bytes(self, conf):
+        return Node.DEFAULT_DISABLED_VALUE
+
     def set_child_env(self, env):
         print('Empty:', hex(id(self)))
         raise AttributeError
@@ -1334,6 +1411,8 @@ class NodeInternals_GenFunc(NodeInternals):
 
     def reset_generator(self):
         self._generated_node = None
+        self._structure_changed()
+        self._invalidate_value()
 
     def _get_generated_node(self):
         if self._generated_node is None:
@@ -1367,6 +1446,8 @@ class NodeInternals_GenFunc(NodeInternals):
             self._generated_node = ret
             self._generated_node._reset_depth(parent_depth=self.pdepth)
             self._generated_node.set_env(self.env)
+            self._structure_changed()
+            self._invalidate_value()
 
             if self.is_attr_set(NodeInternals.Determinist):
                 self._generated_node.make_determinist(all_conf=True, recursive=True)
@@ -1426,6 +1507,22 @@ class NodeInternals_GenFunc(NodeInternals):
         ret = self.generated_node._get_value(conf=conf, recursive=recursive)
         return (ret, False)
 
+    def _is_value_stable(self, conf):
+        if self._generated_node is None or not self.is_attr_set(NodeInternals.Freezable):
+            return False
+        internal = self._generated_node._get_internals_for(conf)
+        if internal._is_value_stable(conf):
+            internal._add_value_parent(self)
+            return True
+        else:
+            return False
+
+    def _get_stable_bytes(self, conf):
+        return self._generated_node._get_internals_for(conf)._get_stable_bytes(conf)
+
+    def _get_stable_buffers(self, conf):
+        return self._generated_node._get_internals_for(conf)._get_stable_buffers(conf)
+
     def get_raw_value(self, **kwargs):
         return self.generated_node.get_raw_value(**kwargs)
 
@@ -1521,6 +1618,8 @@ class NodeInternals_GenFunc(NodeInternals):
         self.env = env
         if self._generated_node is not None:
             self._generated_node.set_env(env)
+        # paths behind a generator are only reachable when an environment is set
+        self._structure_changed()
 
     def set_child_attr(self, name, conf=None, all_conf=False, recursive=False):
         if recursive:
@@ -1538,12 +1637,9 @@ class NodeInternals_GenFunc(NodeInternals):
         if self._generated_node is not None:
             self._generated_node._reset_depth(parent_depth=self.pdepth)
 
-    def get_child_nodes_by_attr(self, internals_criteria, semantics_criteria, owned_conf, conf, path_regexp, 
-                               exclude_self, respect_order, relative_depth, top_node, ignore_fstate):
-        return self.generated_node.get_reachable_nodes(internals_criteria, semantics_criteria, owned_conf, conf,
-                                                       path_regexp=path_regexp, exclude_self=False,
-                                                       respect_order=respect_order, relative_depth=relative_depth,
-                                                       top_node=top_node, ignore_fstate=ignore_fstate)
+    def get_child_reachable_nodes(self, nodes, visited, compliant, conf, relative_depth, ignore_fstate):
+        self.generated_node._get_reachable_nodes_rec(nodes, visited, compliant, conf, relative_depth,
+                                                     ignore_fstate)
 
     def set_child_current_conf(self, node, conf, reverse, ignore_entanglement):
         if self.custo.forward_conf_change_mode:
@@ -1554,7 +1650,8 @@ class NodeInternals_GenFunc(NodeInternals):
 
     def get_child_all_path(self, name, htable, conf, recursive):
         if self.env is not None:
-            self.generated_node._get_all_paths_rec(name, htable, conf, recursive=recursive, first=False)
+            self.generated_node._get_all_paths_rec(name, htable, conf, recursive=recursive, first=False,
+                                                   parent=self)
         else:
             # If self.env is None, that means that a node graph is not fully constructed
             # thus we avoid a freeze side-effect (by resolving 'generated_node') of the
@@ -1585,6 +1682,18 @@ class NodeInternals_GenFunc(NodeInternals):
 
 
 class NodeInternals_Term(NodeInternals):
+
+    def _get_frozen_node(self):
+        return self._frozen_node
+
+    def _set_frozen_node(self, val):
+        self._frozen_node = val
+        if self._value_parents:
+            self._invalidate_value()
+
+    frozen_node = property(fget=_get_frozen_node, fset=_set_frozen_node)
+    '''Frozen value of the node internals. Setting it notifies the value parents.'''
+
     def _init_specific(self, arg):
         self.frozen_node = None
 
@@ -1618,6 +1727,12 @@ class NodeInternals_Term(NodeInternals):
 
         return (self, True) if return_node_internals else (val, True)
 
+    def _is_value_stable(self, conf):
+        return self._frozen_node is not None
+
+    def _get_stable_bytes(self, conf):
+        return self._frozen_node
+
     def _get_value_specific(self, conf, recursive):
         raise NotImplementedError
 
@@ -1723,9 +1838,8 @@ class NodeInternals_Term(NodeInternals):
     def reset_depth_specific(self, depth):
         pass
 
-    def get_child_nodes_by_attr(self, internals_criteria, semantics_criteria, owned_conf, conf, path_regexp,
-                               exclude_self, respect_order, relative_depth, top_node, ignore_fstate):
-        return None
+    def get_child_reachable_nodes(self, nodes, visited, compliant, conf, relative_depth, ignore_fstate):
+        pass
 
     def set_child_current_conf(self, node, conf, reverse, ignore_entanglement):
         pass
@@ -1740,6 +1854,34 @@ class NodeInternals_TypedValue(NodeInternals_Term):
         self.value_type = None
         self.__fuzzy_values = None
 
+    def __copy__(self):
+        # The value type is shared with the copy. Both node internals
+        # will make it private the first time they access it.
+        if self._vt_cow is None:
+            self._vt_cow = False
+        return NodeInternals_Term.__copy__(self)
+
+    def _get_vt(self):
+        if self._vt_cow is not None:
+            self._value_type = copy.copy(self._value_type)
+            self._value_type.make_private(forget_current_state=self._vt_cow)
+            self._vt_cow = None
+            if self.is_attr_set(NodeInternals.Determinist):
+                self._value_type.make_determinist()
+            else:
+                self._value_type.make_random()
+        return self._value_type
+
+    def _set_vt(self, vt):
+        self._value_type = vt
+        self._vt_cow = None
+
+    value_type = property(fget=_get_vt, fset=_set_vt)
+    '''Value type of the node internals. It is copied on first access when it
+    is still shared with the node internals it has been cloned from (the value
+    of the attribute ``_vt_cow`` then specifies if the current state of the
+    value type has to be forgotten).'''
+
     def _make_specific(self, name):
         if name == NodeInternals.Determinist:
             self.value_type.make_determinist()
@@ -1776,12 +1918,11 @@ class NodeInternals_TypedValue(NodeInternals_Term):
         return self.__fuzzy_values
 
     def _make_private_term_specific(self, ignore_frozen_state, accept_external_entanglement):
-        self.value_type = copy.copy(self.value_type)
-        self.value_type.make_private(forget_current_state=ignore_frozen_state)
-        if self.is_attr_set(NodeInternals.Determinist):
-            self.value_type.make_determinist()
+        # copy-on-write of the value type (refer to NodeInternals_TypedValue.value_type)
+        if self._vt_cow is not None and self._value_type is not None:
+            self._vt_cow = self._vt_cow or ignore_frozen_state
         else:
-            self.value_type.make_random()
+            self._vt_cow = None
         self.__fuzzy_values = copy.copy(self.__fuzzy_values)
 
     def _get_value_specific(self, conf=None, recursive=True):
@@ -1824,6 +1965,9 @@ class NodeInternals_TypedValue(NodeInternals_Term):
         return self.value_type.pretty_print(max_size=max_size)
 
     def __getattr__(self, name):
+        if name in ('_value_type', '_vt_cow'):
+            # not yet initialized (e.g., during unpickling)
+            raise AttributeError(name)
         vt = self.__getattribute__('value_type')
         if hasattr(vt, name):
             # to avoid looping in __getattr__
@@ -2160,6 +2304,8 @@ class NodeInternals_NonTerm(NodeInternals):
 
     def _init_specific(self, arg):
         self.encoder = None
+        self._path_subnodes = None  # ids of the subnodes walked by the last path index build
+        self._forget_value_cache()
         self.subnodes_set = None
         self.subnodes_order = None
         self.subnodes_attrs = None
@@ -2187,6 +2333,79 @@ class NodeInternals_NonTerm(NodeInternals):
     def set_encoder(self, encoder):
         self.encoder = encoder
         encoder.reset()
+        self._forget_value_cache()
+        self._invalidate_value()
+
+    def _forget_value_cache(self):
+        self._value_cache = None
+        self._value_cache_conf = None
+        self._value_srcs = None
+        self._bytes_cache = None
+
+    def _frozen_state_changed(self):
+        # The subnodes may be the same as before (e.g., when only their values change),
+        # thus the path indexes including this node are only checked on their next lookup.
+        self._notify_structure_check(self)
+        self._forget_value_cache()
+        self._invalidate_value()
+
+    def _get_path_subnodes(self):
+        if self.frozen_node_list is not None:
+            return self.frozen_node_list
+        iterable = copy.copy(self.subnodes_set)
+        if self.separator is not None:
+            iterable.add(self.separator.node)
+        return iterable
+
+    def _check_path_subnodes(self):
+        '''
+        Returns:
+            bool: True if the subnodes are the ones used by the last path index
+              walk. Otherwise, the path indexes including this node are invalidated.
+        '''
+        if self._path_subnodes == tuple(map(id, self._get_path_subnodes())):
+            return True
+        self._structure_changed()
+        return False
+
+    def _cache_value(self, value, node_list, conf):
+        srcs = []
+        for n in node_list:
+            internal = n._get_internals_for(conf)
+            if not internal._is_value_stable(conf):
+                return
+            srcs.append(internal)
+
+        for internal in srcs:
+            internal._add_value_parent(self)
+        self._value_cache = value
+        self._value_cache_conf = conf
+        self._value_srcs = srcs
+        self._bytes_cache = None
+
+    def _is_value_stable(self, conf):
+        return self._value_cache is not None and self._value_cache_conf == conf
+
+    def _get_stable_bytes(self, conf):
+        if self._bytes_cache is None:
+            value = self._value_cache
+            if isinstance(value, bytes):
+                # non-terminal encoding has been carried out
+                self._bytes_cache = value
+            elif self.custo.collapse_padding_mode:
+                self._bytes_cache = b''.join(value)
+            else:
+                self._bytes_cache = b''.join([i._get_stable_bytes(conf) for i in self._value_srcs])
+        return self._bytes_cache
+
+    def _get_stable_buffers(self, conf):
+        if self._bytes_cache is not None or isinstance(self._value_cache, bytes) \
+                or self.custo.collapse_padding_mode:
+            return [self._get_stable_bytes(conf)]
+        buffers = []
+        for i in self._value_srcs:
+            buffers.extend(i._get_stable_buffers(conf))
+        return buffers
 
     def __iter_csts(self, node_list):
         for delim, sublist in node_list:
@@ -2288,6 +2507,7 @@ class NodeInternals_NonTerm(NodeInternals):
             self.separator =  internals.separator
             self.subnodes_set = internals.subnodes_set
             self.customize(internals.custo)
+            self._frozen_state_changed()
 
         elif subnodes_order is not None:
             # This case is used by self.make_private_subnodes()
@@ -2431,6 +2651,18 @@ class NodeInternals_NonTerm(NodeInternals):
                                                 delayed_node_internals=delayed_node_internals)
 
 
+    @staticmethod
+    def _copy_node_for_csts(node, node_dico):
+        # A node referenced several times within the constraints is copied only once
+        new_node = node_dico.get(node, None)
+        if new_node is None:
+            new_node = copy.copy(node)
+            new_node.internals = copy.copy(node.internals)
+            for c in new_node.internals:
+                new_node.internals[c] = copy.copy(node.internals[c])
+            node_dico[node] = new_node
+        return new_node
+
     def get_subnodes_csts_copy(self, node_dico=None):
         node_dico = {} if node_dico is None else node_dico # node_dico[old_node] --> new_node
         csts_copy = []
@@ -2447,14 +2679,7 @@ class NodeInternals_NonTerm(NodeInternals):
                 new_sublist = []
                 if isinstance(sublist[0], Node):
                     for node in sublist:
-                        if node not in node_dico:
-                            node_dico[node] = copy.copy(node)
-                        new_node = node_dico[node]
-
-                        new_node.internals = copy.copy(new_node.internals)
-                        for c in new_node.internals:
-                            new_node.internals[c] = copy.copy(new_node.internals[c])
-                        new_sublist.append(new_node)
+                        new_sublist.append(self._copy_node_for_csts(node, node_dico))
 
                 elif isinstance(sublist[0], int):
                     new_sublist.append(sublist[0]) # add the total weight
@@ -2463,13 +2688,7 @@ class NodeInternals_NonTerm(NodeInternals):
                         if isinstance(node, int):  # it is not a node but the weight of the node
                             new_sslist.append(node) # add the relative weight
                         else:
-                            if node not in node_dico:
-                                node_dico[node] = copy.copy(node)
-                            new_node = node_dico[node]
-                            new_node.internals = copy.copy(new_node.internals)
-                            for c in new_node.internals:
-                                new_node.internals[c] = copy.copy(new_node.internals[c])
-                            new_sslist.append(new_node)
+                            new_sslist.append(self._copy_node_for_csts(node, node_dico))
 
                     new_sublist.append(new_sslist)
                 else:
@@ -2551,7 +2770,7 @@ class NodeInternals_NonTerm(NodeInternals):
         self.reset_state(recursive=False, exclude_self=False)
 
     def _get_random_component(self, comp_list, total_weight, check_existence=False):
-        r = random.uniform(0, total_weight)
+        r = rng.uniform(0, total_weight)
         s = 0
 
         for weight, comp in split_with(lambda x: isinstance(x, int), comp_list):
@@ -2604,7 +2823,7 @@ class NodeInternals_NonTerm(NodeInternals):
             total_weight += weight
 
         if seed is None:
-            r = random.uniform(0, total_weight)
+            r = rng.uniform(0, total_weight)
         else:
             r = seed
         s = 0
@@ -2764,7 +2983,7 @@ class NodeInternals_NonTerm(NodeInternals):
         if self.is_attr_set(NodeInternals.Determinist):
             nb = (mini + maxi) // 2
         else:
-            nb = random.randint(mini, maxi)
+            nb = rng.randint(mini, maxi)
 
         qty = self._qty_from_node(node)
         if qty is not None:
@@ -2987,7 +3206,7 @@ class NodeInternals_NonTerm(NodeInternals):
                     # unfold the Nodes one after another
                     if delim[2:] == '..':
                         for i in range(lg):
-                            node = random.choice(l)
+                            node = rng.choice(l)
                             l.remove(node)
                             self._construct_subnodes(node, sublist_tmp, delim[0], ignore_sep_fstate)
 
@@ -2995,13 +3214,13 @@ class NodeInternals_NonTerm(NodeInternals):
                     else:
                         list_unfold = []
                         for i in range(lg):
-                            node = random.choice(l)
+                            node = rng.choice(l)
                             l.remove(node)
                             self._construct_subnodes(node, list_unfold, delim[0], ignore_sep_fstate, ignore_separator=True)
 
                         lg = len(list_unfold)
                         for i in range(lg):
-                            node = random.choice(list_unfold)
+                            node = rng.choice(list_unfold)
                             list_unfold.remove(node)
                             sublist_tmp.append(node)
                             if self.separator is not None:
@@ -3020,7 +3239,7 @@ class NodeInternals_NonTerm(NodeInternals):
                             shall_exist = self._existence_from_node(n[0])
                             if shall_exist is None or shall_exist:
                                 ndesc_list.append(n)
-                        node = random.choice(ndesc_list) if ndesc_list else None
+                        node = rng.choice(ndesc_list) if ndesc_list else None
                     if node is None:
                         continue
                     else:
@@ -3041,6 +3260,8 @@ class NodeInternals_NonTerm(NodeInternals):
                 self.frozen_node_list.pop(-1)
             self._clone_separator_cleanup()
 
+        self._frozen_state_changed()
+
         return (self.frozen_node_list, True)
 
 
@@ -3051,8 +3272,16 @@ class NodeInternals_NonTerm(NodeInternals):
         The parameter return_node_internals is not used for non terminal nodes,
         only for terminal nodes. However, keeping it also for non terminal nodes
         avoid additional checks in the code.
+
+        Once frozen, the value is cached as long as the value of every subnode is
+        stable (refer to `_cache_value()`). Any later change of a subnode invalidates
+        the cache of all the non-terminal nodes depending on it.
         '''
 
+        if self._value_cache is not None and after_encoding and recursive and \
+                self._value_cache_conf == conf and self.frozen_node_list is not None:
+            return (self._value_cache, False)
+
         def tobytes_helper(node_internals):
             if isinstance(node_internals, bytes):
                 return node_internals
@@ -3122,8 +3351,10 @@ class NodeInternals_NonTerm(NodeInternals):
         node_list, was_not_frozen = self.get_subnodes_with_csts()
 
         djob_group_created = False
+        cacheable = after_encoding and recursive
         for n in node_list:
             if n.is_attr_set(NodeInternals.DISABLED):
+                cacheable = False
                 val = Node.DEFAULT_DISABLED_NODEINT
                 if not n.env.is_djob_registered(key=id(n), prio=Node.DJOBS_PRIO_nterm_existence):
                     if not djob_group_created:
@@ -3145,7 +3376,10 @@ class NodeInternals_NonTerm(NodeInternals):
         if node_list:
             node_env = node_list[0].env
         else:
-            return (handle_encoding(l), was_not_frozen)
+            ret = handle_encoding(l)
+            if cacheable:
+                self._cache_value(ret, node_list, conf)
+            return (ret, was_not_frozen)
 
         # We avoid reentrancy that could trigger recursive loop with
         # self._existence_from_node()
@@ -3181,7 +3415,11 @@ class NodeInternals_NonTerm(NodeInternals):
                                         if args[2] > job_idx:
                                             args[2] += node_qty-1
 
-        return (handle_encoding(l), was_not_frozen)
+        ret = handle_encoding(l)
+        if cacheable and not (node_env and node_env.djobs_exists(Node.DJOBS_PRIO_nterm_existence)):
+            self._cache_value(ret, node_list, conf)
+
+        return (ret, was_not_frozen)
 
 
     def get_raw_value(self, **kwargs):
@@ -3217,15 +3455,18 @@ class NodeInternals_NonTerm(NodeInternals):
             node_list.pop(idx)
             for i, n in enumerate(expand_list):
                 node_list.insert(idx+i, n)
+            node_internals._notify_structure_check(node_internals)
 
         return len(expand_list)
 
     @staticmethod
     def _cleanup_delayed_nodes(node, node_list, idx, conf, rec):
+        node_internals = node.get_private()[0]
         node.set_private(None)
         node.clear_attr(NodeInternals.DISABLED)
         if idx < len(node_list):
             node_list.pop(idx)
+            node_internals._notify_structure_check(node_internals)
 
     def set_separator_node(self, sep_node, prefix=True, suffix=True, unique=False):
         check_err = set()
@@ -3272,6 +3513,7 @@ class NodeInternals_NonTerm(NodeInternals):
     def replace_subnode(self, old, new):
         self.subnodes_set.remove(old)
         self.subnodes_set.add(new)
+        self._frozen_state_changed()
 
         self.subnodes_attrs[new] = self.subnodes_attrs[old]
         del self.subnodes_attrs[old]
@@ -3960,6 +4202,8 @@ class NodeInternals_NonTerm(NodeInternals):
         if self.encoder:
             consumed_size = len(original_blob)
 
+        self._frozen_state_changed()
+
         return status, 0, consumed_size, postponed_to_send_back
 
     def cancel_absorb(self):
@@ -3968,6 +4212,7 @@ class NodeInternals_NonTerm(NodeInternals):
         if self.separator is not None:
             self.separator.node.cancel_absorb()
         self.frozen_node_list = None
+        self._frozen_state_changed()
 
     def confirm_absorb(self):
         iterable = copy.copy(self.subnodes_set)
@@ -4091,6 +4336,7 @@ class NodeInternals_NonTerm(NodeInternals):
                                    reevaluate_constraints=reevaluate_constraints)
 
                 self.frozen_node_list = None
+                self._frozen_state_changed()
                 for n in self.subnodes_set:
                     n.clear_clone_info_since(n)
 
@@ -4111,6 +4357,7 @@ class NodeInternals_NonTerm(NodeInternals):
         if not dont_change_state and not only_generators and not reevaluate_constraints:
             self._cleanup_entangled_nodes()
             self.frozen_node_list = None
+            self._frozen_state_changed()
             self._nodes_drawn_qty = {}
             for n in self.subnodes_set:
                 self._clear_drawn_node_attrs(n)
@@ -4132,6 +4379,7 @@ class NodeInternals_NonTerm(NodeInternals):
         self._cleanup_entangled_nodes()
 
         self.frozen_node_list = None
+        self._frozen_state_changed()
         self._nodes_drawn_qty = {}
         for n in self.subnodes_set:
             self._clear_drawn_node_attrs(n)
@@ -4157,6 +4405,7 @@ class NodeInternals_NonTerm(NodeInternals):
 
     def _reset_state_info(self, new_info=None, nodes_drawn_qty=None):
         self.frozen_node_list = None
+        self._frozen_state_changed()
 
         if new_info is None:
             self.exhausted = False
@@ -4266,39 +4515,16 @@ class NodeInternals_NonTerm(NodeInternals):
         for e in iterable:
             e._reset_depth(depth)
 
-    def get_child_nodes_by_attr(self, internals_criteria, semantics_criteria, owned_conf, conf, path_regexp,
-                               exclude_self, respect_order, relative_depth, top_node, ignore_fstate):
-
+    def get_child_reachable_nodes(self, nodes, visited, compliant, conf, relative_depth, ignore_fstate):
+        # if the node is not frozen, the order will not be preserved
+        # as self.subnodes_set will be used as a base, and it is a set()
         if self.frozen_node_list is not None and not ignore_fstate:
             iterable = self.frozen_node_list
         else:
             iterable = self.subnodes_set
-            # self.get_subnodes_with_csts()
-            # iterable = self.frozen_node_list
-
-        if respect_order:
-            # if the node is not frozen, the order will not be
-            # preserved as self.subnodes_set will be used as a base,
-            # and it is a set()
-            s = []
-        else:
-            s = set()
 
         for e in iterable:
-            nlist = e.get_reachable_nodes(internals_criteria, semantics_criteria, owned_conf, conf,
-                                          path_regexp=path_regexp,
-                                          exclude_self=False, respect_order=respect_order,
-                                          relative_depth=relative_depth, top_node=top_node,
-                                          ignore_fstate=ignore_fstate)
-
-            if respect_order:
-                for e in nlist:
-                    if e not in s:
-                        s.append(e)
-            else:
-                s = s.union(nlist)
-
-        return s
+            e._get_reachable_nodes_rec(nodes, visited, compliant, conf, relative_depth, ignore_fstate)
 
 
     def set_child_current_conf(self, node, conf, reverse, ignore_entanglement):
@@ -4310,16 +4536,15 @@ class NodeInternals_NonTerm(NodeInternals):
 
 
     def get_child_all_path(self, name, htable, conf, recursive):
-        if self.frozen_node_list is not None:
-            iterable = self.frozen_node_list
-        else:
-            iterable = copy.copy(self.subnodes_set)
-            if self.separator is not None:
-                iterable.add(self.separator.node)
+        if self._path_subnodes is not None:
+            # the other path indexes including this node have to be aware of any change
+            self._check_path_subnodes()
+        iterable = self._get_path_subnodes()
+        self._path_subnodes = tuple(map(id, iterable))
 
         for idx, e in enumerate(iterable):
             e._get_all_paths_rec(name, htable, conf, recursive=recursive, first=False,
-                                 clone_idx=idx)
+                                 clone_idx=idx, parent=self)
 
     def set_size_from_constraints(self, size, encoded_size):
         # not supported
@@ -4655,6 +4880,7 @@ class Node(object):
         assert '/' not in name  # '/' is a reserved character
 
         self.internals = {}
+        self.current_conf = None
         self.name = name
         self.env = None
 
@@ -4671,6 +4897,11 @@ class Node(object):
         self.abs_postpone_sent_back = None  # used for absorption to transfer a resolved postpone
                                             # node back to where it was defined
 
+        self._paths_cache = None  # path index built by get_all_paths()
+        self._structure_version = 0  # raised when the path index has to be rebuilt
+        self._structure_parents = None  # internals whose path index walk includes this node
+        self._structure_checks = None  # internals to check before using the path index
+
         if base_node is not None and subnodes is None and values is None and value_type is None:
 
             self._delayed_jobs_called = base_node._delayed_jobs_called
@@ -4744,8 +4975,11 @@ class Node(object):
         # It does not handle self.internals nor self.entangled_nodes which are copied
         # in a different way.
 
-        new_node = type(self)(self.name)
+        new_node = type(self).__new__(type(self))
         new_node.__dict__.update(self.__dict__)
+        new_node._paths_cache = None
+        new_node._structure_parents = None
+        new_node._structure_checks = None
         if self.semantics is not None:
             new_node.semantics = copy.copy(self.semantics)
             new_node.semantics.make_private()
@@ -4784,6 +5018,7 @@ class Node(object):
         self._post_freeze_handler = base_node._post_freeze_handler
         
         if self.internals:
+            self._invalidate_value()
             self.internals = {}
         if self.entangled_nodes:
             self.entangled_nodes = None
@@ -4905,6 +5140,8 @@ class Node(object):
 
         self._reset_depth(parent_depth=self.depth-1)
 
+        self._structure_changed()
+
         return node_dico
 
     def set_fuzz_weight(self, w):
@@ -4951,6 +5188,7 @@ class Node(object):
         # @conf could not be None or the empty string
         if conf and conf not in self.internals:
             self.internals[conf] = None
+            self._structure_changed()
             return True
         else:
             return False
@@ -4958,6 +5196,7 @@ class Node(object):
     def remove_conf(self, conf):
         if conf != 'MAIN':
             del self.internals[conf]
+            self._structure_changed()
 
     def is_conf_existing(self, conf):
         return conf in self.internals
@@ -4971,6 +5210,10 @@ class Node(object):
     def _set_subtrees_current_conf(self, node, conf, reverse, ignore_entanglement=False):
         conf2 = conf if node.is_conf_existing(conf) else node.current_conf
 
+        if conf2 != node.current_conf:
+            node._invalidate_value()
+            node._structure_changed()
+
         if not reverse:
             node.current_conf = conf2
 
@@ -4999,6 +5242,9 @@ class Node(object):
                 self._set_subtrees_current_conf(e, conf, reverse, ignore_entanglement=ignore_entanglement)
             else:
                 if e.is_conf_existing(conf):
+                    if conf != e.current_conf:
+                        e._invalidate_value()
+                        e._structure_changed()
                     e.current_conf = conf
 
         if not ignore_entanglement and self.entangled_nodes is not None:
@@ -5044,7 +5290,10 @@ class Node(object):
         return self.internals[self.current_conf]
 
     def __set_current_internals(self, internal):
+        if self.internals[self.current_conf] is not None:
+            self.internals[self.current_conf]._invalidate_value()
         self.internals[self.current_conf] = internal
+        self._structure_changed()
 
     def __get_internals(self):
         return self.internals
@@ -5058,12 +5307,39 @@ class Node(object):
     def conf(self, conf=None):
         conf = self.__check_conf(conf)
         return self.internals[conf]
+
+    def _get_internals_for(self, conf):
+        # Same resolution as the one performed by Node._get_value()
+        return self.internals[conf if conf in self.internals else self.current_conf]
+
+    def _invalidate_value(self):
+        for internal in self.internals.values():
+            if internal is not None:
+                internal._invalidate_value()
+
+    def _structure_changed(self):
+        self._structure_version += 1
+        parents = self._structure_parents
+        if parents:
+            self._structure_parents = None
+            for p in parents:
+                p._structure_changed()
+
+    def _notify_structure_check(self, internal):
+        if self._paths_cache is not None:
+            if self._structure_checks is None:
+                self._structure_checks = set()
+            self._structure_checks.add(internal)
+        if self._structure_parents:
+            for p in self._structure_parents:
+                p._notify_structure_check(internal)
     
     def get_internals_backup(self):
         return Node(self.name, base_node=self, ignore_frozen_state=False,
                     accept_external_entanglement=True)
 
     def set_internals(self, backup):
+        self._invalidate_value()
         self.name = backup.name
         self.env = backup.env
         self.semantics = backup.semantics
@@ -5074,6 +5350,7 @@ class Node(object):
         self.current_conf = backup.current_conf
         self.entangled_nodes = backup.entangled_nodes
         self._delayed_jobs_called = backup._delayed_jobs_called
+        self._structure_changed()
 
     def __check_conf(self, conf):
         if conf is None:
@@ -5133,6 +5410,7 @@ class Node(object):
             self.internals[c].reset_depth_specific(self.depth)
 
     def _finalize_nonterm_node(self, conf, depth=None):
+        self._structure_changed()
         if not depth:
             depth = self.depth
 
@@ -5177,6 +5455,8 @@ class Node(object):
         new_internals = NodeInternals_NonTerm()
         if preserve_node:
             new_internals.set_contents_from(self.internals[conf])
+        if self.internals[conf] is not None:
+            self.internals[conf]._invalidate_value()
         self.internals[conf] = new_internals
         self.internals[conf].import_subnodes_basic(node_list, separator=separator, preserve_node=preserve_node)
         self._finalize_nonterm_node(conf)
@@ -5194,6 +5474,8 @@ class Node(object):
         new_internals = NodeInternals_NonTerm()
         if preserve_node:
             new_internals.set_contents_from(self.internals[conf])
+        if self.internals[conf] is not None:
+            self.internals[conf]._invalidate_value()
         self.internals[conf] = new_internals
         self.internals[conf].import_subnodes_with_csts(wlnode_list, separator=separator, preserve_node=preserve_node)
         self._finalize_nonterm_node(conf)
@@ -5209,6 +5491,8 @@ class Node(object):
         new_internals = NodeInternals_NonTerm()
         if preserve_node:
             new_internals.set_contents_from(self.internals[conf])
+        if self.internals[conf] is not None:
+            self.internals[conf]._invalidate_value()
         self.internals[conf] = new_internals
         self.internals[conf].import_subnodes_full_format(subnodes_order=subnodes_order,
                                                          subnodes_attrs=subnodes_attrs,
@@ -5223,7 +5507,10 @@ class Node(object):
         new_internals = NodeInternals_TypedValue()
         if preserve_node:
             new_internals.set_contents_from(self.internals[conf])
+        if self.internals[conf] is not None:
+            self.internals[conf]._invalidate_value()
         self.internals[conf] = new_internals
+        self._structure_changed()
 
         if values is not None:
             self.internals[conf].import_value_type(value_type=fvt.String(values=values))
@@ -5250,7 +5537,10 @@ class Node(object):
         new_internals = NodeInternals_Func()
         if preserve_node:
             new_internals.set_contents_from(self.internals[conf])
+        if self.internals[conf] is not None:
+            self.internals[conf]._invalidate_value()
         self.internals[conf] = new_internals
+        self._structure_changed()
         self.internals[conf].import_func(func,
                                          fct_node_arg=func_node_arg, fct_arg=func_arg,
                                          provide_helpers=provide_helpers)
@@ -5270,7 +5560,10 @@ class Node(object):
         new_internals = NodeInternals_GenFunc()
         if preserve_node:
             new_internals.set_contents_from(self.internals[conf])
+        if self.internals[conf] is not None:
+            self.internals[conf]._invalidate_value()
         self.internals[conf] = new_internals
+        self._structure_changed()
         self.internals[conf].import_generator_func(gen_func,
                                                    generator_node_arg=func_node_arg, generator_arg=func_arg,
                                                    provide_helpers=provide_helpers)
@@ -5282,7 +5575,10 @@ class Node(object):
 
     def make_empty(self, conf=None):
         conf = self.__check_conf(conf)
+        if self.internals[conf] is not None:
+            self.internals[conf]._invalidate_value()
         self.internals[conf] = NodeInternals_Empty()
+        self._structure_changed()
         
     def is_empty(self, conf=None):
         conf = self.__check_conf(conf)
@@ -5404,95 +5700,45 @@ class Node(object):
     def get_reachable_nodes(self, internals_criteria=None, semantics_criteria=None,
                             owned_conf=None, conf=None, path_regexp=None, exclude_self=False,
                             respect_order=False, relative_depth=-1, top_node=None, ignore_fstate=False):
-        
-        def __compliant(node, config, top_node):
-            if node is top_node and exclude_self:
-                return False
 
-            if internals_criteria:
-                cond1 = node.internals[config].match(internals_criteria)
-            else:
-                cond1 = True
+        if top_node is None:
+            top_node = self
+
+        if path_regexp is not None:
+            # The paths are computed once from top_node, then each node is checked by identity
+            search = re.compile(path_regexp).search
+            path_matching_nodes = set()
+            for p, e in top_node.iter_paths():
+                if e not in path_matching_nodes and search(p):
+                    path_matching_nodes.add(e)
+        else:
+            path_matching_nodes = None
 
-            if semantics_criteria:
-                if node.semantics is None:
-                    cond2 = False
-                else:
-                    cond2 = node.semantics.match(semantics_criteria)
-            else:
-                cond2 = True
+        def __compliant(node, config):
+            if node is top_node and exclude_self:
+                return False
 
-            if path_regexp is not None:
-                paths = node.get_all_paths_from(top_node)
-                for p in paths:
-                    if re.search(path_regexp, p):
-                        cond3 = True
-                        break
-                else:
-                    cond3 = False
-            else:
-                cond3 = True
+            if owned_conf is not None and not node.is_conf_existing(owned_conf):
+                return False
 
-            return cond1 and cond2 and cond3
+            if internals_criteria and not node.internals[config].match(internals_criteria):
+                return False
 
+            if semantics_criteria:
+                if node.semantics is None or not node.semantics.match(semantics_criteria):
+                    return False
 
-        def get_reachable_nodes_rec(node, config, rdepth, top_node):
-            s = []
-            # if respect_order:
-            #     s = []
-            # else:
-            #     s = set()
+            if path_matching_nodes is not None and node not in path_matching_nodes:
+                return False
 
-            if config == None:
-                config = self.current_conf
-                next_conf = None
-            else:
-                next_conf = config
-
-            if not node.is_conf_existing(config):
-                config = node.current_conf
-
-            internal = node.internals[config]
-
-            if node.is_conf_existing(owned_conf) or (owned_conf == None):
-                if __compliant(node, config, top_node):
-                    s.append(node)
-                    # if respect_order:
-                    #     s.append(node)
-                    # else:
-                    #     s.add(node)
-
-            if rdepth <= -1 or rdepth > 0:
-                s2 = internal.get_child_nodes_by_attr(internals_criteria=internals_criteria,
-                                                      semantics_criteria=semantics_criteria,
-                                                      owned_conf=owned_conf, conf=next_conf,
-                                                      path_regexp=path_regexp,
-                                                      exclude_self=False,
-                                                      respect_order=respect_order,
-                                                      relative_depth = rdepth - 1,
-                                                      top_node=top_node, ignore_fstate=ignore_fstate)
-                if s2:
-                    for e in s2:
-                        if e not in s:
-                            s.append(e)
-                    # if respect_order:
-                    #     for e in s2:
-                    #         if e not in s:
-                    #             s.append(e)
-                    # else:
-                    #     s = s.union(s2)
-
-            return s
+            return True
 
-        if top_node is None:
-            nodes = get_reachable_nodes_rec(node=self, config=conf, rdepth=relative_depth,
-                                            top_node=self)
-        else:
-            nodes = get_reachable_nodes_rec(node=self, config=conf, rdepth=relative_depth,
-                                            top_node=top_node)
+        # Nodes are identity-hashed, thus an OrderedDict is used as an ordered set
+        nodes = collections.OrderedDict()
+        self._get_reachable_nodes_rec(nodes, {}, __compliant, conf, relative_depth, ignore_fstate)
 
         if respect_order:
-            return nodes
+            return list(nodes)
         else:
             l1 = []
             l2 = []
@@ -5505,6 +5751,23 @@ class Node(object):
 
             return l1 + sorted(l2, key=lambda x: x.name)
 
+    def _get_reachable_nodes_rec(self, nodes, visited, compliant, conf, rdepth, ignore_fstate):
+        # A node reachable through several paths is only walked again if more
+        # depth remains to explore from it. (-1 means infinite depth)
+        remaining = rdepth if rdepth > -1 else float('inf')
+        if visited.get(self, -1) >= remaining:
+            return
+        visited[self] = remaining
+
+        config = conf if conf is not None and self.is_conf_existing(conf) else self.current_conf
+
+        if self not in nodes and compliant(self, config):
+            nodes[self] = None
+
+        if rdepth <= -1 or rdepth > 0:
+            self.internals[config].get_child_reachable_nodes(nodes, visited, compliant, conf,
+                                                             rdepth - 1, ignore_fstate)
+
 
     @staticmethod
     def filter_out_entangled_nodes(node_list):
@@ -5532,25 +5795,31 @@ class Node(object):
         '''
         if path is None:
             assert(path_regexp is not None)
+            htable = self._get_paths_index(conf, recursive=True)
+            lookups = self._paths_cache[2]
+            try:
+                return lookups[(conf, path_regexp)]
+            except KeyError:
+                pass
             # Find *one* Node whose path match the regexp
-            for n, e in self.iter_paths(conf=conf):
-                if re.search(path_regexp, n):
+            search = re.compile(path_regexp).search
+            for n, e in htable.items():
+                if search(n[0] if isinstance(n, tuple) else n):
                     ret = e
                     break
             else:
                 ret = None
+            lookups[(conf, path_regexp)] = ret
         else:
-            htable = self.get_all_paths(conf=conf)
+            htable = self._get_paths_index(conf, recursive=True)
             # Find the Node through exact path
-            try:
-                ret = htable[path]
-            except KeyError:
-                ret = None
+            ret = htable.get(path, None)
 
         return ret
 
 
-    def _get_all_paths_rec(self, pname, htable, conf, recursive, first=True, clone_idx=0):
+    def _get_all_paths_rec(self, pname, htable, conf, recursive, first=True, clone_idx=0,
+                           parent=None):
 
         next_conf = conf if recursive else None
 
@@ -5567,6 +5836,48 @@ class Node(object):
 
         internal.get_child_all_path(name, htable, conf=next_conf, recursive=recursive)
 
+        # Register the structure dependencies once the subnodes have been walked (the walk
+        # may invalidate the previous ones), so that any later change invalidates the path
+        # index of the nodes above.
+        if parent is not None:
+            if self._structure_parents is None:
+                self._structure_parents = set()
+            self._structure_parents.add(parent)
+        internal._add_structure_parent(self)
+
+
+    def _get_paths_index(self, conf, recursive):
+        '''
+        Return the path index of the graph behind this node. It is built once and kept
+        until the structure of this graph changes (refer to `_structure_changed()`).
+        The returned dictionary shall not be modified.
+        '''
+        cache = self._paths_cache
+        if cache is not None and self._structure_checks:
+            # non-terminal nodes whose frozen state changed since the index was built
+            checks = self._structure_checks
+            self._structure_checks = None
+            for internal in checks:
+                if not internal._check_path_subnodes():
+                    break
+
+        if cache is not None and cache[0] == self._structure_version:
+            htable = cache[1].get((conf, recursive))
+            if htable is not None:
+                return htable
+
+        htable = collections.OrderedDict()
+        self._get_all_paths_rec('', htable, conf, recursive=recursive)
+
+        # The walk may have resolved generator nodes, and thus changed the structure
+        # version. The index reflects the resulting structure anyway.
+        if cache is None or cache[0] != self._structure_version:
+            # (version, path indexes, regexp lookups)
+            cache = (self._structure_version, {}, {})
+            self._paths_cache = cache
+        cache[1][(conf, recursive)] = htable
+
+        return htable
 
     def get_all_paths(self, conf=None, recursive=True, depth_min=None, depth_max=None):
         """
@@ -5574,15 +5885,14 @@ class Node(object):
             dict: the keys are either a 'path' or a tuple ('path', int) when the path already
               exists (case of the same node used more than once within the same non-terminal)
         """
-        htable = collections.OrderedDict()
-        self._get_all_paths_rec('', htable, conf, recursive=recursive)
+        htable = collections.OrderedDict(self._get_paths_index(conf, recursive))
 
         if depth_min is not None or depth_max is not None:
             depth_min = int(depth_min) if depth_min is not None else 0
             depth_max = int(depth_max) if depth_max is not None else -1
             paths = copy.copy(htable)
             for k in paths:
-                depth = len(k.split('/'))
+                depth = len((k[0] if isinstance(k, tuple) else k).split('/'))
                 if depth < depth_min:
                     del htable[k]
                 elif depth_max != -1 and depth > depth_max:
@@ -5591,8 +5901,11 @@ class Node(object):
         return htable
 
     def iter_paths(self, conf=None, recursive=True, depth_min=None, depth_max=None, only_paths=False):
-        htable = self.get_all_paths(conf=conf, recursive=recursive, depth_min=depth_min,
-                                    depth_max=depth_max)
+        if depth_min is None and depth_max is None:
+            htable = self._get_paths_index(conf, recursive)
+        else:
+            htable = self.get_all_paths(conf=conf, recursive=recursive, depth_min=depth_min,
+                                        depth_max=depth_max)
         for path, node in htable.items():
             if isinstance(path, tuple):
                 yield path[0] if only_paths else (path[0], node)
@@ -5716,6 +6029,11 @@ class Node(object):
                                                  return_node_internals=False)[0]
 
         node_internals_list = self.freeze(conf=conf, recursive=recursive)
+        if recursive:
+            internal = self._get_internals_for(conf)
+            if internal._is_value_stable(conf):
+                return internal._get_stable_bytes(conf)
+
         if isinstance(node_internals_list, list):
             node_internals_list = list(flatten(node_internals_list))
             if node_internals_list:
@@ -5729,6 +6047,27 @@ class Node(object):
 
         return val
 
+    def to_buffers(self, conf=None, recursive=True):
+        """
+        Same as :meth:`to_bytes` but without concatenating the values of the terminal nodes
+        (unless it has already been done and cached).
+
+        Returns:
+            list: bytes whose concatenation is the value of the node
+        """
+        node_internals_list = self.freeze(conf=conf, recursive=recursive)
+        if recursive:
+            internal = self._get_internals_for(conf)
+            if internal._is_value_stable(conf):
+                return internal._get_stable_buffers(conf)
+
+        if isinstance(node_internals_list, list):
+            return [i if isinstance(i, bytes) else i._get_value(conf=conf, recursive=recursive,
+                                                                return_node_internals=False)[0]
+                    for i in flatten(node_internals_list)]
+        else:
+            return [node_internals_list]
+
     def to_str(self, conf=None, recursive=True):
         val = self.to_bytes(conf=conf, recursive=recursive)
         return unconvert_from_internal_repr(val)
@@ -5755,6 +6094,11 @@ class Node(object):
                                                  return_node_internals=False)[0]
 
         node_internals_list = self._get_value(conf=conf, recursive=recursive)
+        if recursive:
+            internal = self._get_internals_for(conf)
+            if internal._is_value_stable(conf):
+                return internal._get_stable_bytes(conf)
+
         if isinstance(node_internals_list, list):
             node_internals_list = list(flatten(node_internals_list))
             if node_internals_list:
@@ -6216,6 +6560,9 @@ class Env(object):
         return bool(self._sorted_jobs)
 
     def __getattr__(self, name):
+        # 'env4NT' may not be set yet (e.g., during unpickling)
+        if name == 'env4NT' or name.startswith('__'):
+            raise AttributeError(name)
         if hasattr(self.env4NT, name):
             return self.env4NT.__getattribute__(name)
         else:
@@ -30,6 +30,7 @@ import collections
 
 import copy
 import re
+import json
 import pickle
 import readline
 import cmd
@@ -37,6 +38,9 @@ import atexit
 import datetime
 import time
 import signal
+import threading
+
+from six.moves import queue
 
 from libs.external_modules import *
 
@@ -80,6 +84,79 @@ def is_python_file(fname):
     return r_pyfile.match(fname)
 
 
+class DiscoveryCache(object):
+    '''
+    Persistent record of what the data model and project modules declare (name,
+    data makers, ...), so that these modules are only imported when they are used.
+    An entry is identified by the module name and is only valid while the
+    modification times of the module files are unchanged.
+    '''
+
+    def __init__(self, path):
+        self._path = path
+        self._entries = {}
+        self._modified = False
+        try:
+            with open(path, 'r') as f:
+                cache = json.load(f)
+            if cache['version'] == fuddly_version:
+                self._entries = cache['entries']
+        except (IOError, OSError, ValueError, KeyError, TypeError):
+            pass
+
+    @staticmethod
+    def _get_mtimes(files):
+        try:
+            return [os.path.getmtime(f) for f in files]
+        except OSError:
+            return None
+
+    def get(self, module, files):
+        entry = self._entries.get(module)
+        if entry is None or entry['mtimes'] != self._get_mtimes(files):
+            return None
+        return entry['info']
+
+    def set(self, module, files, info):
+        mtimes = self._get_mtimes(files)
+        if mtimes is None:
+            return
+        self._entries[module] = {'mtimes': mtimes, 'info': info}
+        self._modified = True
+
+    def save(self):
+        if not self._modified:
+            return
+        # several fuddly instances may share the cache
+        tmp_path = '{:s}.{:d}'.format(self._path, os.getpid())
+        try:
+            with open(tmp_path, 'w') as f:
+                json.dump({'version': fuddly_version, 'entries': self._entries}, f)
+            getattr(os, 'replace', os.rename)(tmp_path, self._path)
+        except (IOError, OSError):
+            print(colorize("*** WARNING: the discovery cache '{:s}' has not been "
+                           "saved ***".format(self._path), rgb=Color.WARNING))
+        else:
+            self._modified = False
+
+
+class _ModuleDict(dict):
+    '''
+    Dictionary of data models or projects (by name) that imports the ones
+    that are missing through the provided `loader`.
+    '''
+
+    def __init__(self, loader):
+        dict.__init__(self)
+        self._loader = loader
+
+    def __missing__(self, name):
+        obj = self._loader(name)
+        if obj is None:
+            raise KeyError(name)
+        return obj
+
+
 class ExportableFMKOps(object):
 
     def __init__(self, fmk):
@@ -208,13 +285,104 @@ class FmkTask(threading.Thread):
         self._stop.set()
 
 
+class DataProducer(threading.Thread):
+    '''
+    Generate data ahead of their emission, so that the data makers keep working
+    while the framework is waiting for the target feedback. The data are made
+    available in their generation order through get().
+
+    `get_data_func` is not thread-safe (it changes the data makers, the framework
+    database and the framework error state). Thus, each call is made while holding
+    `lock`, which the framework only releases while waiting for the target.
+    '''
+
+    def __init__(self, get_data_func, action_list, nb, depth, lock, error_func,
+                 valid_gen=False, save_seed=False):
+        '''
+        Args:
+          get_data_func (function): function used to generate each data (typically
+            FmkPlumbing.get_data()).
+          action_list (list): generation instructions provided to `get_data_func`.
+          nb (int): number of data to generate (-1 to generate data until stop() is called).
+          depth (int): maximum number of data generated ahead of their retrieval.
+          lock (threading.RLock): lock protecting the framework state used by `get_data_func`.
+          error_func (function): function called (with a message) from within the exception
+            handler when `get_data_func` raises an exception.
+        '''
+        threading.Thread.__init__(self)
+        self.daemon = True
+        self._get_data = get_data_func
+        self._lock = lock
+        self._error_func = error_func
+        self._action_list = action_list
+        self._nb = nb
+        self._valid_gen = valid_gen
+        self._save_seed = save_seed
+        self._queue = queue.Queue(maxsize=max(depth, 1))
+        self._held_data = None
+        self._stop_event = threading.Event()
+
+    def run(self):
+        cpt = 0
+        while (cpt < self._nb or self._nb == -1) and not self._stop_event.is_set():
+            cpt += 1
+            with self._lock:
+                try:
+                    data = self._get_data(self._action_list, valid_gen=self._valid_gen,
+                                          save_seed=self._save_seed)
+                except Exception:
+                    self._error_func("Data generation has failed")
+                    data = None
+            self._held_data = data
+            while not self._stop_event.is_set():
+                try:
+                    self._queue.put(data, timeout=0.1)
+                except queue.Full:
+                    continue
+                self._held_data = None
+                break
+            if data is None:
+                # None means the generation has failed. It is forwarded to the consumer.
+                break
+
+    def get(self):
+        '''
+        Returns:
+          Data: the next generated data, or None if the generation has failed.
+        '''
+        return self._queue.get()
+
+    def stop(self):
+        '''
+        Stop the generation.
+
+        Returns:
+          list: the data that have been generated but not retrieved, in their generation order.
+        '''
+        self._stop_event.set()
+        self.join()
+        remaining = []
+        while True:
+            try:
+                remaining.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+        if self._held_data is not None:
+            remaining.append(self._held_data)
+        return [d for d in remaining if d is not None]
+
+
 class FmkPlumbing(object):
 
     ''' 
     Defines the methods to operate every sub-systems of fuddly
     '''
 
-    def __init__(self):
+    def __init__(self, fmkdb=None):
+        '''
+        Args:
+          fmkdb (Database): the FmkDB to use. If `None`, the default one is used.
+        '''
         self.__started = False
         self.__first_loading = True
 
@@ -233,10 +401,11 @@ class FmkPlumbing(object):
         self.import_text_reg = re.compile('(.*?)(#####)', re.S)
         self.check_clone_re = re.compile('(.*)#(\w{1,20})')
 
-        self.prj_list = []
+        # loaded projects and data models (refer to the properties prj_list and dm_list)
+        self._prj_list = []
         self._prj_dict = {}
 
-        self.dm_list = []
+        self._dm_list = []
         self.__st_dict = {}
         self.__target_dict = {}
         self.__current_tg = 0
@@ -249,13 +418,29 @@ class FmkPlumbing(object):
         self.__dyngenerators_created = {}
         self.__dynamic_generator_ids = {}
 
-        self._name2dm = {}
-        self._name2prj = {}
+        self._name2dm = _ModuleDict(self._get_data_model)
+        self._name2prj = _ModuleDict(self._get_project)
+
+        # discovered data models and projects that are not yet imported (by name)
+        self._dm_index = collections.OrderedDict()
+        self._prj_index = collections.OrderedDict()
+        self._discovery_cache = DiscoveryCache(os.path.join(gr.fuddly_data_folder,
+                                                            'discovery_cache.json'))
 
         self._task_list = {}
         self._task_list_lock = threading.Lock()
+        # serialize the framework state between the main thread and a DataProducer
+        self._fmk_lock = threading.RLock()
+
+        self._pipeline_depth = 0
+        self._pregenerated_data = None
+        self._worker_pool = None
 
-        self.fmkDB = Database()
+        # the seed of each test case is derived from this one
+        self._rng_seed = random.SystemRandom().getrandbits(63)
+        self._test_case_cpt = 0
+
+        self.fmkDB = Database() if fmkdb is None else fmkdb
         ok = self.fmkDB.start()
         if not ok:
             raise InvalidFmkDB("The database {:s} is invalid!".format(self.fmkDB.fmk_db_path))
@@ -482,7 +667,15 @@ class FmkPlumbing(object):
 
 
     def _fmkDB_insert_dm_and_dmakers(self, dm_name, tactics):
+        self._fmkDB_insert_dmakers_desc(dm_name, self._get_dmakers_desc(tactics))
+
+    def _fmkDB_insert_dmakers_desc(self, dm_name, dmakers_desc):
         self.fmkDB.insert_data_model(dm_name)
+        for dmaker_type, dmaker_name, is_gen, stateful in dmakers_desc:
+            self.fmkDB.insert_dmaker(dm_name, dmaker_type, dmaker_name, is_gen, stateful)
+
+    def _get_dmakers_desc(self, tactics):
+        dmakers_desc = []
         disruptor_types = tactics.disruptor_types
         if disruptor_types:
             for dis_type in sorted(disruptor_types):
@@ -490,14 +683,14 @@ class FmkPlumbing(object):
                 for dis_name in disruptor_names:
                     dis_obj = tactics.get_disruptor_obj(dis_type, dis_name)
                     stateful = True if issubclass(dis_obj.__class__, StatefulDisruptor) else False
-                    self.fmkDB.insert_dmaker(dm_name, dis_type, dis_name, False, stateful)
+                    dmakers_desc.append((dis_type, dis_name, False, stateful))
         generator_types = tactics.generator_types
         if generator_types:
             for gen_type in sorted(generator_types):
                 generator_names = tactics.get_generators_list(gen_type)
                 for gen_name in generator_names:
-                    gen_obj = tactics.get_generator_obj(gen_type, gen_name)
-                    self.fmkDB.insert_dmaker(dm_name, gen_type, gen_name, True, True)
+                    dmakers_desc.append((gen_type, gen_name, True, True))
+        return dmakers_desc
 
     def _recover_target(self):
         if self.group_id == self._saved_group_id:
@@ -555,16 +748,19 @@ class FmkPlumbing(object):
     def get_data_models(self):
 
         data_models = collections.OrderedDict()
+        dm_dirs = {}
         def populate_data_models(path):
             dm_dir = os.path.basename(os.path.normpath(path))
             for (dirpath, dirnames, filenames) in os.walk(path):
                 if filenames:
                     data_models[dm_dir] = []
                     data_models[dm_dir].extend(filenames)
+                    dm_dirs[dm_dir] = path
                 for d in dirnames:
                     full_path = os.path.join(path, d)
                     rel_path = os.path.join(dm_dir, d)
                     data_models[rel_path] = []
+                    dm_dirs[rel_path] = full_path
                     for (dth, dnames, fnm) in os.walk(full_path):
                         data_models[rel_path].extend(fnm)
                         break
@@ -595,19 +791,59 @@ class FmkPlumbing(object):
                     continue
                 name = res.group(1)
                 if name + '.py' in file_list:
-                    dm_params = self.__import_dm(prefix, name)
-                    if dm_params is not None:
-                        self.__add_data_model(dm_params['dm'], dm_params['tactics'],
-                                              dm_params['dm_rld_args'],
-                                              reload_dm=False)
-                        self.__dyngenerators_created[dm_params['dm']] = False
-                        # populate FMK DB
-                        self._fmkDB_insert_dm_and_dmakers(dm_params['dm'].name, dm_params['tactics'])
+                    files = [os.path.join(dm_dirs[dname], name + '.py'),
+                             os.path.join(dm_dirs[dname], f)]
+                    info = self._discovery_cache.get(prefix + name, files)
+                    if info is None:
+                        self.__register_dm_module(prefix, name, files)
+                    else:
+                        # the module will be imported when the data model is used
+                        dm_name = info['name']
+                        if dm_name in self._dm_index or \
+                                dm_name in map(lambda x: x.name, self._dm_list):
+                            raise ValueError("A data model with the name '%s' already exist!" % dm_name)
+                        self._dm_index[dm_name] = (prefix, name, files)
+                        print(colorize("*** Found Data Model: '%s' ***" % dm_name, rgb=Color.FMKSUBINFO))
+                        self._fmkDB_insert_dmakers_desc(dm_name, info['dmakers'])
 
         self.fmkDB.insert_data_model(Database.DEFAULT_DM_NAME)
         self.fmkDB.insert_dmaker(Database.DEFAULT_DM_NAME, Database.DEFAULT_GTYPE_NAME,
                                  Database.DEFAULT_GEN_NAME, True, True)
 
+        self._discovery_cache.save()
+
+
+    def __register_dm_module(self, prefix, name, files):
+        dm_params = self.__import_dm(prefix, name)
+        if dm_params is None:
+            return None
+
+        self.__add_data_model(dm_params['dm'], dm_params['tactics'],
+                              dm_params['dm_rld_args'],
+                              reload_dm=False)
+        self.__dyngenerators_created[dm_params['dm']] = False
+        # populate FMK DB
+        dmakers_desc = self._get_dmakers_desc(dm_params['tactics'])
+        self._fmkDB_insert_dmakers_desc(dm_params['dm'].name, dmakers_desc)
+
+        self._discovery_cache.set(prefix + name, files,
+                                  {'name': dm_params['dm'].name, 'dmakers': dmakers_desc})
+        return dm_params['dm']
+
+    def _get_data_model(self, name):
+        for dm in self._dm_list:
+            if dm.name == name:
+                return dm
+
+        if name not in self._dm_index:
+            return None
+
+        prefix, mod_name, files = self._dm_index.pop(name)
+        dm = self.__register_dm_module(prefix, mod_name, files)
+        self._discovery_cache.save()
+        if dm is None or dm.name != name:
+            return None
+        return dm
 
     def __import_dm(self, prefix, name, reload_dm=False):
 
@@ -679,18 +915,18 @@ class FmkPlumbing(object):
     def __add_data_model(self, data_model, strategy, dm_rld_args,
                          reload_dm=False):
 
-        if data_model.name not in map(lambda x: x.name, self.dm_list):
-            self.dm_list.append(data_model)
+        if data_model.name not in map(lambda x: x.name, self._dm_list):
+            self._dm_list.append(data_model)
             old_dm = None
         elif reload_dm:
-            for dm in self.dm_list:
+            for dm in self._dm_list:
                 if dm.name == data_model.name:
                     break
             else:
                 raise ValueError
             old_dm = dm
-            self.dm_list.remove(dm)
-            self.dm_list.append(data_model)
+            self._dm_list.remove(dm)
+            self._dm_list.append(data_model)
         else:
             raise ValueError("A data model with the name '%s' already exist!" % data_model.name)
 
@@ -710,16 +946,19 @@ class FmkPlumbing(object):
     def get_projects(self):
 
         projects = collections.OrderedDict()
+        prj_dirs = {}
         def populate_projects(path):
             prj_dir = os.path.basename(os.path.normpath(path))
             for (dirpath, dirnames, filenames) in os.walk(path):
                 if filenames:
                     projects[prj_dir] = []
                     projects[prj_dir].extend(filenames)
+                    prj_dirs[prj_dir] = path
                 for d in dirnames:
                     full_path = os.path.join(path, d)
                     rel_path = os.path.join(prj_dir, d)
                     projects[rel_path] = []
+                    prj_dirs[rel_path] = full_path
                     for (dth, dnames, fnm) in os.walk(full_path):
                         projects[rel_path].extend(fnm)
                         break
@@ -749,13 +988,51 @@ class FmkPlumbing(object):
                 if res is None:
                     continue
                 name = res.group(1)
-                prj_params = self._import_project(prefix, name)
-                if prj_params is not None:
-                    self._add_project(prj_params['project'],
-                                      prj_params['target'], prj_params['logger'],
-                                      prj_params['prj_rld_args'],
-                                      reload_prj=False)
-                    self.fmkDB.insert_project(prj_params['project'].name)
+                files = [os.path.join(prj_dirs[dname], f)]
+                info = self._discovery_cache.get(prefix + name + '_proj', files)
+                if info is None:
+                    self._register_prj_module(prefix, name, files)
+                else:
+                    # the module will be imported when the project is used
+                    prj_name = info['name']
+                    if prj_name in self._prj_index or \
+                            prj_name in map(lambda x: x.name, self._prj_list):
+                        raise ValueError("A project with the name '%s' already exist!" % prj_name)
+                    self._prj_index[prj_name] = (prefix, name, files)
+                    print(colorize("*** Found Project: '%s' ***" % prj_name, rgb=Color.FMKSUBINFO))
+                    self.fmkDB.insert_project(prj_name)
+
+        self._discovery_cache.save()
+
+    def _register_prj_module(self, prefix, name, files):
+        prj_params = self._import_project(prefix, name)
+        if prj_params is None:
+            return None
+
+        self._add_project(prj_params['project'],
+                          prj_params['target'], prj_params['logger'],
+                          prj_params['prj_rld_args'],
+                          reload_prj=False)
+        self.fmkDB.insert_project(prj_params['project'].name)
+
+        self._discovery_cache.set(prefix + name + '_proj', files,
+                                  {'name': prj_params['project'].name})
+        return prj_params['project']
+
+    def _get_project(self, name):
+        for prj in self._prj_list:
+            if prj.name == name:
+                return prj
+
+        if name not in self._prj_index:
+            return None
+
+        prefix, mod_name, files = self._prj_index.pop(name)
+        prj = self._register_prj_module(prefix, mod_name, files)
+        self._discovery_cache.save()
+        if prj is None or prj.name != name:
+            return None
+        return prj
 
 
     def _import_project(self, prefix, name, reload_prj=False):
@@ -841,18 +1118,18 @@ class FmkPlumbing(object):
     def _add_project(self, project, target, logger, prj_rld_args,
                      reload_prj=False):
 
-        if project.name not in map(lambda x: x.name, self.prj_list):
-            self.prj_list.append(project)
+        if project.name not in map(lambda x: x.name, self._prj_list):
+            self._prj_list.append(project)
             old_prj = None
         elif reload_prj:
-            for prj in self.prj_list:
+            for prj in self._prj_list:
                 if prj.name == project.name:
                     break
             else:
                 raise ValueError
             old_prj = prj
-            self.prj_list.remove(prj)
-            self.prj_list.append(project)
+            self._prj_list.remove(prj)
+            self._prj_list.append(project)
         else:
             raise ValueError("A project with the name '%s' already exist!" % project.name)
 
@@ -973,6 +1250,10 @@ class FmkPlumbing(object):
 
     def __stop_fmk_plumbing(self):
         self.flush_errors()
+        if self._worker_pool is not None:
+            self._worker_pool.stop()
+            self._worker_pool = None
+
         if self.__is_started():
             if self.is_target_enabled():
                 self.log_target_residual_feedback()
@@ -1102,6 +1383,7 @@ class FmkPlumbing(object):
         print(colorize(FontStyle.BOLD + '\n-=[ FMK Internals ]=-\n', rgb=Color.INFO))
         print(colorize('                     Fuzz delay: ', rgb=Color.SUBINFO) + str(self._delay))
         print(colorize('   Number of data sent in burst: ', rgb=Color.SUBINFO) + str(self._burst))
+        print(colorize(' Number of data generated ahead: ', rgb=Color.SUBINFO) + str(self._pipeline_depth))
         print(colorize('    Target health-check timeout: ', rgb=Color.SUBINFO) + str(self._hc_timeout))
         print(colorize('        Target feedback timeout: ', rgb=Color.SUBINFO) + str(self.tg.feedback_timeout))
         print(colorize('           Target feedback mode: ', rgb=Color.SUBINFO) + fbk_mode)
@@ -1110,37 +1392,69 @@ class FmkPlumbing(object):
 
     @EnforceOrder(accepted_states=['20_load_prj','25_load_dm','S1','S2'])
     def projects(self):
-        for prj in self.prj_list:
+        for prj in self._projects():
             yield prj
 
     def _projects(self):
         for prj in self.prj_list:
             yield prj
 
+    @property
+    def prj_list(self):
+        '''
+        List of all the Project objects. The projects that have not been imported yet are
+        imported first.
+        '''
+        for name in list(self._prj_index):
+            self._get_project(name)
+        return self._prj_list
+
+    def _project_names(self):
+        for prj in self._prj_list:
+            yield prj.name
+        for name in self._prj_index:
+            yield name
+
     @EnforceOrder(accepted_states=['20_load_prj','25_load_dm','S1','S2'])
     def show_projects(self):
         print(colorize(FontStyle.BOLD + '\n-=[ Projects ]=-\n', rgb=Color.INFO))
         idx = 0
-        for prj in self._projects():
-            print(colorize('[%d] ' % idx + prj.name, rgb=Color.SUBINFO))
+        for name in self._project_names():
+            print(colorize('[%d] ' % idx + name, rgb=Color.SUBINFO))
             idx += 1
 
 
     @EnforceOrder(accepted_states=['20_load_prj','25_load_dm','S1','S2'])
     def iter_data_models(self):
-        for dm in self.dm_list:
+        for dm in self.__iter_data_models():
             yield dm
 
     def __iter_data_models(self):
         for dm in self.dm_list:
             yield dm
 
+    @property
+    def dm_list(self):
+        '''
+        List of all the DataModel objects. The data models that have not been imported yet
+        are imported first.
+        '''
+        for name in list(self._dm_index):
+            self._get_data_model(name)
+        return self._dm_list
+
+    def _data_model_names(self):
+        for dm in self._dm_list:
+            yield dm.name
+        for name in self._dm_index:
+            yield name
+
     @EnforceOrder(accepted_states=['20_load_prj','25_load_dm','S1','S2'])
     def show_data_models(self):
         print(colorize(FontStyle.BOLD + '\n-=[ Data Models ]=-\n', rgb=Color.INFO))
         idx = 0
-        for dm in self.__iter_data_models():
-            print(colorize('[%d] ' % idx + dm.name, rgb=Color.SUBINFO))
+        for name in self._data_model_names():
+            print(colorize('[%d] ' % idx + name, rgb=Color.SUBINFO))
             idx += 1
 
     def __init_fmk_internals_step1(self, prj, dm):
@@ -1190,13 +1504,7 @@ class FmkPlumbing(object):
 
     @EnforceOrder(accepted_states=['20_load_prj','25_load_dm','S1','S2'])
     def get_data_model_by_name(self, name):
-        for model in self.__iter_data_models():
-            if model.name == name:
-                ret = model
-                break
-        else:
-            ret = None
-        return ret
+        return self._get_data_model(name)
 
     @EnforceOrder(accepted_states=['25_load_dm','S1','S2'], transition=['25_load_dm','S1'])
     def load_data_model(self, dm=None, name=None):
@@ -1208,7 +1516,7 @@ class FmkPlumbing(object):
                 return False
 
         elif dm is not None:
-            if dm not in self.dm_list:
+            if dm not in self._dm_list:
                 return False
 
         if self.__is_started():
@@ -1241,7 +1549,7 @@ class FmkPlumbing(object):
             
         elif dm_list is not None:
             for dm in dm_list:
-                if dm not in self.dm_list:
+                if dm not in self._dm_list:
                     return False
 
         if self.__is_started():
@@ -1275,7 +1583,7 @@ class FmkPlumbing(object):
                 dyn_gen_ids.append(dmk_id)
 
         new_dm.name = name[:-1]
-        is_dm_name_exists = new_dm.name in map(lambda x: x.name, self.dm_list)
+        is_dm_name_exists = new_dm.name in map(lambda x: x.name, self._dm_list)
 
         if reload_dm or not is_dm_name_exists:
             self.fmkDB.insert_data_model(new_dm.name)
@@ -1311,17 +1619,28 @@ class FmkPlumbing(object):
 
     @EnforceOrder(accepted_states=['20_load_prj','25_load_dm','S1','S2'])
     def get_project_by_name(self, name):
-        for prj in self._projects():
-            if prj.name == name:
-                ret = prj
-                break
-        else:
-            ret = None
-        return ret
+        return self._get_project(name)
 
 
     @EnforceOrder(accepted_states=['20_load_prj','25_load_dm','S1','S2'], final_state='S2')
-    def run_project(self, prj=None, name=None, tg=None, dm_name=None):
+    def run_project(self, prj=None, name=None, tg=None, dm_name=None, workers=None):
+        '''
+        Load a project with its data model(s) and launch it.
+
+        Args:
+          prj (Project): the project to run (or use `name`).
+          name (str): the name of the project to run.
+          tg (int): the number of the target to use.
+          dm_name (str): the name of the data model to load (or a list of names). If `None`,
+            the default data model of the project is loaded.
+          workers: if provided, the send loops are shared out among worker processes (refer
+            to :class:`framework.workers.FmkWorkerPool`), each one having its own instance
+            of the target. Either the number of workers (each one using the target `tg`), or
+            a list of target numbers (one worker per target).
+
+        Returns:
+          bool: True if the project has been launched successfully.
+        '''
         ok = self.load_project(prj=prj, name=name)
         if not ok:
            return False
@@ -1347,7 +1666,51 @@ class FmkPlumbing(object):
         else:
             self.__set_target(0)
 
-        return self.launch()
+        ok = self.launch()
+        if ok and workers is not None:
+            if isinstance(workers, int):
+                workers = [0 if tg is None else tg] * workers
+            ok = self.start_workers(workers, dm_name=dm_name)
+
+        return ok
+
+    @EnforceOrder(accepted_states=['S2'])
+    def start_workers(self, targets, dm_name=None):
+        '''
+        Start worker processes running the current project, which will share out the
+        next send loops. Their records are written to the FmkDB of this instance.
+
+        Args:
+          targets (list): for each worker, the number of the target it will use.
+          dm_name (str): the name of the data model to load (or a list of names). If `None`,
+            the currently loaded data model is used.
+
+        Returns:
+          bool: True if every worker has been started successfully.
+        '''
+        if self._worker_pool is not None:
+            self._worker_pool.stop()
+            self._worker_pool = None
+
+        if not targets:
+            return True
+
+        if dm_name is None:
+            dm_name = self.dm.name
+
+        # imported here because the workers import this module
+        from framework.workers import FmkWorkerPool
+
+        self.fmkDB.flush()
+        pool = FmkWorkerPool(self.fmkDB, self.prj.name, dm_name, targets,
+                             rng_seed=self._rng_seed)
+        if not pool.start():
+            self.set_error('The worker processes have not started successfully!',
+                           code=Error.FmkError)
+            return False
+
+        self._worker_pool = pool
+        return True
 
 
     @EnforceOrder(accepted_states=['20_load_prj','25_load_dm','S1','S2'], final_state='25_load_dm')
@@ -1358,7 +1721,7 @@ class FmkPlumbing(object):
                 return False
 
         elif prj is not None:
-            if prj not in self.prj_list:
+            if prj not in self._prj_list:
                 return False
 
         self.prj = prj
@@ -1426,6 +1789,28 @@ class FmkPlumbing(object):
             self.lg.log_fmk_info('Wrong burst value!', do_record=False)
             return False
 
+    @EnforceOrder(accepted_states=['S1','S2'])
+    def set_pipeline_depth(self, depth, do_record=False):
+        if depth >= 0:
+            self._pipeline_depth = int(depth)
+            self.lg.log_fmk_info('Number of data generated ahead in send loops = %d' % self._pipeline_depth,
+                                 do_record=do_record)
+            return True
+        else:
+            self.lg.log_fmk_info('Wrong pipeline depth value!', do_record=False)
+            return False
+
+    @EnforceOrder(accepted_states=['S1','S2'])
+    def set_rng_seed(self, seed, do_record=False):
+        '''
+        Set the seed from which the seeds of the next test cases are derived. (Each test case
+        is generated with its own seed, refer to :meth:`get_data`.)
+        '''
+        self._rng_seed = seed
+        self._test_case_cpt = 0
+        self.lg.log_fmk_info('RNG seed = {!s}'.format(seed), do_record=do_record)
+        return True
+
     @EnforceOrder(accepted_states=['S1','S2'])
     def set_health_check_timeout(self, timeout, do_record=False, do_show=True):
         if timeout >= 0:
@@ -1496,8 +1881,9 @@ class FmkPlumbing(object):
                             ret = False
                     except KeyboardInterrupt:
                         ret = False
-                        self.set_error("The operation has been cancelled by the user (while in delay step)!",
-                                       code=Error.OperationCancelled)
+                        with self._fmk_lock:
+                            self.set_error("The operation has been cancelled by the user (while in delay step)!",
+                                           code=Error.OperationCancelled)
                     finally:
                         signal.signal(signal.SIGINT, signal.SIG_IGN)
 
@@ -1509,8 +1895,9 @@ class FmkPlumbing(object):
                         time.sleep(self._delay)
                     except KeyboardInterrupt:
                         ret = False
-                        self.set_error("The operation has been cancelled by the user (while in delay step)!",
-                                       code=Error.OperationCancelled)
+                        with self._fmk_lock:
+                            self.set_error("The operation has been cancelled by the user (while in delay step)!",
+                                           code=Error.OperationCancelled)
                     finally:
                         signal.signal(signal.SIGINT, signal.SIG_IGN)
                 else:
@@ -1798,75 +2185,85 @@ class FmkPlumbing(object):
 
     @EnforceOrder(accepted_states=['S2'])
     def send_data_and_log(self, data_list, original_data=None, verbose=False):
+        '''
+        Send the data to the target, log them and retrieve the feedback.
 
-        orig_data_provided = original_data is not None
+        The framework state is locked all along, except while waiting for the target, the
+        fuzzing delay or the probes. A :class:`DataProducer` (refer to :meth:`send_loop`)
+        generates the next data during these periods.
+        '''
+        with self._fmk_lock:
+            orig_data_provided = original_data is not None
 
-        if isinstance(data_list, Data):
-            data_list = [data_list]
-            if orig_data_provided:
-                original_data = [original_data]
-        elif isinstance(data_list, list):
-            assert original_data is None or isinstance(original_data, (list, tuple))
-        else:
-            raise ValueError
+            if isinstance(data_list, Data):
+                data_list = [data_list]
+                if orig_data_provided:
+                    original_data = [original_data]
+            elif isinstance(data_list, list):
+                assert original_data is None or isinstance(original_data, (list, tuple))
+            else:
+                raise ValueError
 
-        try:
-            data_list = self._do_sending_and_logging_init(data_list)
-        except (TargetFeedbackError, UserInterruption):
-            return False
+            try:
+                data_list = self._do_sending_and_logging_init(data_list)
+            except (TargetFeedbackError, UserInterruption):
+                return False
 
-        if not data_list:
-            return True
+            if not data_list:
+                return True
 
-        data_list = self._send_data(data_list, add_preamble=True)
-        if data_list is None:
-            # In this case, some data callbacks have triggered to block the emission of
-            # what was in data_list. We go on because this is a normal behavior (especially in the
-            # context of Scenario() execution).
-            return True
+            data_list = self._send_data(data_list, add_preamble=True)
+            if data_list is None:
+                # In this case, some data callbacks have triggered to block the emission of
+                # what was in data_list. We go on because this is a normal behavior (especially in the
+                # context of Scenario() execution).
+                return True
 
-        if self._sending_error:
-            return False
+            if self._sending_error:
+                for dt in data_list:
+                    dt.drop_snapshot()
+                return False
 
-        # All feedback entries that are available for relevant framework users (scenario
-        # callbacks, operators, ...) are flushed just after sending a new data because it
-        # means the previous feedback entries are obsolete.
-        self.fmkDB.flush_current_feedback()
+            # All feedback entries that are available for relevant framework users (scenario
+            # callbacks, operators, ...) are flushed just after sending a new data because it
+            # means the previous feedback entries are obsolete.
+            self.fmkDB.flush_current_feedback()
 
-        if len(data_list) > 1:
-            # the provided data_list can be changed after having called self._send_data()
-            multiple_data = True
-        else:
-            multiple_data = False
+            if len(data_list) > 1:
+                # the provided data_list can be changed after having called self._send_data()
+                multiple_data = True
+            else:
+                multiple_data = False
 
-        if self._wkspace_enabled:
-            for idx, dt in zip(range(len(data_list)), data_list):
-                if orig_data_provided:
-                    self.__current.append((original_data[idx], dt))
-                else:
-                    self.__current.append((None, dt))
+            if self._wkspace_enabled:
+                for idx, dt in zip(range(len(data_list)), data_list):
+                    if orig_data_provided:
+                        self.__current.append((original_data[idx], dt))
+                    else:
+                        self.__current.append((None, dt))
 
-        if orig_data_provided:
-            for dt_orig in original_data:
-                if dt_orig is not None:
-                    dt_orig.make_recordable()
+            if orig_data_provided:
+                for dt_orig in original_data:
+                    if dt_orig is not None:
+                        dt_orig.make_recordable()
 
-        for dt in data_list:
-            dt.make_recordable()
+            for dt in data_list:
+                dt.make_recordable()
 
-        if multiple_data:
-            self._log_data(data_list, original_data=original_data,
-                           verbose=verbose)
-        else:
-            orig = original_data[0] if orig_data_provided else None
-            self._log_data(data_list[0], original_data=orig, verbose=verbose)
+            if multiple_data:
+                self._log_data(data_list, original_data=original_data,
+                               verbose=verbose)
+            else:
+                orig = original_data[0] if orig_data_provided else None
+                self._log_data(data_list[0], original_data=orig, verbose=verbose)
 
         # When checking target readiness, feedback timeout is taken into account indirectly
         # through the call to Target.is_target_ready_for_new_data()
         cont0 = self.check_target_readiness() >= 0
 
-        ack_date = self.tg.get_last_target_ack_date()
-        self.lg.log_target_ack_date(ack_date)
+        with self._fmk_lock:
+            ack_date = self.tg.get_last_target_ack_date()
+            self.lg.log_target_ack_date(ack_date)
 
         if cont0:
             cont0 = self.__delay_fuzzing()
@@ -1875,21 +2272,90 @@ class FmkPlumbing(object):
         cont2 = True
         # That means this is the end of a burst
         if self._burst_countdown == self._burst:
-            cont1 = self.log_target_feedback()
+            with self._fmk_lock:
+                cont1 = self.log_target_feedback()
 
         self.mon.notify_target_feedback_retrieval()
         self.mon.wait_for_probe_status_retrieval()
 
-        if self._burst_countdown == self._burst:
-            # We handle probe feedback if any
-            cont2 = self.monitor_probes(force_record=True)
-            self.tg.cleanup()
+        with self._fmk_lock:
+            if self._burst_countdown == self._burst:
+                # We handle probe feedback if any
+                cont2 = self.monitor_probes(force_record=True)
+                self.tg.cleanup()
 
-        self._do_after_feedback_retrieval(data_list)
+            self._do_after_feedback_retrieval(data_list)
+
+            self.fmkDB.signal_test_case_end()
 
         return cont0 and cont1 and cont2
 
 
+    @EnforceOrder(accepted_states=['S2'])
+    def send_loop(self, action_list, nb, valid_gen=False, save_seed=False):
+        '''
+        Generate and send `nb` data from the same generation instructions.
+
+        If a pipeline depth has been set (refer to :meth:`set_pipeline_depth`), the data are
+        generated by a :class:`DataProducer` thread, at most `depth` data ahead of their
+        emission. Otherwise, each data is generated just before being sent.
+
+        If the loop is stopped before the end (because of the target or the user), the data
+        that have been generated in advance are not lost. They will be the first ones to be
+        sent by the next loop using the same generation instructions.
+
+        Args:
+          action_list (list): generation instructions (refer to :meth:`get_data`).
+          nb (int): number of data to send (-1 to loop until the target or the user stops it).
+
+        Returns:
+          bool: False if the generation of a data has failed, True otherwise.
+        '''
+        if self._worker_pool is not None:
+            return self._worker_pool.send_loop(action_list, nb, valid_gen=valid_gen,
+                                               save_seed=save_seed)
+
+        key = (str(action_list), valid_gen, save_seed)
+        if self._pregenerated_data is not None and self._pregenerated_data[0] == key:
+            pending = collections.deque(self._pregenerated_data[1])
+        else:
+            pending = collections.deque()
+        self._pregenerated_data = None
+
+        producer = None
+        if self._pipeline_depth > 0:
+            producer = DataProducer(self.get_data, action_list,
+                                    nb=-1 if nb == -1 else max(nb - len(pending), 0),
+                                    depth=self._pipeline_depth,
+                                    lock=self._fmk_lock,
+                                    error_func=self._handle_user_code_exception,
+                                    valid_gen=valid_gen, save_seed=save_seed)
+            producer.start()
+
+        ok = True
+        try:
+            cpt = 0
+            while cpt < nb or nb == -1:
+                cpt += 1
+                if pending:
+                    data = pending.popleft()
+                elif producer is not None:
+                    data = producer.get()
+                else:
+                    data = self.get_data(action_list, valid_gen=valid_gen, save_seed=save_seed)
+                if data is None:
+                    ok = False
+                    break
+                if not self.send_data_and_log(data):
+                    break
+        finally:
+            if producer is not None:
+                pending.extend(producer.stop())
+            if pending:
+                self._pregenerated_data = (key, list(pending))
+
+        return ok
+
     @EnforceOrder(accepted_states=['S2'])
     def _send_data(self, data_list, add_preamble=False):
         '''
@@ -1918,6 +2384,11 @@ class FmkPlumbing(object):
                 self.mon.notify_error()
                 return None
 
+            # From now on, the data are serialized only once for the target, the logger
+            # and the fmkDB. The snapshots are dropped once the data are logged.
+            for dt in data_list:
+                dt.make_snapshot()
+
             self._sending_error = False
             try:
                 if len(data_list) == 1:
@@ -2068,6 +2539,8 @@ class FmkPlumbing(object):
                 if multiple_data:
                     self.lg.log_fn("--------------------------", rgb=Color.SUBINFO)
 
+                dt.drop_snapshot()
+
 
     @EnforceOrder(accepted_states=['S2'])
     def new_transfer_preamble(self):
@@ -2148,7 +2621,10 @@ class FmkPlumbing(object):
 
     @EnforceOrder(accepted_states=['S2'])
     def check_target_readiness(self):
-
+        '''
+        The framework lock is only held while querying the target, so that a
+        :class:`DataProducer` can generate data during the waiting periods.
+        '''
         if self.__tg_enabled:
             t0 = datetime.datetime.now()
 
@@ -2156,28 +2632,34 @@ class FmkPlumbing(object):
             try:
                 signal.signal(signal.SIGINT, sig_int_handler)
                 ret = 0
-                while not self.tg.is_target_ready_for_new_data():
+                while True:
+                    with self._fmk_lock:
+                        if self.tg.is_target_ready_for_new_data():
+                            break
                     time.sleep(0.01)
                     now = datetime.datetime.now()
                     if (now - t0).total_seconds() > self._hc_timeout:
                         print('\n***DBG: FBK timeout')
-                        self.lg.log_target_feedback_from(
-                            '*** Timeout! The target does not seem to be ready.',
-                            now, status_code=-1, source='Fuddly FmK'
-                        )
-                        ret = -1
-                        self.tg.cleanup()
+                        with self._fmk_lock:
+                            self.lg.log_target_feedback_from(
+                                '*** Timeout! The target does not seem to be ready.',
+                                now, status_code=-1, source='Fuddly FmK'
+                            )
+                            ret = -1
+                            self.tg.cleanup()
                         break
             except KeyboardInterrupt:
-                self.lg.log_comment("*** Waiting for target to become ready has been cancelled by the user!\n")
-                self.set_error("Waiting for target to become ready has been cancelled by the user!",
-                               code=Error.OperationCancelled)
-                ret = -2
-                self.tg.cleanup()
+                with self._fmk_lock:
+                    self.lg.log_comment("*** Waiting for target to become ready has been cancelled by the user!\n")
+                    self.set_error("Waiting for target to become ready has been cancelled by the user!",
+                                   code=Error.OperationCancelled)
+                    ret = -2
+                    self.tg.cleanup()
             except:
-                self._handle_user_code_exception()
-                ret = -3
-                self.tg.cleanup()
+                with self._fmk_lock:
+                    self._handle_user_code_exception()
+                    ret = -3
+                    self.tg.cleanup()
             finally:
                 signal.signal(signal.SIGINT, signal.SIG_IGN)
 
@@ -2250,9 +2732,20 @@ class FmkPlumbing(object):
             self.__register_in_data_bank(None, data)
 
     @EnforceOrder(accepted_states=['S2'])
-    def enable_fmkdb(self):
-        self.fmkDB.enable()
-        self.lg.log_fmk_info('Enable FmkDB', do_record=False)
+    def enable_fmkdb(self, group_commit=None):
+        '''
+        Enable FmkDB recording.
+
+        Args:
+            group_commit (bool): If `False`, the records of each test case are committed at the
+              end of the test case. If `True`, records are committed by groups spanning several
+              test cases (refer to :class:`framework.database.Database`), which is faster but
+              some records could be lost if fuddly crashes. If `None`, the current
+              policy is kept.
+        '''
+        self.fmkDB.enable(group_commit=group_commit)
+        policy = 'group commit' if self.fmkDB.group_commit else 'per test case commit'
+        self.lg.log_fmk_info('Enable FmkDB ({:s})'.format(policy), do_record=False)
 
     @EnforceOrder(accepted_states=['S2'])
     def disable_fmkdb(self):
@@ -2655,7 +3148,8 @@ class FmkPlumbing(object):
         return True
 
     @EnforceOrder(accepted_states=['S2'])
-    def get_data(self, action_list, data_orig=None, valid_gen=False, save_seed=False):
+    def get_data(self, action_list, data_orig=None, valid_gen=False, save_seed=False,
+                 rng_seed=None):
         '''
         @action_list shall have the following formats:
         [(action_1, generic_UI_1, specific_UI_1), ...,
@@ -2664,8 +3158,19 @@ class FmkPlumbing(object):
         [action_1, (action_2, generic_UI_2, specific_UI_2), ... action_n]
 
         where action_N can be either: dmaker_type_N or (dmaker_type_N, dmaker_name_N)
+
+        The random number generator of the calling thread is seeded with @rng_seed, or
+        with a seed derived from the one of the framework (refer to set_rng_seed()) and
+        the number of the test case. The seed is recorded within the generated data
+        (refer to Data.get_rng_seed()) and in the FmkDB, so that the test case can be
+        regenerated independently of the others, on any thread or worker.
         '''
 
+        if rng_seed is None:
+            rng_seed = gr.derive_seed(self._rng_seed, self._test_case_cpt)
+            self._test_case_cpt += 1
+        gr.rng.seed(rng_seed)
+
         l = []
         action_list = action_list[:]
 
@@ -3007,10 +3512,16 @@ class FmkPlumbing(object):
                            code=Error.DataInvalid)
             return None
         else:
+            if isinstance(data, Data):
+                data.set_rng_seed(rng_seed)
+                # the data is frozen while the RNG is in the state related to the test case
+                data.get_content()
             return data
 
     @EnforceOrder(accepted_states=['S1','S2'])
     def cleanup_all_dmakers(self, reset_existing_seed=True):
+        # data generated in advance are no more relevant
+        self._pregenerated_data = None
 
         for dmaker_obj in self.__initialized_dmakers:
             if self.__initialized_dmakers[dmaker_obj][0]:
@@ -3500,15 +4011,11 @@ class FmkShell(cmd.Cmd):
 
         arg = line.strip()
 
-        ok = False
-        for dm in self.fz.iter_data_models():
-            if dm.name == arg:
-                ok = True
-                break
+        dm = self.fz.get_data_model_by_name(arg)
 
         self.__error_msg = "Data Model '%s' is not available" % arg
 
-        if not ok:
+        if dm is None:
             return False
 
         if not self.fz.load_data_model(dm=dm):
@@ -3527,9 +4034,8 @@ class FmkShell(cmd.Cmd):
         args = line.split()
 
         ok = True
-        dm_name_list = [x.name for x in self.fz.dm_list]
         for dm_name in args:
-            if dm_name not in dm_name_list:
+            if self.fz.get_data_model_by_name(dm_name) is None:
                 ok = False
                 break
 
@@ -3552,15 +4058,11 @@ class FmkShell(cmd.Cmd):
 
         arg = line.strip()
 
-        ok = False
-        for prj in self.fz.projects():
-            if prj.name == arg:
-                ok = True
-                break
+        prj = self.fz.get_project_by_name(arg)
 
         self.__error_msg = "Project '%s' is not available" % arg
 
-        if not ok:
+        if prj is None:
             return False
 
         if not self.fz.load_project(prj=prj):
@@ -3602,14 +4104,10 @@ class FmkShell(cmd.Cmd):
                 self.__error_msg = "Parameter 2 shall be an integer!"
                 return False
 
-        ok = False
-        for prj in self.fz.projects():
-            if prj.name == prj_name:
-                ok = True
-                break
+        prj = self.fz.get_project_by_name(prj_name)
 
         self.__error_msg = "Project '%s' is not available" % prj_name
-        if not ok:
+        if prj is None:
             return False
 
         self.__error_msg = "Unable to launch the project '%s'" % prj_name
@@ -4156,17 +4654,10 @@ class FmkShell(cmd.Cmd):
             self.__error_msg = "Syntax Error!"
             return False
 
-        # for i in range(nb):
-        cpt = 0
-        while cpt < max_loop or max_loop == -1:
-            cpt += 1
-            data = self.fz.get_data(t, valid_gen=valid_gen, save_seed=use_existing_seed)
-            if data is None:
-                return False
-            cont = self.fz.send_data_and_log(data)
-            if not cont:
-                break
- 
+        ok = self.fz.send_loop(t, max_loop, valid_gen=valid_gen, save_seed=use_existing_seed)
+        if not ok:
+            return False
+
         self.__error = False
         return False
 
@@ -4411,6 +4902,33 @@ class FmkShell(cmd.Cmd):
         return False
 
 
+    def do_set_pipeline(self, line):
+        '''
+        Set the number of data generated ahead of their emission during a
+        send loop (Default = 0). Data makers then keep working while the
+        framework waits for the target feedback.
+        |  syntax: set_pipeline <arg>
+        |  |_ possible values for <arg>:
+        |      0  : each data is generated just before being sent
+        |      N  : up to N data are generated in advance
+        '''
+        self.__error = True
+
+        args = line.split()
+        args_len = len(args)
+
+        if args_len != 1:
+            return False
+        try:
+            val = int(args[0])
+            self.fz.set_pipeline_depth(val)
+        except:
+            return False
+
+        self.__error = False
+        return False
+
+
     def do_set_burst(self, line):
         '''
         Set the burst value. Used by the FMK to decide when delay
@@ -4739,8 +5257,30 @@ class FmkShell(cmd.Cmd):
         return False
 
     def do_fmkdb_enable(self, line):
-        '''Enable FmkDB recording'''
-        self.fz.enable_fmkdb()
+        '''
+        Enable FmkDB recording. Records are either committed at the end of each test case
+        (default) or by groups spanning several test cases (faster, but less durable).
+        |_ syntax: fmkdb_enable [per_case|group]
+        '''
+        self.__error = True
+        self.__error_msg = "Syntax Error!"
+
+        args = line.split()
+        if len(args) > 1:
+            return False
+        elif len(args) == 1:
+            if args[0] == 'group':
+                group_commit = True
+            elif args[0] == 'per_case':
+                group_commit = False
+            else:
+                return False
+        else:
+            group_commit = None
+
+        self.fz.enable_fmkdb(group_commit=group_commit)
+
+        self.__error = False
         return False
 
     def do_fmkdb_disable(self, line):
@@ -315,7 +315,7 @@ class Tactics(object):
 
     
     def __get_random_data_maker(self, dict_var, dmaker_type, total_weight, valid):
-        r = random.uniform(0, total_weight)
+        r = rng.uniform(0, total_weight)
         s = 0
 
         if not valid:
@@ -398,6 +398,9 @@ class UI(object):
         return True, None
 
     def __getattr__(self, name):
+        if name == 'inputs':
+            # not yet set (e.g., when the UI is unpickled by a worker process)
+            raise AttributeError(name)
         if name in self.inputs:
             return self.inputs[name]
         else:
@@ -525,12 +528,36 @@ GENERIC_ARGS = {
     'runs_per_node': ('maximum number of test cases for a single node (-1 means until the end)', -1, int),
     'clone_node': ('if True the dmaker will always return a copy ' \
                    'of the node. (for stateless diruptors dealing with ' \
-                   'big data it can be usefull to it to False)', True, bool)
+                   'big data it can be usefull to it to False)', True, bool),
+    'shard': ('only walk through the steps of this share of the model walk ' \
+              '(the step N belongs to the share (N-1) % nb_shards)', None, int),
+    'nb_shards': ('number of shares the model walk is split into', None, int),
+    'checkpoint': ('name of a file (within the workspace folder) where the state of the ' \
+                   'model walk is saved every @checkpoint_freq steps', None, str),
+    'checkpoint_freq': ('number of steps between two saves of the model walk state', 100, int),
+    'resume': ('if True, resume the model walk from the state saved in @checkpoint (if ' \
+               'it exists), without walking through the previous steps again', False, bool)
 }
 
+# Default sharding of the model walks, used when a data maker does not specify it
+# (set by the fuddly worker processes---refer to framework/workers.py)
+_modelwalker_sharding = (0, 1)
+
+def set_modelwalker_sharding(shard, nb_shards):
+    global _modelwalker_sharding
+    assert 0 <= shard < nb_shards
+    _modelwalker_sharding = (shard, nb_shards)
+
 def modelwalker_inputs_handling_helper(dmaker, user_generic_input):
     assert(dmaker.runs_per_node > 0 or dmaker.runs_per_node == -1)
 
+    if dmaker.nb_shards is None:
+        dmaker.shard, dmaker.nb_shards = _modelwalker_sharding
+    elif dmaker.shard is None:
+        dmaker.shard = 0
+    assert(0 <= dmaker.shard < dmaker.nb_shards)
+    assert(dmaker.checkpoint_freq > 0)
+
     if dmaker.runs_per_node == -1:
         dmaker.max_runs_per_node = -1
         dmaker.min_runs_per_node = -1
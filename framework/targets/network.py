@@ -25,12 +25,14 @@ import collections
 import copy
 import datetime
 import fcntl
+import os
 import select
 import socket
 import struct
 import sys
 import threading
 import time
+import traceback
 import uuid
 from _socket import error as socket_error
 
@@ -38,6 +40,170 @@ from framework.data import Data
 from framework.node import Node, NodeSemanticsCriteria
 from framework.target_helpers import Target, TargetFeedback, TargetStuck
 
+class FeedbackTerminator(object):
+    """
+    Feedback completion predicate (refer to the parameter ``fbk_completion`` of
+    :class:`NetworkTarget`) that considers the feedback complete as soon as the
+    byte sequence `terminator` has been received.
+    """
+
+    def __init__(self, terminator):
+        assert terminator
+        self.terminator = terminator
+
+    def __call__(self, chunks):
+        # The previous chunks have already been checked, thus only their end is
+        # needed to find a terminator that would span several chunks.
+        needed = len(self.terminator) - 1
+        prev = b''
+        idx = len(chunks) - 2
+        while len(prev) < needed and idx >= 0:
+            prev = chunks[idx] + prev
+            idx -= 1
+        tail = prev[len(prev)-needed:] + chunks[-1] if needed else chunks[-1]
+        return self.terminator in tail
+
+
+class FeedbackLengthField(object):
+    """
+    Feedback completion predicate (refer to the parameter ``fbk_completion`` of
+    :class:`NetworkTarget`) for feedback that begins with a header embedding its length.
+    The length field is an unsigned integer of `size` bytes located at `offset`. The
+    feedback is complete when ``offset + size + length + adjust`` bytes have been received
+    (`adjust` is useful if the length field does not exactly cover what follows it).
+    """
+
+    _formats = {1: 'B', 2: 'H', 4: 'I', 8: 'Q'}
+
+    def __init__(self, offset=0, size=2, big_endian=True, adjust=0):
+        assert size in self._formats
+        self.offset = offset
+        self.size = size
+        self.adjust = adjust
+        self._fmt = ('>' if big_endian else '<') + self._formats[size]
+
+    def __call__(self, chunks):
+        header_sz = self.offset + self.size
+        received = sum(len(c) for c in chunks)
+        if received < header_sz:
+            return False
+
+        header = b''
+        for c in chunks:
+            header += c
+            if len(header) >= header_sz:
+                break
+        length = struct.unpack(self._fmt, header[self.offset:header_sz])[0]
+
+        return received >= header_sz + length + self.adjust
+
+
+class _ConnectionPool(object):
+    """
+    Sockets connected in advance to an interface of the NetworkTarget, in order
+    to avoid connecting a new one for each emission when the connection is not held.
+    The pool is refilled in the background each time a socket is taken from it.
+    """
+
+    def __init__(self, size, connect_func, name):
+        self.size = size
+        self.hits = 0
+        self.misses = 0
+        self._connect = connect_func
+        self._sockets = collections.deque()
+        self._lock = threading.Lock()
+        self._refill_event = threading.Event()
+        self._stop_requested = False
+        self._thread = threading.Thread(None, self._refill_main, name=name)
+
+    def start(self):
+        self._thread.start()
+        self._refill_event.set()
+
+    def stop(self):
+        self._stop_requested = True
+        self._refill_event.set()
+        self._thread.join()
+        with self._lock:
+            for s in self._sockets:
+                s.close()
+            self._sockets.clear()
+
+    def _refill_main(self):
+        while True:
+            self._refill_event.wait()
+            self._refill_event.clear()
+            while not self._stop_requested and len(self._sockets) < self.size:
+                s = self._connect()
+                if s is None:
+                    # the target is not reachable for now, we will retry at the next request
+                    break
+                with self._lock:
+                    self._sockets.append(s)
+            if self._stop_requested:
+                break
+
+    def get(self):
+        s = None
+        with self._lock:
+            while self._sockets:
+                candidate = self._sockets.popleft()
+                if self._is_usable(candidate):
+                    s = candidate
+                    break
+                candidate.close()
+            if s is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+        self._refill_event.set()
+        return s
+
+    @staticmethod
+    def _is_usable(skt):
+        # A pooled socket is not usable anymore if the peer has closed the
+        # connection in the meantime.
+        try:
+            ready_to_read, _, in_error = select.select([skt], [], [skt], 0)
+            if in_error:
+                return False
+            if ready_to_read:
+                return skt.recv(1, socket.MSG_PEEK) != b''
+        except (socket.error, ValueError):
+            return False
+        return True
+
+
+class _FeedbackContext(object):
+    """
+    State of the feedback collection related to one emission. It is
+    handled by the feedback loop of the NetworkTarget.
+    """
+
+    def __init__(self, fbk_sockets, fbk_ids, fbk_lengths, fbk_completions, send_id, fbk_timeout,
+                 from_fmk, pre_fbk):
+        self.fbk_sockets = fbk_sockets
+        self.fbk_ids = fbk_ids
+        self.fbk_lengths = fbk_lengths
+        self.fbk_completions = fbk_completions
+        self.send_id = send_id
+        self.fbk_timeout = fbk_timeout
+        self.from_fmk = from_fmk
+        self.start_date = datetime.datetime.now()
+        self.deadline = self.start_date + datetime.timedelta(seconds=fbk_timeout)
+        self.first_pass = True
+        self.has_read = False
+        self.socket_errors = []
+
+        self.chunks = collections.OrderedDict()
+        self.bytes_recd = {}
+        for fd in fbk_sockets:
+            self.bytes_recd[fd] = 0
+            self.chunks[fd] = []
+            if pre_fbk is not None and fd in pre_fbk and pre_fbk[fd] is not None:
+                self.chunks[fd].append(pre_fbk[fd])
+
+
 class NetworkTarget(Target):
     '''Generic target class for interacting with a network resource. Can
     be used directly, but some methods may require to be overloaded to
@@ -48,13 +214,21 @@ class NetworkTarget(Target):
     CHUNK_SZ = 2048
     _INTERNALS_ID = 'NetworkTarget()'
 
+    _sendmsg_supported = hasattr(socket.socket, 'sendmsg')
+    try:
+        _iov_max = os.sysconf('SC_IOV_MAX')
+        if _iov_max <= 0:
+            _iov_max = 1024
+    except (AttributeError, ValueError, OSError):
+        _iov_max = 1024
+
     _feedback_mode = Target.FBK_WAIT_FULL_TIME
     supported_feedback_mode = [Target.FBK_WAIT_FULL_TIME, Target.FBK_WAIT_UNTIL_RECV]
 
     def __init__(self, host='localhost', port=12345, socket_type=(socket.AF_INET, socket.SOCK_STREAM),
                  data_semantics=UNKNOWN_SEMANTIC, server_mode=False, target_address=None, wait_for_client=True,
                  hold_connection=False,
-                 mac_src=None, mac_dst=None):
+                 mac_src=None, mac_dst=None, fbk_completion=None, connection_pool_size=0):
         """
         Args:
           host (str): IP address of the target to connect to, or
@@ -95,6 +269,15 @@ class NetworkTarget(Target):
           mac_dst (bytes): Only in conjunction with raw socket. For each data sent through
             this interface, and if this data contain nodes with the semantic ``'mac_dst'``,
             these nodes will be overwritten (through absorption) with this parameter.
+          fbk_completion (callable): Predicate called with the list of the feedback chunks
+            received on this interface each time a new one is received. If it returns ``True``,
+            the feedback is considered complete and its collection ends for this interface without
+            waiting for the feedback timeout. It can be a :class:`FeedbackTerminator`,
+            a :class:`FeedbackLengthField`, or any callable.
+          connection_pool_size (int): Used only in client mode when `hold_connection` is
+            `False`. If not null, this number of sockets are connected in advance to the target
+            (in the background), and each emission uses one of them instead of connecting a
+            new socket. Pool hits and misses are reported by :meth:`get_description`.
         """
 
         Target.__init__(self)
@@ -161,14 +344,22 @@ class NetworkTarget(Target):
 
         self._default_fbk_id[(host, port)] = self._default_fbk_socket_id + ' - {:s}:{:d}'.format(host, port)
 
+        self._fbk_completion = {}
+        if fbk_completion is not None:
+            self._fbk_completion[self._default_fbk_id[(host, port)]] = fbk_completion
+
         self.server_mode = {}
         self.server_mode[(host,port)] = server_mode
         self.hold_connection = {}
         self.hold_connection[(host, port)] = hold_connection
+        self.connection_pool_size = {}
+        self.connection_pool_size[(host, port)] = connection_pool_size
+        self._connection_pools = {}
 
         self.stop_event = threading.Event()
         self._server_thread_lock = threading.Lock()
         self._raw_server_private = None
+        self._fbk_loop_thread = None
 
     def _is_valid_socket_type(self, socket_type):
         skt_sz = len(socket_type)
@@ -184,7 +375,8 @@ class NetworkTarget(Target):
 
     def register_new_interface(self, host, port, socket_type, data_semantics, server_mode=False,
                                target_address = None, wait_for_client=True,
-                               hold_connection=False, mac_src=None, mac_dst=None):
+                               hold_connection=False, mac_src=None, mac_dst=None,
+                               fbk_completion=None, connection_pool_size=0):
 
         if not self._is_valid_socket_type(socket_type):
             raise ValueError("Unrecognized socket type")
@@ -198,7 +390,10 @@ class NetworkTarget(Target):
         self.server_mode[(host,port)] = server_mode
         self._server_mode_additional_info[(host, port)] = (target_address, wait_for_client)
         self._default_fbk_id[(host, port)] = self._default_fbk_socket_id + ' - {:s}:{:d}'.format(host, port)
+        if fbk_completion is not None:
+            self._fbk_completion[self._default_fbk_id[(host, port)]] = fbk_completion
         self.hold_connection[(host, port)] = hold_connection
+        self.connection_pool_size[(host, port)] = connection_pool_size
         if socket_type[1] == socket.SOCK_RAW:
             self._mac_src[(host, port)] = self.get_mac_addr(host) if mac_src is None else mac_src
             self._mac_dst[(host, port)] = mac_dst
@@ -237,10 +432,12 @@ class NetworkTarget(Target):
 
     def add_additional_feedback_interface(self, host, port,
                                           socket_type=(socket.AF_INET, socket.SOCK_STREAM),
-                                          fbk_id=None, fbk_length=None, server_mode=False):
+                                          fbk_id=None, fbk_length=None, server_mode=False,
+                                          fbk_completion=None):
         '''Allows to register additional socket to get feedback
         from. Connection is attempted be when target starts, that is
         when :meth:`NetworkTarget.start()` is called.
+        (Refer to :class:`NetworkTarget` for `fbk_completion`.)
         '''
         self._default_additional_fbk_id += 1
         if fbk_id is None:
@@ -248,6 +445,8 @@ class NetworkTarget(Target):
         else:
             assert(not str(fbk_id).startswith('Default Additional Feedback ID'))
         self._additional_fbk_desc[fbk_id] = (host, port, socket_type, fbk_id, fbk_length, server_mode)
+        if fbk_completion is not None:
+            self._fbk_completion[fbk_id] = fbk_completion
         self.hold_connection[(host, port)] = True
         self._server_mode_additional_info[(host, port)] = (None, None)
 
@@ -436,11 +635,12 @@ class NetworkTarget(Target):
         self._sending_id = 0
         self._initial_sending_id = -1
         self._first_send_data_call = True
-        self._thread_cpt = 0
         self._last_ack_date = None  # Note that `self._last_ack_date`
                                     # could be updated many times if
                                     # self.send_multiple_data() is
                                     # used.
+        self._start_fbk_loop()
+        self._start_connection_pools()
         self._connect_to_additional_feedback_sockets()
 
         for k, mac_src in self._mac_src.items():
@@ -455,6 +655,8 @@ class NetworkTarget(Target):
         return self.initialize()
 
     def stop(self):
+        self._stop_fbk_loop()
+        self._stop_connection_pools()
         self.stop_event.set()
         for ev, _ in self._raw_server_private.values():
             ev.set()
@@ -528,8 +730,7 @@ class NetworkTarget(Target):
         else:
             for data in data_list:
                 host, port, socket_type, server_mode = self._get_net_info_from(data)
-                d = data.to_bytes()
-                sending_list.append((d, host, port, socket_type, server_mode))
+                sending_list.append((data, host, port, socket_type, server_mode))
 
         for data, host, port, socket_type, server_mode in sending_list:
             if server_mode:
@@ -622,6 +823,20 @@ class NetworkTarget(Target):
             else:
                 return self._hclient_hp2sock[(host, port)]
 
+        if (host, port) in self._connection_pools:
+            s = self._connection_pools[(host, port)].get()
+            if s is not None:
+                return s
+
+        s = self._create_target_socket(host, port, socket_type)
+
+        if s and self.hold_connection[(host, port)]:
+            self._hclient_sock2hp[s] = (host, port)
+            self._hclient_hp2sock[(host, port)] = s
+
+        return s
+
+    def _create_target_socket(self, host, port, socket_type, verbose=True):
         skt_sz = len(socket_type)
         if skt_sz == 2:
             family, sock_type = socket_type
@@ -639,23 +854,44 @@ class NetworkTarget(Target):
                 s.bind((host, port))
             except socket.error as serr:
                 print('\n*** ERROR(while binding socket -- host={!s} port={:d}): {:s}'.format(host, port, str(serr)))
+                s.close()
                 return False
         else:
             try:
                 s.connect((host, port))
             except socket_error as serr:
                 # if serr.errno != errno.ECONNREFUSED:
-                print('\n*** ERROR(while connecting): ' + str(serr))
+                if verbose:
+                    print('\n*** ERROR(while connecting): ' + str(serr))
+                s.close()
                 return None
 
             s.setblocking(0)
 
-        if self.hold_connection[(host, port)]:
-            self._hclient_sock2hp[s] = (host, port)
-            self._hclient_hp2sock[(host, port)] = s
-
         return s
 
+    def _start_connection_pools(self):
+        self._connection_pools = {}
+        for key in self.known_semantics:
+            host, port = self._host[key], self._port[key]
+            pool_size = self.connection_pool_size[(host, port)]
+            socket_type = self._socket_type[key]
+            if not pool_size or self.server_mode[(host, port)] or self.hold_connection[(host, port)] \
+                    or socket_type[1] == socket.SOCK_RAW or (host, port) in self._connection_pools:
+                continue
+
+            def connect(host=host, port=port, socket_type=socket_type):
+                return self._create_target_socket(host, port, socket_type, verbose=False)
+
+            pool = _ConnectionPool(pool_size, connect, name='POOL-{:s}:{:d}'.format(host, port))
+            self._connection_pools[(host, port)] = pool
+            pool.start()
+
+    def _stop_connection_pools(self):
+        for pool in self._connection_pools.values():
+            pool.stop()
+        self._connection_pools = {}
+
 
     def _listen_to_target(self, host, port, socket_type, func, args=None):
 
@@ -840,176 +1076,266 @@ class NetworkTarget(Target):
                         from_fmk=from_fmk, pre_fbk={clientsocket: pre_fbk})
 
 
-    def _collect_feedback_from(self, fbk_sockets, fbk_ids, fbk_lengths, epobj, fileno2fd,
-                               send_id, fbk_timeout, from_fmk, pre_fbk):
+    def _start_fbk_loop(self):
+        self._fbk_epoll = select.epoll()
+        # used to wake the loop up when new feedback contexts are provided or when it has to stop
+        self._fbk_wakeup_rsock, self._fbk_wakeup_wsock = socket.socketpair()
+        self._fbk_wakeup_rsock.setblocking(0)
+        self._fbk_wakeup_wsock.setblocking(0)
+        self._fbk_epoll.register(self._fbk_wakeup_rsock.fileno(), select.EPOLLIN)
+        self._fbk_pending_contexts = collections.deque()
+        self._fbk_loop_stop_requested = False
+        # only used by the loop thread
+        self._fbk_contexts = []
+        self._fbk_fd2ctx = {}
+
+        self._fbk_loop_thread = threading.Thread(None, self._fbk_loop_main, name='FBK-LOOP')
+        self._fbk_loop_thread.start()
+
+    def _stop_fbk_loop(self):
+        if self._fbk_loop_thread is None:
+            return
+        self._fbk_loop_stop_requested = True
+        self._wake_fbk_loop_up()
+        self._fbk_loop_thread.join()
+        self._fbk_loop_thread = None
+        self._fbk_epoll.close()
+        self._fbk_wakeup_rsock.close()
+        self._fbk_wakeup_wsock.close()
+
+    def _wake_fbk_loop_up(self):
+        try:
+            self._fbk_wakeup_wsock.send(b'\x00')
+        except socket.error:
+            # the loop has already been woken up enough
+            pass
 
-        def _check_and_handle_obsolete_socket(skt, error=None, error_list=None):
-            # print('\n*** NOTE: Remove obsolete socket {!r}'.format(socket))
-            try:
-                epobj.unregister(skt)
-            except ValueError as e:
-                # in python3, file descriptor == -1 witnessed (!?)
-                print('\n*** ERROR(check obsolete socket): ' + str(e))
-            except socket.error as serr:
-                # in python2, bad file descriptor (errno 9) witnessed
-                print('\n*** ERROR(check obsolete socket): ' + str(serr))
-
-            self._server_thread_lock.acquire()
-            if skt in self._last_client_sock2hp.keys():
-                if error is not None:
-                    error_list.append((fbk_ids[skt], error))
-                host, port = self._last_client_sock2hp[skt]
-                del self._last_client_sock2hp[skt]
-                del self._last_client_hp2sock[(host, port)]
-                self._server_thread_lock.release()
+    def _fbk_loop_main(self):
+        wakeup_fd = self._fbk_wakeup_rsock.fileno()
+
+        while True:
+            while self._fbk_pending_contexts:
+                ctx = self._fbk_pending_contexts.popleft()
+                self._fbk_contexts.append(ctx)
+                for s in copy.copy(ctx.fbk_sockets):
+                    self._watch_fbk_socket(s, ctx)
+
+            if self._fbk_loop_stop_requested:
+                break
+
+            if self._fbk_contexts:
+                now = datetime.datetime.now()
+                timeout = min((ctx.deadline - now).total_seconds() for ctx in self._fbk_contexts)
+                timeout = max(timeout, 0)
             else:
-                self._server_thread_lock.release()
-                with self.socket_desc_lock:
-                    if skt in self._hclient_sock2hp.keys():
-                        if error is not None:
-                            error_list.append((fbk_ids[skt], error))
-                        host, port = self._hclient_sock2hp[skt]
-                        del self._hclient_sock2hp[skt]
-                        del self._hclient_hp2sock[(host, port)]
-                    if skt in self._additional_fbk_sockets:
-                        if error is not None:
-                            error_list.append((self._additional_fbk_ids[skt], error))
-                        self._additional_fbk_sockets.remove(skt)
-                        del self._additional_fbk_ids[skt]
-                        del self._additional_fbk_lengths[skt]
-
-        chunks = collections.OrderedDict()
-        t0 = datetime.datetime.now()
-        duration = 0
-        first_pass = True
-        ack_date = None
-        dont_stop = True
-
-        bytes_recd = {}
-        for fd in fbk_sockets:
-            bytes_recd[fd] = 0
-            chunks[fd] = []
-            if pre_fbk is not None and fd in pre_fbk and pre_fbk[fd] is not None:
-                chunks[fd].append(pre_fbk[fd])
+                timeout = -1
 
-        socket_errors = []
-        has_read = False
+            ready_to_read = {}
+            for fd, ev in self._fbk_epoll.poll(timeout):
+                if fd == wakeup_fd:
+                    try:
+                        self._fbk_wakeup_rsock.recv(self.CHUNK_SZ)
+                    except socket.error:
+                        pass
+                    continue
+                elif fd not in self._fbk_fd2ctx:
+                    # error on a socket that is not used for now by any feedback context.
+                    # It is dealt with by the next context that uses it.
+                    self._unwatch_fbk_socket(fd, forget=True)
+                    continue
 
-        while dont_stop:
-            ready_to_read = []
-            for fd, ev in epobj.poll(timeout=0.05):
-                skt = fileno2fd[fd]
+                skt, ctx = self._fbk_fd2ctx[fd]
                 if ev != select.EPOLLIN:
-                    _check_and_handle_obsolete_socket(skt, error=ev, error_list=socket_errors)
-                    if skt in fbk_sockets:
-                        fbk_sockets.remove(skt)
+                    self._release_fbk_socket(skt, ctx)
+                    self._check_and_handle_obsolete_socket(skt, ctx, error=ev)
                     continue
-                ready_to_read.append(skt)
+                ready_to_read.setdefault(ctx, []).append(skt)
 
             now = datetime.datetime.now()
-            duration = (now - t0).total_seconds()
-            if ready_to_read:
-                if first_pass:
-                    first_pass = False
-                    self._register_last_ack_date(now)
-                for s in ready_to_read:
-                    if fbk_lengths[s] is None:
-                        sz = NetworkTarget.CHUNK_SZ
-                    else:
-                        sz = min(fbk_lengths[s] - bytes_recd[s], NetworkTarget.CHUNK_SZ)
-
-                    retry = 0
-                    socket_timed_out = False
-                    while retry < 3:
-                        try:
-                            chunk = s.recv(sz)
-                        except socket.timeout:
-                            chunk = b''
-                            socket_timed_out = True  # for UDP we keep the socket
-                            break
-                        except socket.error as serr:
-                            chunk = b''
-                            print('\n*** ERROR[{!s}] (while receiving): {:s}'.format(
-                                serr.errno, str(serr)))
-                            if serr.errno == socket.errno.EAGAIN:
-                                retry += 1
-                                time.sleep(2)
-                                continue
-                            else:
-                                break
-                        else:
-                            break
-
-                    if chunk == b'':
-                        print('\n*** NOTE: Nothing more to receive from: {!r}'.format(fbk_ids[s]))
-                        fbk_sockets.remove(s)
-                        _check_and_handle_obsolete_socket(s)
-                        if not socket_timed_out:
-                            s.close()
-                        continue
-                    else:
-                        bytes_recd[s] = bytes_recd[s] + len(chunk)
-                        chunks[s].append(chunk)
-
-                has_read = True
+            for ctx in copy.copy(self._fbk_contexts):
+                try:
+                    self._handle_fbk_context(ctx, ready_to_read.get(ctx, []), now)
+                except Exception:
+                    # the feedback loop has to survive to any issue within user code
+                    # (e.g., a feedback completion predicate)
+                    print('\n*** ERROR(while collecting feedback):')
+                    traceback.print_exc()
+                    self._complete_fbk_context(ctx)
+
+        # The target is stopped, the feedback already retrieved is provided as is
+        for ctx in self._fbk_contexts + list(self._fbk_pending_contexts):
+            self._complete_fbk_context(ctx)
+        self._fbk_pending_contexts.clear()
+
+    def _watch_fbk_socket(self, skt, ctx):
+        try:
+            fd = skt.fileno()
+            if fd in self._fbk_fd2ctx:
+                # the most recent feedback context takes the socket over
+                previous_skt, previous_ctx = self._fbk_fd2ctx[fd]
+                if previous_skt in previous_ctx.fbk_sockets:
+                    previous_ctx.fbk_sockets.remove(previous_skt)
+            try:
+                self._fbk_epoll.modify(fd, select.EPOLLIN)
+            except (IOError, OSError):
+                # the socket is not registered yet (or it is a new one that reuses
+                # the file descriptor of a closed socket)
+                self._fbk_epoll.register(fd, select.EPOLLIN)
+        except (ValueError, IOError, OSError) as e:
+            # in python3, file descriptor == -1 witnessed (!?)
+            print('\n*** ERROR(check obsolete socket): ' + str(e))
+            ctx.fbk_sockets.remove(skt)
+            self._check_and_handle_obsolete_socket(skt, ctx)
+        else:
+            self._fbk_fd2ctx[fd] = (skt, ctx)
 
+    def _unwatch_fbk_socket(self, fd, forget=False):
+        # Sockets are kept registered (without any event to wait for) as long as they
+        # are not closed, so that they do not need to be registered again for the next
+        # feedback contexts.
+        try:
+            if forget:
+                self._fbk_epoll.unregister(fd)
+            else:
+                self._fbk_epoll.modify(fd, 0)
+        except (ValueError, IOError, OSError):
+            pass
 
-            if fbk_sockets:
-                for s in fbk_sockets:
-                    if s in ready_to_read:
-                        s_fbk_len = fbk_lengths[s]
-                        if s_fbk_len is None or bytes_recd[s] < s_fbk_len:
-                            dont_stop = True
-                            break
-                    else:
-                        dont_stop = True
-                        break
+    def _release_fbk_socket(self, skt, ctx):
+        if skt in ctx.fbk_sockets:
+            ctx.fbk_sockets.remove(skt)
+        for fd, (s, c) in list(self._fbk_fd2ctx.items()):
+            if s is skt and c is ctx:
+                del self._fbk_fd2ctx[fd]
+                self._unwatch_fbk_socket(fd)
+
+    def _check_and_handle_obsolete_socket(self, skt, ctx, error=None):
+        # print('\n*** NOTE: Remove obsolete socket {!r}'.format(socket))
+        error_list = ctx.socket_errors
+        self._server_thread_lock.acquire()
+        if skt in self._last_client_sock2hp.keys():
+            if error is not None:
+                error_list.append((ctx.fbk_ids[skt], error))
+            host, port = self._last_client_sock2hp[skt]
+            del self._last_client_sock2hp[skt]
+            del self._last_client_hp2sock[(host, port)]
+            self._server_thread_lock.release()
+        else:
+            self._server_thread_lock.release()
+            with self.socket_desc_lock:
+                if skt in self._hclient_sock2hp.keys():
+                    if error is not None:
+                        error_list.append((ctx.fbk_ids[skt], error))
+                    host, port = self._hclient_sock2hp[skt]
+                    del self._hclient_sock2hp[skt]
+                    del self._hclient_hp2sock[(host, port)]
+                if skt in self._additional_fbk_sockets:
+                    if error is not None:
+                        error_list.append((self._additional_fbk_ids[skt], error))
+                    self._additional_fbk_sockets.remove(skt)
+                    del self._additional_fbk_ids[skt]
+                    del self._additional_fbk_lengths[skt]
+
+    def _handle_fbk_context(self, ctx, ready_to_read, now):
+        duration = (now - ctx.start_date).total_seconds()
+        if ready_to_read:
+            if ctx.first_pass:
+                ctx.first_pass = False
+                self._register_last_ack_date(now)
+            for s in ready_to_read:
+                if ctx.fbk_lengths[s] is None:
+                    sz = NetworkTarget.CHUNK_SZ
                 else:
-                    dont_stop = False
-
-                if duration > fbk_timeout or (has_read and not self.fbk_wait_full_time_slot_mode):
-                    dont_stop = False
+                    sz = min(ctx.fbk_lengths[s] - ctx.bytes_recd[s], NetworkTarget.CHUNK_SZ)
 
+                socket_timed_out = False
+                try:
+                    chunk = s.recv(sz)
+                except socket.timeout:
+                    chunk = b''
+                    socket_timed_out = True  # for UDP we keep the socket
+                except socket.error as serr:
+                    if serr.errno == socket.errno.EAGAIN:
+                        # spurious wake up, the socket will be reported again when it is ready
+                        continue
+                    chunk = b''
+                    print('\n*** ERROR[{!s}] (while receiving): {:s}'.format(
+                        serr.errno, str(serr)))
+
+                if chunk == b'':
+                    print('\n*** NOTE: Nothing more to receive from: {!r}'.format(ctx.fbk_ids[s]))
+                    self._release_fbk_socket(s, ctx)
+                    self._check_and_handle_obsolete_socket(s, ctx)
+                    if not socket_timed_out:
+                        s.close()
+                    continue
+                else:
+                    ctx.bytes_recd[s] = ctx.bytes_recd[s] + len(chunk)
+                    ctx.chunks[s].append(chunk)
+                    completion = ctx.fbk_completions.get(s)
+                    if completion is not None and completion(ctx.chunks[s]):
+                        # The feedback is complete for this socket. What could be received
+                        # next will be collected for the next emission.
+                        self._release_fbk_socket(s, ctx)
+
+            ctx.has_read = True
+
+        if ctx.fbk_sockets:
+            # the collection is over when every expected length of feedback has been received
+            for s in ctx.fbk_sockets:
+                s_fbk_len = ctx.fbk_lengths[s]
+                if s_fbk_len is None or ctx.bytes_recd[s] < s_fbk_len:
+                    dont_stop = True
+                    break
             else:
                 dont_stop = False
 
-        for s, chks in chunks.items():
-            fbk = b'\n'.join(chks)
-            with self._fbk_handling_lock:
-                fbkid = fbk_ids[s]
-                fbk, err = self._feedback_handling(fbk, fbkid)
-                self._feedback_collect(fbk, fbkid, error=err)
-                if (self._additional_fbk_sockets is None or s not in self._additional_fbk_sockets) and \
-                        (self._hclient_sock2hp is None or s not in self._hclient_sock2hp.keys()) and \
-                        (self._last_client_sock2hp is None or s not in self._last_client_sock2hp.keys()):
-                    s.close()
+            if duration >= ctx.fbk_timeout or (ctx.has_read and not self.fbk_wait_full_time_slot_mode):
+                dont_stop = False
+
+        else:
+            dont_stop = False
 
-        with self._fbk_handling_lock:
-            for fbkid, ev in socket_errors:
-                self._feedback_collect(">>> ERROR[{:d}]: unable to interact with '{:s}' "
-                                       "<<<".format(ev,fbkid), fbkid, error=-ev)
-            if from_fmk:
-                self._feedback_complete(send_id)
+        if not dont_stop:
+            self._complete_fbk_context(ctx)
 
-        return
+    def _complete_fbk_context(self, ctx):
+        for s in copy.copy(ctx.fbk_sockets):
+            self._release_fbk_socket(s, ctx)
+        if ctx in self._fbk_contexts:
+            self._fbk_contexts.remove(ctx)
 
+        try:
+            for s, chks in ctx.chunks.items():
+                fbk = b'\n'.join(chks)
+                with self._fbk_handling_lock:
+                    fbkid = ctx.fbk_ids[s]
+                    fbk, err = self._feedback_handling(fbk, fbkid)
+                    self._feedback_collect(fbk, fbkid, error=err)
+                    if (self._additional_fbk_sockets is None or s not in self._additional_fbk_sockets) and \
+                            (self._hclient_sock2hp is None or s not in self._hclient_sock2hp.keys()) and \
+                            (self._last_client_sock2hp is None or s not in self._last_client_sock2hp.keys()):
+                        s.close()
+
+            with self._fbk_handling_lock:
+                for fbkid, ev in ctx.socket_errors:
+                    self._feedback_collect(">>> ERROR[{:d}]: unable to interact with '{:s}' "
+                                           "<<<".format(ev,fbkid), fbkid, error=-ev)
+                if ctx.from_fmk:
+                    self._feedback_complete(ctx.send_id)
+        except Exception:
+            # the feedback loop has to survive to any issue within user code
+            print('\n*** ERROR(while handling feedback):')
+            traceback.print_exc()
 
     def _send_data(self, sockets, data_refs, sid, from_fmk, pre_fbk=None):
         if sid != self._initial_sending_id:
             self._initial_sending_id = sid
             # self._first_send_data_call = True
 
-        epobj = select.epoll()
-        fileno2fd = {}
-
         if self._first_send_data_call:
             self._first_send_data_call = False
-
             fbk_sockets, fbk_ids, fbk_lengths = self._get_additional_feedback_sockets()
-            if fbk_sockets:
-                for fd in fbk_sockets:
-                    epobj.register(fd, select.EPOLLIN)
-                    fileno2fd[fd.fileno()] = fd
         else:
             fbk_sockets, fbk_ids, fbk_lengths = None, None, None
 
@@ -1025,13 +1351,11 @@ class NetworkTarget(Target):
 
             for s in sockets:
                 data, host, port, address = data_refs[s]
-                epobj.register(s, select.EPOLLIN)
-                fileno2fd[s.fileno()] = s
                 fbk_sockets.append(s)
                 fbk_ids[s] = self._default_fbk_id[(host, port)]
                 fbk_lengths[s] = self.feedback_length
 
-            self._start_fbk_collector(fbk_sockets, fbk_ids, fbk_lengths, epobj, fileno2fd, from_fmk,
+            self._start_fbk_collector(fbk_sockets, fbk_ids, fbk_lengths, from_fmk,
                                       pre_fbk=pre_fbk)
 
             return
@@ -1042,19 +1366,24 @@ class NetworkTarget(Target):
             for s in ready_to_write:
                 add_main_socket = True
                 data, host, port, address = data_refs[s]
-                epobj.register(s, select.EPOLLIN)
-                fileno2fd[s.fileno()] = s
 
-                raw_data = data.to_bytes() if isinstance(data, Data) else data
-                totalsent = 0
+                buffers = self._get_send_buffers(s, data)
+                # the data still to send begin at offset @offset of buffers[start]
+                start, offset = 0, 0
                 send_retry = 0
-                while totalsent < len(raw_data) and send_retry < 10:
+                while start < len(buffers) and send_retry < 10:
+                    head = buffers[start][offset:] if offset else buffers[start]
                     try:
-                        if address is None:
-                            sent = s.send(raw_data[totalsent:])
+                        if self._sendmsg_supported:
+                            if address is None:
+                                sent = s.sendmsg([head] + buffers[start+1:start+self._iov_max])
+                            else:
+                                # with SOCK_RAW, address is ignored
+                                sent = s.sendmsg([head] + buffers[start+1:], [], 0, address)
+                        elif address is None:
+                            sent = s.send(head)
                         else:
-                            # with SOCK_RAW, address is ignored
-                            sent = s.sendto(raw_data[totalsent:], address)
+                            sent = s.sendto(head, address)
                     except socket.error as serr:
                         send_retry += 1
                         print('\n*** ERROR(while sending): ' + str(serr))
@@ -1073,7 +1402,7 @@ class NetworkTarget(Target):
                         if sent == 0:
                             s.close()
                             raise TargetStuck("socket connection broken")
-                        totalsent = totalsent + sent
+                        start, offset = self._consume_send_buffers(buffers, start, offset, sent)
 
                 if fbk_sockets is None:
                     assert fbk_ids is None
@@ -1090,24 +1419,54 @@ class NetworkTarget(Target):
                     fbk_lengths[s] = self.feedback_length
 
 
-            self._start_fbk_collector(fbk_sockets, fbk_ids, fbk_lengths, epobj, fileno2fd, from_fmk,
+            self._start_fbk_collector(fbk_sockets, fbk_ids, fbk_lengths, from_fmk,
                                       pre_fbk=pre_fbk)
 
         else:
             raise TargetStuck("system not ready for sending data!")
 
 
-    def _start_fbk_collector(self, fbk_sockets, fbk_ids, fbk_lengths, epobj, fileno2fd, from_fmk,
-                             pre_fbk=None):
-        self._thread_cpt += 1
+    def _get_send_buffers(self, s, data):
+        """
+        Return the memoryviews to hand over to the socket for sending @data. When the
+        data is backed by a node, the values of its terminal nodes are sent as a
+        scatter/gather vector without being concatenated beforehand.
+        """
+        buffers = data.to_buffers() if isinstance(data, Data) else [data]
+        if not self._sendmsg_supported:
+            buffers = [b''.join(buffers)] if len(buffers) > 1 else buffers
+        elif len(buffers) > self._iov_max and s.type != socket.SOCK_STREAM:
+            # a datagram has to be sent in one go
+            buffers = [b''.join(buffers)]
+        return [memoryview(b) for b in buffers if b]
+
+    @staticmethod
+    def _consume_send_buffers(buffers, start, offset, sent):
+        """
+        Return the position (index of the buffer and offset within it) of the data that
+        remain to be sent after @sent bytes have been sent from position (@start, @offset)
+        of @buffers. The index equals `len(buffers)` when everything has been sent.
+        """
+        sent += offset
+        while start < len(buffers):
+            if sent < len(buffers[start]):
+                return start, sent
+            sent -= len(buffers[start])
+            start += 1
+        return start, 0
+
+    def _start_fbk_collector(self, fbk_sockets, fbk_ids, fbk_lengths, from_fmk, pre_fbk=None):
         if from_fmk:
             self.feedback_thread_qty += 1
-        feedback_thread = threading.Thread(None, self._collect_feedback_from,
-                                           name='FBK-' + repr(self._sending_id) + '#' + repr(self._thread_cpt),
-                                           args=(fbk_sockets, fbk_ids, fbk_lengths, epobj, fileno2fd,
-                                                 self._sending_id, self._feedback_timeout, from_fmk,
-                                                 pre_fbk))
-        feedback_thread.start()
+        fbk_completions = {}
+        for s in fbk_sockets:
+            completion = self._fbk_completion.get(fbk_ids[s])
+            if completion is not None:
+                fbk_completions[s] = completion
+        ctx = _FeedbackContext(fbk_sockets, fbk_ids, fbk_lengths, fbk_completions, self._sending_id,
+                               self._feedback_timeout, from_fmk, pre_fbk)
+        self._fbk_pending_contexts.append(ctx)
+        self._wake_fbk_loop_up()
 
     def _feedback_collect(self, fbk, ref, error=0):
         if error < 0:
@@ -1209,7 +1568,12 @@ class NetworkTarget(Target):
             server_mode = self.server_mode[(host, port)]
             hold_connection = self.hold_connection[(host, port)]
             socket_type = self._get_socket_type(host, port)
-            desc += '{:s}:{:d}#{!s} (serv:{!r},hold:{!r}), '.format(
-                host, port, socket_type, server_mode, hold_connection)
+            pool = self._connection_pools.get((host, port))
+            if pool is not None:
+                pool_desc = ',pool:{:d}[hits:{:d},misses:{:d}]'.format(pool.size, pool.hits, pool.misses)
+            else:
+                pool_desc = ''
+            desc += '{:s}:{:d}#{!s} (serv:{!r},hold:{!r}{:s}), '.format(
+                host, port, socket_type, server_mode, hold_connection, pool_desc)
 
         return desc[:-2]
\ No newline at end of file
@@ -286,6 +286,12 @@ class String(VT_Alt):
     DEFAULT_MAX_SZ = 10000
     encoded_string = False
 
+    # Cache of the test cases built by String._enable_fuzz_mode() that do not depend on
+    # the String itself. Its total size (in bytes) is bounded by 'shared_fuzz_cases_max_size'.
+    shared_fuzz_cases_max_size = 64*1024*1024
+    _shared_fuzz_cases = collections.OrderedDict()
+    _shared_fuzz_cases_size = 0
+
     def encode(self, val):
         """
         To be overloaded by a subclass that deals with encoding.
@@ -907,82 +913,118 @@ class String(VT_Alt):
             if self.determinist:
                 orig_val = self.values_copy[0]
             else:
-                orig_val = random.choice(self.values_copy)
+                orig_val = rng.choice(self.values_copy)
 
         sz = len(orig_val)
-        sz_delta_with_max = self.max_encoded_sz - sz
+        longer_val, shared_cases, codec_val = self._get_shared_fuzz_cases(orig_val, fuzz_magnitude)
 
         if sz > 0:
             val = bp.corrupt_bits(orig_val, n=1)
             self.values_fuzzy.append(val)
 
-        val = orig_val + b"A"*(sz_delta_with_max + 1)
-        self.values_fuzzy.append(val)
+        self.values_fuzzy.append(longer_val)
 
         if len(self.encode(orig_val)) > 0:
             self.values_fuzzy.append(b'')
 
+        self.values_fuzzy += shared_cases
+
+        if self.extra_fuzzy_list:
+            for v in self.extra_fuzzy_list:
+                if v not in self.values_fuzzy:
+                    self.values_fuzzy.append(v)
+
+        if codec_val is not None and codec_val not in self.values_fuzzy:
+            self.values_fuzzy.append(codec_val)
+
+        enc_cases = self.encoding_test_cases(orig_val, self.max_sz, self.min_sz,
+                                             self.min_encoded_sz, self.max_encoded_sz)
+        if enc_cases:
+            self.values_fuzzy += enc_cases
+
+        self.values_save = self.values
+        self.values = self.values_fuzzy
+        self.values_copy = copy.copy(self.values)
+
+        self.drawn_val = None
+
+    def _get_shared_fuzz_cases(self, orig_val, fuzz_magnitude):
+        """
+        Return the test cases that only depend on the current value, the size constraints,
+        the codec and the fuzzing magnitude. They are built once and then shared by
+        every String in the same situation (see ``String.shared_fuzz_cases_max_size``).
+
+        Returns:
+            tuple: the oversized value, the other test cases (a tuple) and the
+            codec-specific test case (or None)
+        """
+        key = (orig_val, self.min_sz, self.max_sz, self.max_encoded_sz, self.codec, fuzz_magnitude)
+        cache = String._shared_fuzz_cases
+        cases = cache.pop(key, None)
+        if cases is not None:
+            # re-inserted to be the last one evicted
+            cache[key] = cases
+            return cases
+
+        sz = len(orig_val)
+        sz_delta_with_max = self.max_encoded_sz - sz
+        longer_val = orig_val + b"A"*(sz_delta_with_max + 1)
+
+        shared_cases = []
         if sz > 0:
             sz_delta_with_min = sz - self.min_sz
             val = orig_val[:-sz_delta_with_min-1]
             if val != b'':
-                self.values_fuzzy.append(val)
+                shared_cases.append(val)
 
         if self.max_sz > 0:
             val = orig_val + b"X"*(self.max_sz*int(100*fuzz_magnitude))
-            self.values_fuzzy.append(val)
+            shared_cases.append(val)
 
-        self.values_fuzzy.append(b'\x00' * sz if sz > 0 else b'\x00')
+        shared_cases.append(b'\x00' * sz if sz > 0 else b'\x00')
 
         if sz > 1:
             is_even = sz % 2 == 0
             cpt = sz // 2
             if is_even:
-                self.values_fuzzy.append(b'%n' * cpt)
-                self.values_fuzzy.append(b'%s' * cpt)
+                shared_cases.append(b'%n' * cpt)
+                shared_cases.append(b'%s' * cpt)
             else:
-                self.values_fuzzy.append(orig_val[:1] + b'%n' * cpt)
-                self.values_fuzzy.append(orig_val[:1] + b'%s' * cpt)
+                shared_cases.append(orig_val[:1] + b'%n' * cpt)
+                shared_cases.append(orig_val[:1] + b'%s' * cpt)
 
-        self.values_fuzzy.append(orig_val + b'%n' * int(400*fuzz_magnitude))
-        self.values_fuzzy.append(orig_val + b'%s' * int(400*fuzz_magnitude))
-        self.values_fuzzy.append(orig_val + b'\"%n\"' * int(400*fuzz_magnitude))
-        self.values_fuzzy.append(orig_val + b'\"%s\"' * int(400*fuzz_magnitude))
-        self.values_fuzzy.append(orig_val + b'\r\n' * int(100*fuzz_magnitude))
-
-        if self.extra_fuzzy_list:
-            for v in self.extra_fuzzy_list:
-                if v not in self.values_fuzzy:
-                    self.values_fuzzy.append(v)
+        shared_cases.append(orig_val + b'%n' * int(400*fuzz_magnitude))
+        shared_cases.append(orig_val + b'%s' * int(400*fuzz_magnitude))
+        shared_cases.append(orig_val + b'\"%n\"' * int(400*fuzz_magnitude))
+        shared_cases.append(orig_val + b'\"%s\"' * int(400*fuzz_magnitude))
+        shared_cases.append(orig_val + b'\r\n' * int(100*fuzz_magnitude))
 
+        codec_val = None
         if self.codec == self.ASCII:
             val = bytearray(orig_val)
             if len(val) > 0:
                 val[0] |= 0x80
-                val = bytes(val)
+                codec_val = bytes(val)
             else:
-                val = b'\xe9'
-            if val not in self.values_fuzzy:
-                self.values_fuzzy.append(val)
+                codec_val = b'\xe9'
         elif self.codec == self.UTF16BE or self.codec == self.UTF16LE:
             if self.max_sz > 0:
                 if self.max_encoded_sz % 2 == 1:
                     nb = self.max_sz // 2
                     # euro character at the end that 'fully' use the 2 bytes of utf-16
-                    val = ('A' * nb).encode(self.codec) + b'\xac\x20'
-                    if val not in self.values_fuzzy:
-                        self.values_fuzzy.append(val)
+                    codec_val = ('A' * nb).encode(self.codec) + b'\xac\x20'
 
-        enc_cases = self.encoding_test_cases(orig_val, self.max_sz, self.min_sz,
-                                             self.min_encoded_sz, self.max_encoded_sz)
-        if enc_cases:
-            self.values_fuzzy += enc_cases
+        cases = (longer_val, tuple(shared_cases), codec_val)
+        cases_sz = len(longer_val) + sum(len(v) for v in shared_cases)
 
-        self.values_save = self.values
-        self.values = self.values_fuzzy
-        self.values_copy = copy.copy(self.values)
+        if cases_sz <= String.shared_fuzz_cases_max_size:
+            cache[key] = cases
+            String._shared_fuzz_cases_size += cases_sz
+            while String._shared_fuzz_cases_size > String.shared_fuzz_cases_max_size:
+                _, old_cases = cache.popitem(last=False)
+                String._shared_fuzz_cases_size -= len(old_cases[0]) + sum(len(v) for v in old_cases[1])
 
-        self.drawn_val = None
+        return cases
 
     def get_value(self):
         if not self.values:
@@ -994,7 +1036,7 @@ class String(VT_Alt):
         if self.determinist:
             ret = self.values_copy.pop(0)
         else:
-            ret = random.choice(self.values_copy)
+            ret = rng.choice(self.values_copy)
             self.values_copy.remove(ret)
 
         self.drawn_val = ret
@@ -1299,7 +1341,7 @@ class INT(VT):
             if self.determinist:
                 val = self.values_copy.pop(0)
             else:
-                val = random.choice(self.values_copy)
+                val = rng.choice(self.values_copy)
                 self.values_copy.remove(val)
             if not self.values_copy:
                 self.values_copy = copy.copy(self.values)
@@ -1321,7 +1363,7 @@ class INT(VT):
                 # 'values'. It avoids cunsuming too much memory and
                 # provide an end result that seems sufficient for such
                 # situation
-                val = random.randint(self.mini_gen, self.maxi_gen)
+                val = rng.randint(self.mini_gen, self.maxi_gen)
                 self.idx += 1
                 if self.idx > abs(self.maxi_gen - self.mini_gen):
                     self.idx = 0
@@ -1931,10 +1973,9 @@ class BitField(VT_Alt):
                 max_oset = builtins.max(orig_set)
                 min_oset = builtins.min(orig_set)
                 if min_oset != max_oset:
-                    diff_sorted = sorted(set(range(min_oset, max_oset+1)) - orig_set)
-                    if diff_sorted:
-                        item1 = diff_sorted[0]
-                        item2 = diff_sorted[-1]
+                    extremes = bp.missing_values_extremes(orig_set)
+                    if extremes is not None:
+                        item1, item2 = extremes
                         if item1 not in l and self.is_compatible(item1, sz):
                             l.append(item1)
                         if item2 not in l and self.is_compatible(item2, sz):
@@ -2204,10 +2245,10 @@ class BitField(VT_Alt):
             else:
                 if values is None:
                     mini, maxi = extrems
-                    drawn_val = random.randint(mini, maxi)
+                    drawn_val = rng.randint(mini, maxi)
                     self.idx[i] = self.idx_inuse[i] = drawn_val - mini
                 else:
-                    drawn_val = random.choice(values)
+                    drawn_val = rng.choice(values)
                     self.idx[i] = self.idx_inuse[i] = values.index(drawn_val)
 
                 val += drawn_val << prev_lim
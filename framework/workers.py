@@ -0,0 +1,194 @@
+################################################################################
+#
+#  Copyright 2017 Eric Lacombe <eric.lacombe@security-labs.org>
+#
+################################################################################
+#
+#  This file is part of fuddly.
+#
+#  fuddly is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  fuddly is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with fuddly. If not, see <http://www.gnu.org/licenses/>
+#
+################################################################################
+
+
+from __future__ import print_function
+
+import os
+import sys
+import threading
+import traceback
+import multiprocessing
+
+import framework.global_resources as gr
+from framework.database import RemoteDatabase
+from framework.tactics_helpers import set_modelwalker_sharding
+
+
+def _get_mp_context():
+    # Worker processes are spawned (rather than forked) as the framework runs threads
+    # that would not survive a fork.
+    if hasattr(multiprocessing, 'get_context'):
+        return multiprocessing.get_context('spawn')
+    else:
+        return multiprocessing
+
+
+def _worker_main(cmd_conn, db_conn, prj_name, dm_name, tg, worker_id, nb_workers, rng_seed):
+    from framework.plumbing import FmkPlumbing
+
+    log_fd = open(os.path.join(gr.logs_folder, 'worker_{:d}.log'.format(worker_id)), 'a', 1)
+    sys.stdout = log_fd
+    sys.stderr = log_fd
+
+    # the steps of the model walks are shared out among the workers
+    set_modelwalker_sharding(worker_id, nb_workers)
+
+    fmk = FmkPlumbing(fmkdb=RemoteDatabase(db_conn))
+    ok = fmk.run_project(name=prj_name, tg=tg, dm_name=dm_name)
+    if ok:
+        # each worker makes its own series of test cases
+        fmk.set_rng_seed(gr.derive_seed(rng_seed, 'worker', worker_id))
+    cmd_conn.send(bool(ok))
+
+    while ok:
+        try:
+            method, args, kwargs = cmd_conn.recv()
+        except EOFError:
+            break
+        if method is None:
+            break
+        try:
+            ret = getattr(fmk, method)(*args, **kwargs)
+        except Exception:
+            print('\n*** ERROR: {:s}() has crashed'.format(method))
+            traceback.print_exc()
+            ret = False
+        cmd_conn.send(ret)
+
+    fmk.exit_fmk()
+    log_fd.flush()
+
+
+class FmkWorkerPool(object):
+    '''
+    Pool of worker processes that share out the test cases of a fuzzing campaign. Each
+    worker runs its own instance of the framework, with its own instance of the project
+    target, and performs its share of the data maker chain. The steps of the model walks
+    (generic stateful disruptors relying on a ModelWalker) are split between the workers.
+
+    The records of the workers are forwarded to the FmkDB of the main process, which is
+    thus the only one writing to the database.
+    '''
+
+    def __init__(self, fmkdb, prj_name, dm_name, targets, rng_seed=None):
+        '''
+        Args:
+          fmkdb (Database): database of the main process.
+          prj_name (str): name of the project to run.
+          dm_name (str): name of the data model to load (or list of names).
+          targets (list): for each worker, number of the project target it will use.
+          rng_seed (int): seed from which the seeds of the workers are derived.
+        '''
+        self._fmkdb = fmkdb
+        self._prj_name = prj_name
+        self._dm_name = dm_name
+        self._targets = targets
+        self._rng_seed = rng_seed
+        self._workers = []
+
+    @property
+    def nb_workers(self):
+        return len(self._workers)
+
+    def start(self):
+        ctx = _get_mp_context()
+        nb_workers = len(self._targets)
+        for worker_id, tg in enumerate(self._targets):
+            cmd_conn, worker_cmd_conn = ctx.Pipe()
+            db_conn, worker_db_conn = ctx.Pipe()
+            proc = ctx.Process(target=_worker_main,
+                               args=(worker_cmd_conn, worker_db_conn, self._prj_name,
+                                     self._dm_name, tg, worker_id, nb_workers, self._rng_seed))
+            proc.daemon = True
+            proc.start()
+            # so that the death of the worker is noticed
+            worker_cmd_conn.close()
+            worker_db_conn.close()
+            db_server = threading.Thread(None, self._fmkdb.serve_remote_client,
+                                         'db_server_{:d}'.format(worker_id), args=(db_conn,))
+            db_server.daemon = True
+            db_server.start()
+            self._workers.append((proc, cmd_conn, db_server))
+
+        ok = True
+        for proc, cmd_conn, db_server in self._workers:
+            try:
+                ok = cmd_conn.recv() and ok
+            except EOFError:
+                ok = False
+        if not ok:
+            self.stop()
+        return ok
+
+    def stop(self):
+        for proc, cmd_conn, db_server in self._workers:
+            try:
+                cmd_conn.send((None, None, None))
+            except IOError:
+                pass
+        for proc, cmd_conn, db_server in self._workers:
+            proc.join()
+            db_server.join()
+            cmd_conn.close()
+        self._workers = []
+
+    def call(self, method, args_list=None, **kwargs):
+        '''
+        Call a method of FmkPlumbing within every worker, and wait for their completion.
+
+        Args:
+          method (str): name of the method.
+          args_list (list): for each worker, the positional arguments of the call.
+            If `None`, no positional arguments are provided.
+
+        Returns:
+          list: what the method has returned within each worker.
+        '''
+        for idx, (proc, cmd_conn, db_server) in enumerate(self._workers):
+            args = () if args_list is None else args_list[idx]
+            try:
+                cmd_conn.send((method, args, kwargs))
+            except IOError:
+                pass
+        ret = []
+        for proc, cmd_conn, db_server in self._workers:
+            try:
+                ret.append(cmd_conn.recv())
+            except (EOFError, IOError):
+                ret.append(None)
+        return ret
+
+    def send_loop(self, action_list, nb, valid_gen=False, save_seed=False):
+        '''
+        Share out a send loop among the workers (refer to FmkPlumbing.send_loop()).
+        The worker `i` sends the data `i`, `i+nb_workers`, ... of the loop.
+        '''
+        nb_workers = len(self._workers)
+        if nb == -1:
+            args_list = [(action_list, -1)] * nb_workers
+        else:
+            args_list = [(action_list, nb // nb_workers + (1 if i < nb % nb_workers else 0))
+                         for i in range(nb_workers)]
+        ret = self.call('send_loop', args_list, valid_gen=valid_gen, save_seed=save_seed)
+        return all(ret)
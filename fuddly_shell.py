@@ -26,9 +26,11 @@
 import sys
 from framework.plumbing import *
 
-fmk = FmkPlumbing()
+# the guard prevents processes spawned by the framework from running the shell
+if __name__ == "__main__":
+    fmk = FmkPlumbing()
 
-shell = FmkShell("Fuddly Shell", fmk)
-shell.cmdloop()
+    shell = FmkShell("Fuddly Shell", fmk)
+    shell.cmdloop()
 
-sys.exit(0)
+    sys.exit(0)
@@ -125,6 +125,12 @@ except ImportError:
     print('WARNING [FMK]: python(3)-paramiko module is not installed! '
           'Should be installed for ssh-based monitoring.')
 
+numpy_module = True
+try:
+    import numpy
+except ImportError:
+    numpy_module = False
+
 serial_module = True
 try:
     import serial
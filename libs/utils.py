@@ -22,13 +22,19 @@
 ################################################################################
 
 import os
+import errno
 import subprocess
 import re
 
 def ensure_dir(f):
     d = os.path.dirname(f)
     if not os.path.exists(d):
-        os.makedirs(d)
+        try:
+            os.makedirs(d)
+        except OSError as e:
+            # the folder may have been created concurrently
+            if e.errno != errno.EEXIST:
+                raise
 
 def ensure_file(f):
     if not os.path.isfile(f):
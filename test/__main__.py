@@ -26,13 +26,14 @@ import unittest
 from test import args
 import test.unit, test.integration
 
-if len(args) == 2 and args[1] == "test":
-    del args[1]
+if __name__ == "__main__":
+    if len(args) == 2 and args[1] == "test":
+        del args[1]
 
-if len(args) == 1:
-    args.append('test.unit')
-    args.append('test.integration')
+    if len(args) == 1:
+        args.append('test.unit')
+        args.append('test.integration')
 
-unittest.main(verbosity=2, argv=args, defaultTest=None, exit=False)
+    unittest.main(verbosity=2, argv=args, defaultTest=None, exit=False)
 
 
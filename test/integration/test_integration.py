@@ -25,6 +25,7 @@
 from __future__ import print_function
 
 import sys
+import pickle
 import unittest
 
 import ddt
@@ -39,9 +40,10 @@ from framework.fuzzing_primitives import *
 from framework.plumbing import *
 from framework.data_model import *
 from framework.encoders import *
+from framework.basic_primitives import *
+import framework.basic_primitives as basic_primitives
 
-
-from test import ignore_data_model_specifics, run_long_tests
+from test import ignore_data_model_specifics, run_long_tests, mock
 
 def setUpModule():
     global fmk, dm, results
@@ -1421,6 +1423,62 @@ class TestMisc(unittest.TestCase):
         e.make_determinist(all_conf=True, recursive=True)
         self._loop_nodes(e, loop_count, criteria_func=lambda x: x.name == 'Middle_NT')
 
+    def test_corruption_primitives_in_place(self):
+        orig = bytes(bytearray(range(256)))*64
+
+        for seed in (1, 2):
+            gr.rng.seed(seed)
+            buf = bytearray(orig)
+            pos = corrupt_bits_in_place(buf, n=100)
+            self.assertEqual(len(set(int(i) for i in pos)), 100)
+            diff = sum(bin(a ^ b).count('1') for a, b in zip(orig, buf))
+            self.assertEqual(diff, 100)
+
+            gr.rng.seed(seed)
+            self.assertEqual(corrupt_bits(orig, n=100), bytes(buf))
+
+        buf = bytearray(orig)
+        pos = corrupt_bytes_in_place(memoryview(buf)[10:20], n=5, ctrl_char=True)
+        self.assertEqual(len(pos), 5)
+        self.assertEqual(buf[:10], orig[:10])
+        self.assertEqual(buf[20:], orig[20:])
+        for i in pos:
+            self.assertIn(buf[10+int(i)], list(range(0, 32)) + [0x7f])
+
+        buf = bytearray(b'A'*1000)
+        corrupt_bits_in_place(buf, p=0.5, ascii=True)
+        self.assertTrue(all(b < 0x80 for b in buf))
+
+        buf = bytearray(orig)
+        pos = set_interesting_values_in_place(buf, n=3, values=[b'\xde'])
+        self.assertEqual(len(buf), len(orig))
+        for i in pos:
+            self.assertEqual(buf[int(i)], 0xde)
+
+        self.assertEqual(corrupt_bytes(b''), b'')
+
+        # the same seed leads to the same corruption, whether numpy is used or not
+        for primitive, kwargs in [(corrupt_bits_in_place, {'n': 50, 'ascii': True}),
+                                  (corrupt_bits_in_place, {'p': 0.6}),
+                                  (corrupt_bytes_in_place, {'n': 50}),
+                                  (corrupt_bytes_in_place, {'n': 50, 'ctrl_char': True}),
+                                  (set_interesting_values_in_place, {'n': 2000})]:
+            outputs = []
+            for numpy_used in (True, False):
+                with mock.patch('framework.basic_primitives.numpy_module',
+                                numpy_used and basic_primitives.numpy_module):
+                    gr.rng.seed(3)
+                    buf = bytearray(orig)
+                    pos = primitive(buf, **kwargs)
+                    outputs.append((list(pos), bytes(buf), gr.rng.random()))
+            self.assertEqual(outputs[0], outputs[1])
+
+
+class CountingVisitor(BasicVisitor):
+    def consume_node(self, node):
+        self.nb_calls = getattr(self, 'nb_calls', 0) + 1
+        return BasicVisitor.consume_node(self, node)
+
 
 class TestModelWalker(unittest.TestCase):
     @classmethod
@@ -1463,6 +1521,84 @@ class TestModelWalker(unittest.TestCase):
             print(colorize('[%d] ' % idx + repr(rnode.to_bytes()), rgb=Color.INFO))
         self.assertEqual(idx, 37)
 
+    def test_sharded_walk(self):
+        def walk(shard=0, nb_shards=1):
+            nt = self.dm.get_atom('Simple')
+            consumer = BasicVisitor(respect_order=True)
+            return [(idx, rnode.to_bytes())
+                    for rnode, consumed_node, orig_node_val, idx in
+                    ModelWalker(nt, consumer, make_determinist=True, max_steps=200,
+                                shard=shard, nb_shards=nb_shards)]
+
+        full_walk = walk()
+        shards = [walk(shard=i, nb_shards=3) for i in range(3)]
+        for i, steps in enumerate(shards):
+            self.assertTrue(all((idx - 1) % 3 == i for idx, val in steps))
+        self.assertEqual(sorted(sum(shards, [])), sorted(full_walk))
+
+    def test_resumed_walk(self):
+        def alt_conf_consumer():
+            consumer = AltConfConsumer(max_runs_per_node=-1, min_runs_per_node=-1)
+            consumer.set_node_interest(owned_confs=['ALT', 'ALT_2'])
+            return consumer
+
+        consumers = [lambda: CountingVisitor(respect_order=True),
+                     lambda: NonTermVisitor(respect_order=True),
+                     lambda: TypedNodeDisruption(max_runs_per_node=1),
+                     alt_conf_consumer]
+
+        def new_walker(consumer, initial_step=1):
+            # the walk depends on the state of the random number generator
+            gr.rng.seed(1)
+            return ModelWalker(self.dm.get_atom('Simple'), consumer, make_determinist=True,
+                               initial_step=initial_step)
+
+        def steps(walker, it=None):
+            return [(idx, rnode.to_bytes(), walker.consumed_node_path, orig_node_val)
+                    for rnode, consumed_node, orig_node_val, idx in (it or walker)]
+
+        for new_consumer in consumers:
+            full_walker = new_walker(new_consumer())
+            full_walk = steps(full_walker)
+
+            for step in sorted({1, 2, 3, len(full_walk) // 2, len(full_walk) - 1, len(full_walk)}):
+                walker = new_walker(new_consumer())
+                walk = []
+                it = iter(walker)
+                for rnode, consumed_node, orig_node_val, idx in it:
+                    walk.append((idx, rnode.to_bytes(), walker.consumed_node_path, orig_node_val))
+                    if idx == step:
+                        break
+                cursor = pickle.loads(pickle.dumps(walker.get_cursor()))
+                self.assertEqual(cursor.step, step + 1)
+
+                # the walk goes on after the checkpoint
+                walk += steps(walker, it)
+                self.assertEqual(walk, full_walk)
+
+                resumed_walker = ModelWalker.from_cursor(cursor, data_model=self.dm)
+                self.assertEqual(steps(resumed_walker), full_walk[step:])
+                if isinstance(full_walker._consumer, CountingVisitor):
+                    # the steps before the cursor have not been walked through again
+                    self.assertEqual(resumed_walker._consumer.nb_calls,
+                                     full_walker._consumer.nb_calls)
+
+                # a range of the walk
+                range_walker = ModelWalker.from_cursor(cursor, data_model=self.dm, max_steps=3)
+                self.assertEqual(steps(range_walker), full_walk[step:step+3])
+
+            # the end of a walk
+            cursor = full_walker.get_cursor()
+            self.assertEqual(cursor.step, len(full_walk) + 1)
+            self.assertEqual(steps(ModelWalker.from_cursor(cursor, data_model=self.dm)), [])
+
+            # a walk that has not begun
+            walker = new_walker(new_consumer(), initial_step=4)
+            cursor = walker.get_cursor()
+            self.assertEqual(cursor.step, 4)
+            self.assertEqual(steps(ModelWalker.from_cursor(cursor, data_model=self.dm)),
+                             full_walk[3:])
+
     def test_NonTermVisitor(self):
         print('***')
         idx = 0
@@ -1861,6 +1997,24 @@ class TestNodeFeatures(unittest.TestCase):
     def setUp(self):
         pass
 
+    def test_to_buffers(self):
+        nd = Node('root', subnodes=[Node('a', values=[b'AAA']),
+                                    Node('empty', values=[b'']),
+                                    Node('b', subnodes=[Node('c', values=[b'CC']),
+                                                        Node('d', value_type=UINT16_be(values=[1]))])])
+        buffers = Data(nd).to_buffers()
+        self.assertEqual(b''.join(buffers), b'AAACC\x00\x01')
+        self.assertEqual(buffers[:2], [b'AAA', b''])
+        self.assertEqual(nd.to_buffers(), buffers)
+        self.assertEqual(nd.to_bytes(), b''.join(buffers))
+        # once concatenated, the cached value is reused
+        self.assertEqual(nd.to_buffers(), [b'AAACC\x00\x01'])
+        nd['root/b/c$'].set_values(values=[b'XYZ'])
+        buffers = nd.to_buffers()
+        self.assertEqual(b''.join(buffers), b'AAAXYZ\x00\x01')
+        self.assertEqual(buffers[:2], [b'AAA', b''])
+        self.assertEqual(Data(b'raw').to_buffers(), [b'raw'])
+
     def test_djobs(self):
         tag_desc = \
         {'name': 'tag',
@@ -2706,6 +2860,37 @@ class TestNode_TypedValue(unittest.TestCase):
     def setUp(self):
         pass
 
+    def test_str_shared_fuzz_cases(self):
+        s1 = String(values=['shared'], max_sz=20)
+        s2 = String(values=['shared'], max_sz=20)
+        s3 = String(values=['shared'], max_sz=20, extra_fuzzy_list=[b'extra'])
+        for s in (s1, s2, s3):
+            s.enable_fuzz_mode()
+
+        self.assertEqual(s1.values[1:], s2.values[1:])
+        for v1, v2 in zip(s1.values[1:], s2.values[1:]):
+            self.assertIs(v1, v2)
+        self.assertIn(b'extra', s3.values)
+        self.assertNotIn(b'extra', s1.values)
+        self.assertIn(b'shared' + b'%n'*400, s1.values)
+
+        s4 = String(values=['shared'], max_sz=20)
+        s4.enable_fuzz_mode(fuzz_magnitude=0.5)
+        self.assertIn(b'shared' + b'%n'*200, s4.values)
+        self.assertNotIn(b'shared' + b'%n'*400, s4.values)
+
+        s1.enable_normal_mode()
+        self.assertEqual(s1.values, [b'shared'])
+
+        max_size = String.shared_fuzz_cases_max_size
+        try:
+            String.shared_fuzz_cases_max_size = 20000
+            for i in range(20):
+                String(values=['val{:d}'.format(i)], max_sz=20).enable_fuzz_mode()
+            self.assertLessEqual(String._shared_fuzz_cases_size, 20000)
+        finally:
+            String.shared_fuzz_cases_max_size = max_size
+
     def test_str_alphabet(self):
 
         alphabet1 = 'ABC'
@@ -3047,6 +3232,27 @@ class TestDataModel(unittest.TestCase):
         data = copy.copy(Data(node))
         data = copy.copy(Data('TEST'))
 
+    def test_data_snapshot(self):
+        node = Node('root', subnodes=[Node('a', values=[b'AAA']), Node('b', values=[b'BB'])])
+        data = Data(node)
+        data.make_snapshot()
+        self.assertTrue(data.has_snapshot())
+        # changes made in place are not seen until the snapshot is dropped
+        node['root/a$'].set_values(values=[b'XYZW'])
+        self.assertEqual(data.to_buffers(), [b'AAA', b'BB'])
+        self.assertEqual(data.get_length(), 5)
+        self.assertEqual(data.to_bytes(), b'AAABB')
+        self.assertEqual(data.to_buffers(), [b'AAA', b'BB'])
+        self.assertEqual(data.to_str(), 'AAABB')
+        self.assertFalse(copy.copy(data).has_snapshot())
+        data.drop_snapshot()
+        self.assertEqual(data.to_bytes(), b'XYZWBB')
+
+        data.make_snapshot()
+        data.update_from(b'raw')
+        self.assertFalse(data.has_snapshot())
+        self.assertEqual(data.get_length(), 3)
+
     @unittest.skipIf(not run_long_tests, "Long test case")
     def test_data_makers(self):
 
@@ -3086,6 +3292,134 @@ class TestDataModel(unittest.TestCase):
             off = int_idx * 3 + 10  # +10 for 'prefix' delta
             self.assertEqual(off, retr_off)
 
+    def test_data_model_cache(self):
+        dm_cls = type(fmk.get_data_model_by_name('mydf'))
+
+        dm = dm_cls()
+        dm.load_data_model(fmk._name2dm)
+        self.assertIsNotNone(dm._cache_key)
+
+        cached_dm = dm_cls()
+        with mock.patch.object(dm_cls, 'build_data_model',
+                               side_effect=AssertionError('the data model has been rebuilt')):
+            cached_dm.load_data_model(fmk._name2dm)
+
+        self.assertEqual(list(dm.atom_identifiers()), list(cached_dm.atom_identifiers()))
+        self.assertIs(cached_dm.node_backend._dm, cached_dm)
+        for data_id in cached_dm.atom_identifiers():
+            self.assertIs(cached_dm._dm_hashtable[data_id].env.get_data_model(), cached_dm)
+            cached_dm.get_atom(data_id).to_bytes()
+
+    def test_data_model_cache_failure(self):
+        dm_cls = type(fmk.get_data_model_by_name('mydf'))
+
+        dm = dm_cls()
+        dm.load_data_model(fmk._name2dm)
+        with open(dm._cache_path(), 'r+b') as f:
+            pickle.load(f)
+            # the cache key is valid but not the saved data model
+            f.truncate(f.tell() + 16)
+
+        rebuilt_dm = dm_cls()
+        with mock.patch('framework.data_model.colorize', side_effect=lambda msg, **kwargs: msg) \
+                as colorize_mock:
+            rebuilt_dm.load_data_model(fmk._name2dm)
+
+        msgs = [c[0][0] for c in colorize_mock.call_args_list]
+        self.assertTrue(any("cache of the data model 'mydf' cannot be loaded" in m for m in msgs))
+        self.assertEqual(list(dm.atom_identifiers()), list(rebuilt_dm.atom_identifiers()))
+
+    def test_import_file_contents(self):
+        dm = DataModel()
+        path = os.path.join(gr.workspace_folder, 'test_import_file_contents')
+        if not os.path.exists(path):
+            os.makedirs(path)
+        for name, contents in [('c.bin', b'ccc'), ('a.bin', b'a'), ('b.bin', b'bad'), ('d.txt', b'd')]:
+            with open(os.path.join(path, name), 'wb') as f:
+                f.write(contents)
+
+        def absorber(data, idx):
+            if data == b'bad':
+                raise ValueError('bad sample')
+            return (idx, data)
+
+        msgs = dm.import_file_contents(absorber=absorber, path=path, processes=1)
+        self.assertEqual(list(msgs.items()), [('a.bin', (0, b'a')), ('c.bin', (2, b'ccc'))])
+
+    @unittest.skipIf(sys.version_info[:2] < (3, 8), "Local functions cannot be sent to other processes")
+    def test_import_file_contents_in_parallel(self):
+        dm = DataModel()
+        dm.name = 'test_parallel_absorption'
+        path = os.path.join(gr.workspace_folder, 'test_import_file_contents_in_parallel')
+        if not os.path.exists(path):
+            os.makedirs(path)
+        for idx in range(6):
+            with open(os.path.join(path, '{:d}.bin'.format(idx)), 'wb') as f:
+                f.write(b'bad' if idx == 3 else str(idx).encode())
+
+        def absorber(data, idx):
+            if data == b'bad':
+                raise ValueError('bad sample')
+            # the data model is sent back by name, and rebound to the one of this process
+            return (idx, data, os.getpid(), dm)
+
+        msgs = dm.import_file_contents(absorber=absorber, path=path, processes=2)
+        self.assertEqual([(k, v[:2]) for k, v in msgs.items()],
+                         [('{:d}.bin'.format(i), (i, str(i).encode())) for i in [0, 1, 2, 4, 5]])
+        for idx, data, pid, d in msgs.values():
+            self.assertNotEqual(pid, os.getpid())
+            self.assertIs(d, dm)
+
+        # workers that cannot start in time are replaced by the current process
+        with mock.patch('framework.data_model._process_startup_timeout', 0.001):
+            msgs = dm.import_file_contents(absorber=absorber, path=path, processes=2)
+        self.assertEqual(len(msgs), 5)
+        for idx, data, pid, d in msgs.values():
+            self.assertEqual(pid, os.getpid())
+            self.assertIs(d, dm)
+
+    @unittest.skipIf(not run_long_tests, "Long test case")
+    def test_pdf_reachable_nodes_benchmark(self):
+
+        def legacy_reachable_nodes(node, path_regexp=None):
+            # quadratic merging, and paths recomputed for each candidate
+            s = []
+            if path_regexp is None or \
+                    any(re.search(path_regexp, p) for p in node.get_all_paths_from(pdf)):
+                s.append(node)
+            if node.is_nonterm():
+                iterable = node.cc.frozen_node_list
+                iterable = node.cc.subnodes_set if iterable is None else iterable
+            elif node.is_genfunc():
+                iterable = [node.cc.generated_node]
+            else:
+                iterable = []
+            for sub in iterable:
+                for e in legacy_reachable_nodes(sub, path_regexp=path_regexp):
+                    if e not in s:
+                        s.append(e)
+            return s
+
+        dm = fmk.get_data_model_by_name('pdf')
+        dm.load_data_model(fmk._name2dm)
+        pdf = dm.get_atom('PDF_basic')
+        pdf.freeze()
+
+        for regexp in [None, '/obj_.*/content']:
+            now = datetime.datetime.now()
+            ref = legacy_reachable_nodes(pdf, path_regexp=regexp)
+            legacy_time = (datetime.datetime.now() - now).total_seconds()
+
+            now = datetime.datetime.now()
+            nodes = pdf.get_reachable_nodes(path_regexp=regexp, respect_order=True)
+            exec_time = (datetime.datetime.now() - now).total_seconds()
+
+            print("\n*** get_reachable_nodes(path_regexp={!r}) on 'PDF_basic' [{:d} nodes]\n"
+                  "    legacy: {:.3f}s / current: {:.3f}s"
+                  .format(regexp, len(nodes), legacy_time, exec_time))
+
+            self.assertEqual(nodes, ref)
+
     @unittest.skipIf(ignore_data_model_specifics, "USB specific test cases")
     def test_usb_specifics(self):
 
@@ -3349,6 +3683,30 @@ class TestDataModelHelpers(unittest.TestCase):
 
         self.assertEqual(len(shapes), 0)
 
+    @ddt.data((CRC(vt=UINT32_be), 0xCBF43926),
+              (CRC16(), 0x29B1),
+              (CRC16(variant='modbus'), 0x4B37),
+              (CRC16(variant='x-25'), 0x906E),
+              (ADLER32(), 0x091E01DE),
+              (IP_CHECKSUM(), 0xF62A))
+    @ddt.unpack
+    def test_checksums(self, generator, check_value):
+        desc = \
+            {'name': 'checksum_test',
+             'contents': [
+                 {'name': 'body',
+                  'contents': [
+                      {'name': 'part1', 'contents': String(values=['12345'])},
+                      {'name': 'part2', 'contents': String(values=['6789'])},
+                  ]},
+                 {'name': 'cksum',
+                  'contents': generator,
+                  'node_args': ['part1', 'part2']},
+             ]}
+
+        node = NodeBuilder().create_graph_from_desc(desc)
+        self.assertEqual(node['checksum_test/cksum$'].get_raw_value(), check_value)
+
 
 class TestFMK(unittest.TestCase):
     @classmethod
@@ -3358,6 +3716,13 @@ class TestFMK(unittest.TestCase):
     def setUp(self):
         fmk.reload_all(tg_num=0)
 
+    def test_dm_and_prj_lists(self):
+        # the data models and projects that are not imported yet are part of the lists
+        dm_names = sorted(fmk._data_model_names())
+        prj_names = sorted(fmk._project_names())
+        self.assertEqual(sorted(dm.name for dm in fmk.dm_list), dm_names)
+        self.assertEqual(sorted(prj.name for prj in fmk.prj_list), prj_names)
+
     def test_generic_disruptors_01(self):
         dmaker_type = 'TESTNODE'
         # fmk.cleanup_dmaker(dmaker_type=dmaker_type, reset_existing_seed=True)
@@ -3444,6 +3809,156 @@ class TestFMK(unittest.TestCase):
 
         self.assertEqual(idx, expected_idx)
 
+    def test_pipelined_send_loop(self):
+        act = [('OFF_GEN', UI(determinist=True)), ('tTYPE', UI(runs_per_node=1))]
+        get_data = fmk.get_data
+        generated = []
+        sent = []
+
+        def generate(*args, **kwargs):
+            # the framework state is never shared with the sending thread
+            self.assertTrue(fmk._fmk_lock._is_owned())
+            data = get_data(*args, **kwargs)
+            generated.append(data)
+            return data
+
+        def send(data):
+            sent.append(data)
+            return len(sent) != 2
+
+        fmk.set_pipeline_depth(3)
+        with mock.patch.object(fmk, 'get_data', side_effect=generate), \
+                mock.patch.object(fmk, 'send_data_and_log', side_effect=send):
+            self.assertTrue(fmk.send_loop(act, 6))
+            self.assertEqual(len(sent), 2)
+            self.assertTrue(fmk.send_loop(act, 4))
+        fmk.set_pipeline_depth(0)
+        fmk.cleanup_all_dmakers(reset_existing_seed=True)
+
+        self.assertEqual(len(sent), 6)
+        self.assertEqual(generated, sent)
+
+    def test_pipelined_send_loop_generation_error(self):
+        act = [('OFF_GEN', UI(determinist=True)), ('tTYPE', UI(runs_per_node=1))]
+
+        def generate(*args, **kwargs):
+            raise ValueError('generation error')
+
+        fmk.set_pipeline_depth(2)
+        with mock.patch.object(fmk, 'get_data', side_effect=generate), \
+                mock.patch.object(fmk, 'send_data_and_log') as send, \
+                mock.patch.object(fmk, '_handle_user_code_exception') as handler:
+            self.assertFalse(fmk.send_loop(act, 3))
+        fmk.set_pipeline_depth(0)
+        fmk.cleanup_all_dmakers(reset_existing_seed=True)
+
+        send.assert_not_called()
+        handler.assert_called_once()
+
+    def test_data_serialized_once(self):
+        data = fmk.get_data(['SHAPE'])
+        self.assertIsNotNone(data)
+        expected = data.to_bytes()
+        backend_cls = type(data._backend)
+        with mock.patch.object(backend_cls, 'to_buffers', autospec=True,
+                               side_effect=backend_cls.to_buffers) as m_buffers, \
+                mock.patch.object(backend_cls, 'to_bytes', autospec=True,
+                                  side_effect=backend_cls.to_bytes) as m_bytes:
+            self.assertTrue(fmk.send_data_and_log(data))
+        self.assertEqual(m_buffers.call_count, 1)
+        self.assertEqual(m_bytes.call_count, 0)
+        self.assertFalse(data.has_snapshot())
+        data_id = data.get_data_id()
+        records = list(fmk.fmkDB.fetch_data(start_id=data_id, end_id=data_id))
+        self.assertEqual(records[0][1], expected)
+        fmk.cleanup_all_dmakers(reset_existing_seed=True)
+
+    def test_data_sent_as_buffers(self):
+        import socket
+        from framework.targets.network import NetworkTarget
+        from test.unit.test_network_target import EchoServer
+
+        sendmsg_buffers = []
+        socket_cls = socket.socket
+
+        class RecordingSocket(socket_cls):
+            def sendmsg(self, buffers, *args):
+                sendmsg_buffers.append([bytes(b) for b in buffers])
+                return socket_cls.sendmsg(self, buffers, *args)
+
+        server = EchoServer(socket.SOCK_STREAM)
+        tg = NetworkTarget(host='localhost', port=server.port,
+                           socket_type=(socket.AF_INET, socket.SOCK_STREAM),
+                           hold_connection=True)
+        tg.set_logger(mock.Mock())
+        tg.set_feedback_mode(Target.FBK_WAIT_UNTIL_RECV)
+        tg.set_timeout(fbk_timeout=0.5, sending_delay=2)
+        self.assertTrue(tg.start())
+        try:
+            node = Node('payload', subnodes=[Node('a', values=[b'AAA']), Node('b', values=[b'BB']),
+                                             Node('c', values=[b'C'])])
+            data = Data(node)
+            with mock.patch.object(fmk, 'tg', tg), \
+                    mock.patch('framework.targets.network.socket.socket', RecordingSocket):
+                self.assertTrue(fmk.send_data_and_log(data))
+        finally:
+            tg.stop()
+            server.stop()
+
+        if NetworkTarget._sendmsg_supported:
+            self.assertEqual(sendmsg_buffers, [[b'AAA', b'BB', b'C']])
+        data_id = data.get_data_id()
+        records = list(fmk.fmkDB.fetch_data(start_id=data_id, end_id=data_id))
+        self.assertEqual(records[0][1], b'AAABBC')
+
+    def test_rng_seed(self):
+        act = ['SHAPE', ('C', UI(nb=2))]
+
+        fmk.set_rng_seed(42)
+        first_run = [fmk.get_data(act) for i in range(5)]
+        fmk.set_rng_seed(42)
+        second_run = [fmk.get_data(act) for i in range(5)]
+
+        seeds = [d.get_rng_seed() for d in first_run]
+        self.assertEqual(len(set(seeds)), 5)
+        self.assertEqual(seeds, [d.get_rng_seed() for d in second_run])
+        self.assertEqual([d.to_bytes() for d in first_run], [d.to_bytes() for d in second_run])
+
+        # any test case can be regenerated on its own
+        d = fmk.get_data(['SHAPE'], rng_seed=seeds[3])
+        self.assertEqual(d.get_rng_seed(), seeds[3])
+        self.assertEqual(d.to_bytes(), fmk.get_data(['SHAPE'], rng_seed=seeds[3]).to_bytes())
+
+        fmk._log_data(d)
+        self.assertEqual(fmk.fmkDB.get_rng_seed(d.get_data_id()), seeds[3])
+        fmk.cleanup_all_dmakers(reset_existing_seed=True)
+
+    def test_corrupt_with_interesting_values(self):
+        orig = b'\x42'*1000
+        d = fmk.get_data([('C', None, UI(interesting=True))], data_orig=Data(orig))
+        self.assertIsNotNone(d)
+        val = d.to_bytes()
+        self.assertEqual(len(val), len(orig))
+        self.assertNotEqual(val, orig)
+        self.assertTrue(all(b in b'\x00\x01\x7f\x80\xff\x42' for b in bytearray(val)))
+        fmk.cleanup_all_dmakers(reset_existing_seed=True)
+
+    @unittest.skipIf(not run_long_tests, "Long test case")
+    def test_worker_pool(self):
+        act = [('OFF_GEN', UI(determinist=True)), ('tTYPE', UI(runs_per_node=1))]
+        last_id = fmk.fmkDB.execute_sql_statement('SELECT MAX(ID) FROM DATA;')[0][0] or 0
+
+        self.assertTrue(fmk.start_workers([0, 0], dm_name='mydf'))
+        try:
+            self.assertTrue(fmk.send_loop(act, 6))
+        finally:
+            fmk.start_workers([])
+
+        records = fmk.fmkDB.execute_sql_statement(
+            'SELECT ID, TYPE FROM DATA WHERE ID > ?;', params=(last_id,))
+        self.assertEqual([r[0] for r in records], list(range(last_id + 1, last_id + 7)))
+        self.assertTrue(all(r[1] == 'OFF_GEN' for r in records))
+
     def test_typednode_disruptor(self):
 
         idx = 0
@@ -3466,6 +3981,38 @@ class TestFMK(unittest.TestCase):
 
         self.assertEqual(idx, expected_idx)
 
+    def test_typednode_disruptor_resumed(self):
+        checkpoint = 'test_typednode_disruptor_resumed'
+        path = os.path.join(gr.workspace_folder, checkpoint)
+        if os.path.exists(path):
+            os.remove(path)
+
+        def walk(generic_ui, first_step, nb=100):
+            act = [('OFF_GEN', UI(determinist=True)), ('tTYPE', generic_ui)]
+            outcomes = []
+            for step in range(first_step, first_step + nb):
+                d = fmk.get_data(act, rng_seed=step)
+                if d is None:
+                    break
+                outcomes.append(d.to_bytes())
+            fmk.cleanup_all_dmakers(reset_existing_seed=True)
+            return outcomes
+
+        expected = walk(UI(runs_per_node=1), 1)
+        self.assertEqual(len(expected), 13)
+
+        # the walk is interrupted after 7 steps, the state saved after the 5th is kept
+        outcomes = walk(UI(runs_per_node=1, checkpoint=checkpoint, checkpoint_freq=5), 1, nb=7)
+        self.assertEqual(outcomes, expected[:7])
+        self.assertTrue(os.path.exists(path))
+
+        outcomes = walk(UI(runs_per_node=1, checkpoint=checkpoint, checkpoint_freq=5, resume=True), 6)
+        self.assertEqual(outcomes, expected[5:])
+
+        # the state saved at the end of the walk does not lead to walk through it again
+        self.assertEqual(walk(UI(runs_per_node=1, checkpoint=checkpoint, resume=True), 14), [])
+        os.remove(path)
+
     def test_operator_1(self):
 
         fmk.launch_operator('MyOp', user_input=UserInputContainer(specific=UI(max_steps=100, mode=1)))
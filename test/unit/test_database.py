@@ -0,0 +1,295 @@
+################################################################################
+#
+#  Copyright 2014-2016 Eric Lacombe <eric.lacombe@security-labs.org>
+#
+################################################################################
+#
+#  This file is part of fuddly.
+#
+#  fuddly is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  fuddly is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with fuddly. If not, see <http://www.gnu.org/licenses/>
+#
+################################################################################
+
+import os
+import shutil
+import sqlite3
+import tempfile
+import threading
+import time
+import multiprocessing
+import unittest
+from datetime import datetime
+
+from test import mock
+from framework.database import Database, RemoteDatabase
+import framework.global_resources as gr
+
+
+class DatabaseTest(unittest.TestCase):
+    """Test case used to test the 'Database' class."""
+
+    def setUp(self):
+        self.tmp_dir = tempfile.mkdtemp()
+        self.db_path = os.path.join(self.tmp_dir, 'fmkDB.db')
+        self.db = self._new_db()
+
+    def tearDown(self):
+        if self.db.enabled:
+            self.db.stop()
+        shutil.rmtree(self.tmp_dir)
+
+    def _new_db(self, **kwargs):
+        db = Database(fmkdb_path=self.db_path, **kwargs)
+        self.assertTrue(db.start())
+        db.insert_data_model('dm')
+        db.insert_project('prj')
+        return db
+
+    def _count_committed(self, table):
+        con = sqlite3.connect(self.db_path)
+        try:
+            return con.execute('SELECT COUNT(*) FROM {:s}'.format(table)).fetchone()[0]
+        finally:
+            con.close()
+
+    def _insert_data(self, db, content=b'ABCD'):
+        return db.insert_data('GEN', 'dm', content, len(content), datetime.now(), None,
+                              'target', 'prj')
+
+    def test_wal_journaling(self):
+        self.db.stop()
+        con = sqlite3.connect(self.db_path)
+        mode = con.execute('PRAGMA journal_mode').fetchone()[0]
+        con.close()
+        self.assertEqual(mode, 'wal')
+
+    def test_group_commit(self):
+        self.db.stop()
+        self.db = self._new_db(group_commit=True, commit_period=3600, commit_max_stmts=10**6)
+        for i in range(5):
+            self._insert_data(self.db)
+            self.db.signal_test_case_end()
+        self.db.execute_sql_statement('SELECT ID FROM DATA;')
+        self.assertEqual(self._count_committed('DATA'), 0)
+        self.db.flush()
+        self.assertEqual(self._count_committed('DATA'), 5)
+
+    def test_per_case_commit(self):
+        self.db.stop()
+        self.db = self._new_db(group_commit=False, commit_period=3600, commit_max_stmts=10**6)
+        self._insert_data(self.db)
+        self.db.signal_test_case_end()
+        # ensure the handler went through the case boundary
+        self.db.execute_sql_statement('SELECT ID FROM DATA;')
+        self.assertEqual(self._count_committed('DATA'), 1)
+
+    def test_commit_on_stop(self):
+        self.db.stop()
+        self.db = self._new_db(group_commit=True, commit_period=3600, commit_max_stmts=10**6)
+        for i in range(3):
+            self._insert_data(self.db)
+        self.db.stop()
+        self.assertEqual(self._count_committed('DATA'), 3)
+
+    def test_async_submission(self):
+        handles = [self.db.submit_sql_stmt_async(
+            "INSERT INTO PROJECT(NAME) VALUES(?)", params=('async{:d}'.format(i),))
+            for i in range(10)]
+        handle = self.db.submit_sql_stmt_async("SELECT NAME FROM PROJECT WHERE NAME LIKE 'async%';",
+                                               outcome_type=Database.OUTCOME_DATA)
+        self.assertTrue(handle.wait(5))
+        for h in handles:
+            self.assertTrue(h.done())
+            self.assertIsNone(h.result())
+        self.assertEqual(len(handle.result()), 10)
+
+    def test_outcome_latency(self):
+        # the SQL handler shall be woken up by the submission, not by a timer
+        start = time.time()
+        for i in range(100):
+            self._insert_data(self.db)
+            self.db.execute_sql_statement('SELECT MAX(ID) FROM DATA;')
+        self.assertLess(time.time() - start, 1.0)
+
+    def test_data_id_allocation(self):
+        ids = [self._insert_data(self.db) for i in range(3)]
+        self.assertEqual(ids, [1, 2, 3])
+        first, last = self.db.reserve_data_ids(10)
+        self.assertEqual((first, last), (4, 13))
+        self.assertEqual(self._insert_data(self.db), 14)
+        self.db.remove_data(14, colorized=False)
+        self.db.stop()
+
+        # IDs are never reused, even the ones of deleted records
+        self.db = self._new_db()
+        self.assertEqual(self._insert_data(self.db), 15)
+        rec = self.db.execute_sql_statement('SELECT ID FROM DATA WHERE ID == 15;')
+        self.assertEqual(rec, [(15,)])
+
+    def _list_indexes(self):
+        con = sqlite3.connect(self.db_path)
+        try:
+            return [x[0] for x in con.execute(
+                "SELECT NAME FROM SQLITE_MASTER WHERE TYPE='index' AND NAME LIKE 'IDX_%';")]
+        finally:
+            con.close()
+
+    def _drop_indexes(self):
+        self.db.stop()
+        indexes = self._list_indexes()
+        con = sqlite3.connect(self.db_path)
+        for idx in indexes:
+            con.execute('DROP INDEX {:s};'.format(idx))
+        con.commit()
+        con.close()
+        return indexes
+
+    def test_indexes(self):
+        self.assertIn('IDX_FEEDBACK_DATA_ID', self._list_indexes())
+        plan = self.db.execute_sql_statement(
+            'EXPLAIN QUERY PLAN SELECT * FROM FEEDBACK WHERE DATA_ID == 1;')
+        self.assertIn('IDX_FEEDBACK_DATA_ID', ''.join([str(x) for x in plan]))
+
+    def test_index_migration(self):
+        indexes = self._drop_indexes()
+        self.db = self._new_db()
+        self.assertEqual(self._list_indexes(), indexes)
+
+    def test_offline_index_building(self):
+        indexes = self._drop_indexes()
+        self.db = self._new_db(migrate=False)
+        self.assertEqual(self._list_indexes(), [])
+        self.db.build_indexes(colorized=False)
+        self.assertEqual(self._list_indexes(), indexes)
+
+    def test_iter_data_records(self):
+        for i in range(25):
+            self._insert_data(self.db, content=b'X' * i)
+        chunks = list(self.db.iter_data_id_chunks(first_id=3, last_id=20, chunk_size=7))
+        self.assertEqual([len(c) for c in chunks], [7, 7, 4])
+        self.assertEqual(sum(chunks, []), list(range(3, 21)))
+
+        recs = list(self.db.iter_data_records('ID, SIZE', where='SIZE >= ?', params=(10,),
+                                              chunk_size=4))
+        self.assertEqual([r[0] for r in recs], list(range(11, 26)))
+
+    def test_streaming_export(self):
+        for i in range(12):
+            self._insert_data(self.db, content=str(i).encode())
+        export_dir = os.path.join(self.tmp_dir, 'exported_data') + os.sep
+        resume_file = os.path.join(self.tmp_dir, 'resume')
+
+        with mock.patch.object(gr, 'exported_data_folder', export_dir):
+            nb = self.db.export_data(1, 5, colorized=False, nb_writers=3, progress=True,
+                                     resume_file=resume_file, chunk_size=2)
+            self.assertEqual(nb, 5)
+            with open(resume_file) as f:
+                self.assertEqual(f.read(), '5')
+            nb = self.db.export_data(1, 12, colorized=False, nb_writers=3, progress=True,
+                                     resume_file=resume_file, chunk_size=2)
+            self.assertEqual(nb, 7)
+
+        contents = set()
+        for fname in os.listdir(os.path.join(export_dir, 'dm')):
+            with open(os.path.join(export_dir, 'dm', fname), 'rb') as f:
+                contents.add(f.read())
+        self.assertEqual(len(contents), 12)
+
+    def test_blob_storage(self):
+        big = b'%PDF-1.4' + b'A' * 4096
+        for i in range(3):
+            data_id = self._insert_data(self.db, content=big)
+            self.db.insert_feedback(data_id, 'src', datetime.now(), b'crash ' * 100,
+                                    status_code=-1)
+        small_id = self._insert_data(self.db, content=b'tiny')
+        self.db.insert_dmaker('dm', 'GEN', 'gen', True, True)
+        self.db.flush()
+
+        blobs = self.db.execute_sql_statement('SELECT CODEC, LENGTH(CONTENT) FROM BLOBS;')
+        self.assertEqual(len(blobs), 2)
+        for codec, sz in blobs:
+            self.assertEqual(codec, Database.BLOB_CODEC_ZLIB)
+            self.assertLess(sz, 600)
+
+        contents = dict((rec[0], rec[1]) for rec in self.db.fetch_data())
+        self.assertEqual(contents[1], big)
+        self.assertEqual(contents[small_id], b'tiny')
+
+        ids = self.db.get_data_with_specific_fbk('crash', display=False, colorized=False)
+        self.assertEqual(sorted(ids), [1, 2, 3])
+
+        for i in range(1, 4):
+            self.db.remove_data(i, colorized=False)
+        blobs = self.db.execute_sql_statement('SELECT HASH FROM BLOBS;')
+        self.assertEqual(blobs, [])
+
+        # blobs are stored again after their removal
+        data_id = self._insert_data(self.db, content=big)
+        self.assertEqual(self.db.check_data_existence(data_id)[0][4], big)
+
+        # blobs removed by another process are stored again when the same content is
+        # recorded
+        self.db.flush()
+        other_db = self._new_db()
+        other_db.remove_data(data_id, colorized=False)
+        other_db.stop()
+        data_id = self._insert_data(self.db, content=big)
+        self.assertEqual(self.db.check_data_existence(data_id)[0][4], big)
+
+    def test_schema_upgrade(self):
+        self.db.stop()
+        os.remove(self.db_path)
+        con = sqlite3.connect(self.db_path)
+        con.executescript(
+            """
+            CREATE TABLE DATA (ID INTEGER PRIMARY KEY ASC AUTOINCREMENT, GROUP_ID INTEGER,
+                TYPE TEXT, DM_NAME TEXT, CONTENT BLOB, SIZE INTEGER, SENT_DATE TIMESTAMP,
+                ACK_DATE TIMESTAMP, TARGET TEXT, PRJ_NAME TEXT);
+            INSERT INTO DATA(TYPE, DM_NAME, CONTENT) VALUES('GEN', 'dm', X'41424344');
+            """)
+        con.close()
+        self.db = self._new_db()
+        self.assertEqual(self.db.check_data_existence(1)[0][4], b'ABCD')
+        data_id = self._insert_data(self.db, content=b'Z' * 1024)
+        self.assertEqual(self.db.check_data_existence(data_id)[0][4], b'Z' * 1024)
+
+    def test_remote_database(self):
+        remotes = []
+        servers = []
+        for i in range(2):
+            conn, remote_conn = multiprocessing.Pipe()
+            server = threading.Thread(target=self.db.serve_remote_client, args=(conn,))
+            server.start()
+            servers.append(server)
+            remote = RemoteDatabase(remote_conn)
+            self.assertTrue(remote.start())
+            remotes.append(remote)
+
+        ids = []
+        for i in range(3):
+            for remote in remotes:
+                ids.append(self._insert_data(remote, content=b'R' * 1024))
+        ids.append(self._insert_data(self.db))
+        self.assertEqual(sorted(ids), list(range(1, 8)))
+
+        for remote in remotes:
+            remote.flush()
+        rec = remotes[0].execute_sql_statement('SELECT COUNT(*) FROM DATA;')
+        self.assertEqual(rec, [(7,)])
+
+        for remote in remotes:
+            remote.stop()
+        for server in servers:
+            server.join()
+        self.assertEqual(self.db.check_data_existence(ids[0])[0][4], b'R' * 1024)
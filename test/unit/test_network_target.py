@@ -0,0 +1,287 @@
+################################################################################
+#
+#  Copyright 2014-2016 Eric Lacombe <eric.lacombe@security-labs.org>
+#
+################################################################################
+#
+#  This file is part of fuddly.
+#
+#  fuddly is free software: you can redistribute it and/or modify
+#  it under the terms of the GNU General Public License as published by
+#  the Free Software Foundation, either version 3 of the License, or
+#  (at your option) any later version.
+#
+#  fuddly is distributed in the hope that it will be useful,
+#  but WITHOUT ANY WARRANTY; without even the implied warranty of
+#  MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#  GNU General Public License for more details.
+#
+#  You should have received a copy of the GNU General Public License
+#  along with fuddly. If not, see <http://www.gnu.org/licenses/>
+#
+################################################################################
+
+from __future__ import print_function
+
+import socket
+import threading
+import time
+import unittest
+
+from test import mock, run_long_tests
+from framework.data import Data
+from framework.node import Node
+from framework.target_helpers import Target
+from framework.targets.network import NetworkTarget, FeedbackTerminator, FeedbackLengthField
+from framework.targets.network import _ConnectionPool
+
+
+class EchoServer(object):
+    """Local TCP or UDP server sending back everything it receives."""
+
+    def __init__(self, sock_type):
+        self.sock_type = sock_type
+        self.server = socket.socket(socket.AF_INET, sock_type)
+        self.server.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+        self.server.bind(('localhost', 0))
+        self.port = self.server.getsockname()[1]
+        self.server.settimeout(0.1)
+        self.stop_event = threading.Event()
+        if sock_type == socket.SOCK_STREAM:
+            self.server.listen(5)
+            main = self._tcp_main
+        else:
+            main = self._udp_main
+        self.thread = threading.Thread(target=main)
+        self.thread.start()
+
+    def _tcp_main(self):
+        while not self.stop_event.is_set():
+            try:
+                csock, _ = self.server.accept()
+            except socket.timeout:
+                continue
+            threading.Thread(target=self._tcp_echo, args=(csock,)).start()
+
+    def _tcp_echo(self, csock):
+        csock.settimeout(0.1)
+        while not self.stop_event.is_set():
+            try:
+                data = csock.recv(4096)
+            except socket.timeout:
+                continue
+            except socket.error:
+                break
+            if not data:
+                break
+            csock.sendall(data)
+        csock.close()
+
+    def _udp_main(self):
+        while not self.stop_event.is_set():
+            try:
+                data, addr = self.server.recvfrom(4096)
+            except socket.timeout:
+                continue
+            self.server.sendto(data, addr)
+
+    def stop(self):
+        self.stop_event.set()
+        self.thread.join()
+        self.server.close()
+
+
+class NetworkTargetTest(unittest.TestCase):
+    """Test case used to test the feedback collection of the 'NetworkTarget' class."""
+
+    def tearDown(self):
+        for obj in (getattr(self, 'target', None), getattr(self, 'server', None)):
+            if obj is not None:
+                obj.stop()
+
+    def _start(self, sock_type, hold_connection=False, fbk_mode=Target.FBK_WAIT_UNTIL_RECV,
+               fbk_timeout=2, connection_pool_size=0):
+        self.server = EchoServer(sock_type)
+        self.target = NetworkTarget(host='localhost', port=self.server.port,
+                                    socket_type=(socket.AF_INET, sock_type),
+                                    hold_connection=hold_connection,
+                                    connection_pool_size=connection_pool_size)
+        self.target.set_logger(mock.Mock())
+        self.target.set_feedback_mode(fbk_mode)
+        self.target.set_timeout(fbk_timeout=fbk_timeout, sending_delay=2)
+        self.assertTrue(self.target.start())
+
+    def _send_and_collect(self, payload, timeout=5):
+        self.target.send_data(Data(payload), from_fmk=True)
+        t0 = time.time()
+        while not self.target.is_target_ready_for_new_data():
+            if time.time() - t0 > timeout:
+                self.fail('feedback not completed')
+            time.sleep(0.0001)
+        fbk = b''
+        for ref, data, status, tstamp in self.target.get_feedback().iter_and_cleanup_collector():
+            self.assertGreaterEqual(status, 0)
+            fbk += b''.join(data)
+        return fbk
+
+    def _run_echo_cases(self, nb):
+        t0 = time.time()
+        for i in range(nb):
+            payload = 'case {:d}'.format(i).encode()
+            self.assertEqual(self._send_and_collect(payload), payload)
+        return nb / (time.time() - t0)
+
+    def test_tcp_feedback(self):
+        self._start(socket.SOCK_STREAM)
+        self._run_echo_cases(5)
+
+    def test_tcp_feedback_hold_connection(self):
+        self._start(socket.SOCK_STREAM, hold_connection=True)
+        self._run_echo_cases(5)
+
+    def test_udp_feedback(self):
+        self._start(socket.SOCK_DGRAM, hold_connection=True)
+        self._run_echo_cases(5)
+
+    def test_scatter_gather_sending(self):
+        self._start(socket.SOCK_STREAM, hold_connection=True)
+        # more leaves than the usual IOV_MAX, thus requiring several sendmsg() calls
+        chunks = [b'%04d' % i * 2 for i in range(3000)]
+        payload = b''.join(chunks)
+        nd = Node('payload', subnodes=[Node('n{:d}'.format(i), values=[c])
+                                       for i, c in enumerate(chunks)])
+        self.assertEqual(len(Data(nd).to_buffers()), len(chunks))
+        self.target.send_data(Data(nd), from_fmk=True)
+        t0 = time.time()
+        fbk = b''
+        while len(fbk) < len(payload) and time.time() - t0 < 10:
+            while not self.target.is_target_ready_for_new_data():
+                time.sleep(0.001)
+            for ref, data, status, tstamp in self.target.get_feedback().iter_and_cleanup_collector():
+                fbk += b''.join(data)
+            if len(fbk) < len(payload):
+                self.target.collect_feedback_without_sending()
+        self.assertEqual(fbk, payload)
+
+    def test_consume_send_buffers(self):
+        buffers = [memoryview(b'abc'), memoryview(b'de'), memoryview(b'f')]
+        consume = NetworkTarget._consume_send_buffers
+        self.assertEqual(consume(buffers, 0, 0, 0), (0, 0))
+        self.assertEqual(consume(buffers, 0, 0, 4), (1, 1))
+        self.assertEqual(consume(buffers, 0, 0, 5), (2, 0))
+        self.assertEqual(consume(buffers, 0, 0, 6), (3, 0))
+        self.assertEqual(consume(buffers, 0, 1, 1), (0, 2))
+        self.assertEqual(consume(buffers, 1, 1, 1), (2, 0))
+        self.assertEqual(consume(buffers, 0, 2, 4), (3, 0))
+
+    def test_connection_pool(self):
+        self._start(socket.SOCK_STREAM, connection_pool_size=2)
+        time.sleep(0.2)
+        self._run_echo_cases(10)
+        desc = self.target.get_description()
+        pool = self.target._connection_pools[('localhost', self.server.port)]
+        self.assertEqual(pool.hits + pool.misses, 10)
+        self.assertGreater(pool.hits, 0)
+        self.assertIn('pool:2[hits:{:d},misses:{:d}]'.format(pool.hits, pool.misses), desc)
+
+    def test_connection_pool_stale_socket(self):
+        peers = []
+
+        def connect():
+            s1, s2 = socket.socketpair()
+            peers.append(s2)
+            return s1
+
+        pool = _ConnectionPool(2, connect, name='POOL-test')
+        pool.start()
+        t0 = time.time()
+        while len(peers) < 2 and time.time() - t0 < 5:
+            time.sleep(0.01)
+        # the peers of the pooled sockets close their connection
+        for p in peers:
+            p.close()
+        s = pool.get()
+        self.assertIsNone(s)
+        self.assertEqual((pool.hits, pool.misses), (0, 1))
+        t0 = time.time()
+        while len(peers) < 4 and time.time() - t0 < 5:
+            time.sleep(0.01)
+        s = pool.get()
+        self.assertIsNotNone(s)
+        self.assertEqual((pool.hits, pool.misses), (1, 1))
+        s.close()
+        pool.stop()
+        for p in peers:
+            p.close()
+
+    def test_feedback_length(self):
+        # With a feedback length, the collection ends as soon as it is reached
+        # even when waiting for the full time slot.
+        self._start(socket.SOCK_STREAM, fbk_mode=Target.FBK_WAIT_FULL_TIME, fbk_timeout=3)
+        self.target.feedback_length = 4
+        t0 = time.time()
+        self.assertEqual(self._send_and_collect(b'ABCD'), b'ABCD')
+        self.assertLess(time.time() - t0, 2)
+
+    def test_full_time_slot(self):
+        self._start(socket.SOCK_STREAM, fbk_mode=Target.FBK_WAIT_FULL_TIME, fbk_timeout=0.3)
+        t0 = time.time()
+        self.assertEqual(self._send_and_collect(b'ABCD'), b'ABCD')
+        self.assertGreaterEqual(time.time() - t0, 0.3)
+
+    @unittest.skipIf(not run_long_tests, "Long test case")
+    def test_echo_benchmark(self):
+        for sock_type, hold_connection, pool_size in [(socket.SOCK_STREAM, False, 0),
+                                                      (socket.SOCK_STREAM, False, 4),
+                                                      (socket.SOCK_STREAM, True, 0),
+                                                      (socket.SOCK_DGRAM, True, 0)]:
+            self._start(sock_type, hold_connection=hold_connection, connection_pool_size=pool_size)
+            rate = self._run_echo_cases(200)
+            print('\n*** NetworkTarget echo benchmark ({:s}, hold_connection={!r}, pool={:d}): '
+                  '{:.1f} cases/s'.format('TCP' if sock_type == socket.SOCK_STREAM else 'UDP',
+                                          hold_connection, pool_size, rate))
+            self.target.stop()
+            self.target = None
+            self.server.stop()
+            self.server = None
+
+    def _check_completion(self, sock_type, fbk_completion, payload):
+        # The feedback timeout is far longer than the test duration, hence
+        # collection can only end through the completion predicate.
+        self.server = EchoServer(sock_type)
+        self.target = NetworkTarget(host='localhost', port=self.server.port,
+                                    socket_type=(socket.AF_INET, sock_type),
+                                    hold_connection=True, fbk_completion=fbk_completion)
+        self.target.set_logger(mock.Mock())
+        self.target.set_feedback_mode(Target.FBK_WAIT_FULL_TIME)
+        self.target.set_timeout(fbk_timeout=30, sending_delay=2)
+        self.assertTrue(self.target.start())
+        t0 = time.time()
+        for i in range(3):
+            self.assertEqual(self._send_and_collect(payload), payload)
+        self.assertLess(time.time() - t0, 5)
+
+    def test_fbk_completion_terminator(self):
+        self._check_completion(socket.SOCK_STREAM, FeedbackTerminator(b'\r\n\r\n'),
+                               b'HTTP/1.1 200 OK\r\nServer: test\r\n\r\n')
+
+    def test_fbk_completion_length_field(self):
+        self._check_completion(socket.SOCK_DGRAM, FeedbackLengthField(offset=1, size=2),
+                               b'\x01\x00\x04ABCD')
+
+    def test_fbk_completion_callable(self):
+        self._check_completion(socket.SOCK_STREAM, lambda chunks: b'END' in b''.join(chunks),
+                               b'data END')
+
+    def test_fbk_completion_predicates(self):
+        term = FeedbackTerminator(b'\r\n\r\n')
+        self.assertFalse(term([b'abc\r']))
+        self.assertFalse(term([b'abc\r', b'\n\r']))
+        self.assertTrue(term([b'abc\r', b'\n\r', b'\n']))
+        self.assertTrue(term([b'abc', b'\r\n\r\nxyz']))
+        self.assertTrue(FeedbackTerminator(b'\n')([b'a', b'b\n']))
+
+        length = FeedbackLengthField(offset=1, size=2, big_endian=False, adjust=1)
+        self.assertFalse(length([b'\xff\x03']))
+        self.assertFalse(length([b'\xff\x03', b'\x00ABC']))
+        self.assertTrue(length([b'\xff\x03', b'\x00ABC', b'D']))
@@ -26,6 +26,7 @@ import ddt
 from test import mock
 
 from framework.node import *
+from framework.value_types import String, UINT8
 
 @ddt.ddt
 class TestBitFieldCondition(unittest.TestCase):
@@ -90,3 +91,182 @@ class TestBitFieldCondition(unittest.TestCase):
     @ddt.unpack
     def test_invalid_with_both_arguments(self, sf, val, neg_val):
         self.assertRaises(Exception, BitFieldCondition, sf=sf, val=val, neg_val=neg_val)
+
+
+class TestNodePaths(unittest.TestCase):
+
+    def setUp(self):
+        self.a = Node('a', values=['A'])
+        self.b = Node('b', values=['B'])
+        self.root = Node('root', subnodes=[self.a, self.b])
+        self.root.set_env(Env())
+
+    def test_path_index_is_reused(self):
+        self.assertIs(self.root.get_node_by_path(path='root/a'), self.a)
+        htable = self.root._get_paths_index(None, True)
+        self.assertIs(self.root.get_node_by_path(path='root/b'), self.b)
+        self.assertIs(self.root._get_paths_index(None, True), htable)
+        self.assertIs(self.root.get_node_by_path(path_regexp='b$'), self.b)
+        self.assertIsNone(self.root.get_node_by_path(path_regexp='^c$'))
+
+    def test_path_index_invalidation(self):
+        self.assertIs(self.root.get_node_by_path(path_regexp='/a$'), self.a)
+        c = Node('c', values=['C'])
+        self.root.set_subnodes_basic([c, self.b])
+        self.assertIsNone(self.root.get_node_by_path(path='root/a'))
+        self.assertIsNone(self.root.get_node_by_path(path_regexp='/a$'))
+        self.assertIs(self.root.get_node_by_path(path='root/c'), c)
+
+        self.b.set_values(values=['X', 'Y'])
+        self.assertIs(self.root.get_node_by_path(path='root/b'), self.b)
+
+    def test_path_index_is_kept_by_other_graph_changes(self):
+        htable = self.root._get_paths_index(None, True)
+        other = Node('other', subnodes=[Node('x', values=['X'])])
+        other.set_env(Env())
+        other.freeze()
+        other.unfreeze()
+        other.set_subnodes_basic([Node('y', values=['Y'])])
+        self.assertIs(self.root._get_paths_index(None, True), htable)
+
+    def test_path_index_is_kept_by_value_changes(self):
+        mid = Node('mid', subnodes=[Node('leaf', values=['A', 'B'])])
+        root = Node('root', subnodes=[mid, self.a])
+        root.set_env(Env())
+        root.freeze()
+        htable = root._get_paths_index(None, True)
+        root.unfreeze(recursive=True)
+        root.freeze()
+        self.assertIs(root._get_paths_index(None, True), htable)
+        self.assertIs(root.get_node_by_path('root/mid/leaf'), mid.cc.frozen_node_list[0])
+
+    def test_path_index_invalidation_from_subgraph(self):
+        leaf = Node('leaf', values=['L'])
+        mid = Node('mid', subnodes=[leaf])
+        root = Node('root', subnodes=[mid])
+        root.set_env(Env())
+        self.assertIs(root.get_node_by_path('root/mid/leaf'), leaf)
+        # the index of the subgraph is rebuilt first, the one of the root shall be too
+        self.assertIs(mid.get_node_by_path('mid/leaf'), leaf)
+        new_leaf = Node('new_leaf', values=['N'])
+        mid.set_subnodes_basic([new_leaf])
+        self.assertIs(mid.get_node_by_path('mid/new_leaf'), new_leaf)
+        self.assertIsNone(root.get_node_by_path('root/mid/leaf'))
+        self.assertIs(root.get_node_by_path('root/mid/new_leaf'), new_leaf)
+
+        # same when the frozen subnodes of the subgraph change
+        mid.set_subnodes_with_csts([1, ['u>', [leaf, 1, 5]]])
+        mid.make_random()
+        qties = set()
+        for i in range(20):
+            mid.unfreeze()
+            root.freeze()
+            qty = len(mid.cc.frozen_node_list)
+            qties.add(qty)
+            self.assertEqual(len(mid.get_all_paths()), qty + 1)
+            self.assertEqual(len(root.get_all_paths()), qty + 2)
+        self.assertGreater(len(qties), 1)
+
+    def test_get_all_paths_returns_a_copy(self):
+        paths = self.root.get_all_paths()
+        paths.clear()
+        self.assertEqual(list(self.root.get_all_paths().keys()), ['root', 'root/a', 'root/b'])
+        self.assertEqual(list(self.root.iter_paths(depth_min=2, only_paths=True)),
+                         ['root/a', 'root/b'])
+
+    def test_reachable_nodes(self):
+        shared = Node('shared', values=['S'])
+        c = Node('c', subnodes=[shared])
+        self.root.set_subnodes_basic([self.a, c, shared])
+        self.root.set_env(Env())
+        self.root.freeze()
+
+        nodes = self.root.get_reachable_nodes(respect_order=True)
+        self.assertEqual(nodes, [self.root, self.a, c, shared])
+        nodes = self.root.get_reachable_nodes(path_regexp='c/shared$', respect_order=True)
+        self.assertEqual(nodes, [shared])
+        nodes = self.root.get_reachable_nodes(relative_depth=1, exclude_self=True, respect_order=True)
+        self.assertEqual(nodes, [self.a, c, shared])
+
+
+class TestNodeValueCache(unittest.TestCase):
+
+    def setUp(self):
+        self.leaf = Node('leaf', values=['ABC'])
+        self.gen = Node('gen')
+        self.gen.set_generator_func(lambda: Node('gen_leaf', values=['XY']))
+        self.mid = Node('mid', subnodes=[self.leaf, self.gen])
+        self.root = Node('root', subnodes=[Node('head', values=['<']), self.mid])
+        self.root.set_env(Env())
+
+    def test_value_is_cached_once_frozen(self):
+        self.assertEqual(self.root.to_bytes(), b'<ABCXY')
+        self.assertTrue(self.root.cc._is_value_stable(None))
+        self.assertTrue(self.mid.cc._is_value_stable(None))
+        self.assertEqual(self.root.to_bytes(), b'<ABCXY')
+
+    def test_leaf_change_invalidates_ancestors(self):
+        self.root.to_bytes()
+        self.leaf.set_frozen_value(b'DEFG')
+        self.assertFalse(self.mid.cc._is_value_stable(None))
+        self.assertFalse(self.root.cc._is_value_stable(None))
+        self.assertEqual(self.root.to_bytes(), b'<DEFGXY')
+
+        self.leaf.set_values(values=['Z'])
+        self.assertEqual(self.root.to_bytes(), b'<ZXY')
+
+    def test_generator_reset_invalidates_ancestors(self):
+        self.root.to_bytes()
+        self.gen.cc.generator_func = lambda: Node('gen_leaf', values=['W'])
+        self.gen.unfreeze()
+        self.assertEqual(self.root.to_bytes(), b'<ABCW')
+
+    def test_unfreeze_and_copy(self):
+        self.root.to_bytes()
+        clone = self.root.get_clone()
+        self.assertFalse(clone.cc._is_value_stable(None))
+        self.assertEqual(clone.to_bytes(), b'<ABCXY')
+        clone['root/mid/leaf$'].set_frozen_value(b'-')
+        self.assertEqual(clone.to_bytes(), b'<-XY')
+        self.assertEqual(self.root.to_bytes(), b'<ABCXY')
+
+        self.root.unfreeze()
+        self.assertFalse(self.root.cc._is_value_stable(None))
+        self.assertEqual(self.root.to_bytes(), b'<ABCXY')
+
+
+class TestNodeCloning(unittest.TestCase):
+
+    def setUp(self):
+        self.leaf = Node('leaf', vt=String(values=['A', 'B', 'C']))
+        self.root = Node('root', subnodes=[self.leaf, Node('int', vt=UINT8(values=[1, 2, 3]))])
+        self.root.set_env(Env())
+
+    def test_value_type_shared_until_accessed(self):
+        self.root.freeze()
+        clone = self.root.get_clone()
+        cloned_leaf = clone['root/leaf$']
+        self.assertIs(cloned_leaf.cc._value_type, self.leaf.cc._value_type)
+        self.assertEqual(clone.to_bytes(), b'A\x01')
+        self.assertIs(cloned_leaf.cc._value_type, self.leaf.cc._value_type)
+
+        vt = cloned_leaf.cc.get_value_type()
+        self.assertIsNot(vt, self.leaf.cc.get_value_type())
+        self.assertIs(cloned_leaf.cc.get_value_type(), vt)
+
+    def test_clone_state_is_independent(self):
+        self.root.freeze()
+        clone = self.root.get_clone()
+        cloned_leaf = clone['root/leaf$']
+        self.leaf.unfreeze()
+        self.assertEqual(self.root.to_bytes(), b'B\x01')
+        self.leaf.unfreeze()
+        self.assertEqual(self.root.to_bytes(), b'C\x01')
+
+        self.assertEqual(clone.to_bytes(), b'A\x01')
+        cloned_leaf.unfreeze()
+        self.assertEqual(clone.to_bytes(), b'B\x01')
+
+        fresh_clone = self.root.get_clone(ignore_frozen_state=True)
+        self.assertEqual(fresh_clone.to_bytes(), b'A\x01')
+        self.assertEqual(self.root.to_bytes(), b'C\x01')
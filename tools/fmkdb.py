@@ -84,10 +84,20 @@ group.add_argument('--export-data', nargs=2, metavar=('FIRST_DATA_ID','LAST_DATA
                    help='Extract data from provided data ID range')
 group.add_argument('-e', '--export-one-data', type=int, metavar='DATA_ID',
                    help='Extract data from the provided data ID')
+group.add_argument('--export-writers', type=int, metavar='NB', default=1,
+                   help='Number of threads writing exported data in parallel (expect --export-data)')
+group.add_argument('--export-progress', action='store_true',
+                   help='Report export progress instead of each exported data (expect --export-data)')
+group.add_argument('--export-resume', metavar='PATH',
+                   help='File where the last exported data ID is recorded. If it exists, '
+                        'the export resumes from the recorded data ID (expect --export-data)')
 group.add_argument('--remove-data', nargs=2, metavar=('FIRST_DATA_ID','LAST_DATA_ID'), type=int,
                    help='Remove data from provided data ID range and all related information from fmkDB')
 group.add_argument('-r', '--remove-one-data', type=int, metavar='DATA_ID',
                    help='Remove data ID and all related information from fmkDB')
+group.add_argument('--build-indexes', action='store_true',
+                   help='Create the indexes missing from fmkDB (e.g., for a database created '
+                        'by a previous fuddly version) and update query planner statistics')
 
 group = parser.add_argument_group('Fuddly Database Analysis')
 group.add_argument('--data-with-impact', action='store_true',
@@ -161,15 +171,20 @@ if __name__ == "__main__":
 
     export_data = args.export_data
     export_one_data = args.export_one_data
+    export_writers = args.export_writers
+    export_progress = args.export_progress
+    export_resume = args.export_resume
     remove_data = args.remove_data
     remove_one_data = args.remove_one_data
 
+    build_indexes = args.build_indexes
+
     impact_analysis = args.data_with_impact
     data_without_fbk = args.data_without_fbk
     fbk_src = args.fbk_src
     data_with_specific_fbk = args.data_with_specific_fbk
 
-    fmkdb = Database(fmkdb_path=fmkdb)
+    fmkdb = Database(fmkdb_path=fmkdb, migrate=False)
     ok = fmkdb.start()
     if not ok:
         print(colorize("*** ERROR: The database {:s} is invalid! ***".format(fmkdb.fmk_db_path),
@@ -212,7 +227,9 @@ if __name__ == "__main__":
     elif export_data is not None or export_one_data is not None:
 
         if export_data is not None:
-            fmkdb.export_data(first=export_data[0], last=export_data[1], colorized=colorized)
+            fmkdb.export_data(first=export_data[0], last=export_data[1], colorized=colorized,
+                              nb_writers=export_writers, progress=export_progress,
+                              resume_file=export_resume)
         else:
             fmkdb.export_data(first=export_one_data, colorized=colorized)
 
@@ -224,6 +241,9 @@ if __name__ == "__main__":
         else:
             fmkdb.remove_data(remove_one_data, colorized=colorized)
 
+    elif build_indexes:
+        fmkdb.build_indexes(colorized=colorized)
+
     elif impact_analysis:
         fmkdb.get_data_with_impact(prj_name=prj_name, fbk_src=fbk_src, verbose=verbose,
                                    colorized=colorized)